@@ -0,0 +1,317 @@
+"""
+This module benchmarks the hand evaluation of the Texas Hold'em game.
+
+It measures the throughput (operations per second) and the latency of:
+- the construction of Hand objects (7 cards),
+- the comparison of FinalHand objects,
+- the parsing of card codes with Card.from_code_string,
+- a showdown between N players, as done by resolve_round,
+- the shuffle and the deal of a hand between N players, from a local deck.
+
+The datasets are generated from fixed seeds, so two runs measure the same work.
+Each run is saved as a JSON baseline in the .benchmarks directory
+and compared to the previous one: the benchmarks slower than the threshold are reported
+(and the exit status is 1).
+
+Usage:
+    python bench_hand.py [--size N] [--repeat R] [--players P] [--threshold T] [--no-save]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from holdem.game.card import Card, CARDS
+from holdem.game.deck import Deck, SeededDeckBackend
+from holdem.game.hand import Hand
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".benchmarks")
+SEED = 1234
+DEFAULT_SIZE = 20_000
+DEFAULT_REPEAT = 5
+DEFAULT_PLAYERS = 6
+DEFAULT_THRESHOLD = 0.10
+
+
+def make_datasets(size: int, players: int, seed: int = SEED) -> Dict[str, list]:
+    """
+    # Generate the datasets of the benchmarks.
+
+    Args:
+    -----
+        size (int): Number of hands (or showdowns) in each dataset.
+        players (int): Number of players in each showdown.
+        seed (int, optional): Seed of the random generator. Defaults to SEED.
+
+    Returns:
+    --------
+        Dict[str, list]: The datasets, by benchmark name.
+    """
+    rng = random.Random(seed)
+    hands = [rng.sample(CARDS, 7) for _ in range(size)]
+    final_hands = [Hand(cards).final_hand for cards in hands]
+    showdowns = []
+    for _ in range(size // players):
+        cards = rng.sample(CARDS, 5 + 2 * players)
+        showdowns.append(
+            (cards[:5], [cards[5 + 2 * i : 7 + 2 * i] for i in range(players)])
+        )
+    return {
+        "hand_construction": hands,
+        "final_hand_comparison": list(zip(final_hands, final_hands[1:])),
+        "from_code_string": ["".join(card.code for card in cards) for cards in hands],
+        "showdown": showdowns,
+        "deal": [players] * (size // players),
+    }
+
+
+def bench_hand_construction(hands: List[List[Card]]) -> int:
+    """
+    # Build a Hand (and detect its final hand) for every list of cards.
+
+    Returns:
+    --------
+        int: Number of operations.
+    """
+    for cards in hands:
+        Hand(cards)
+    return len(hands)
+
+
+def bench_final_hand_comparison(pairs: list) -> int:
+    """
+    # Compare every pair of final hands with all the comparison operators.
+
+    Returns:
+    --------
+        int: Number of operations.
+    """
+    for first, second in pairs:
+        _ = first > second, first == second, first < second
+    return len(pairs)
+
+
+def bench_from_code_string(codes: List[str]) -> int:
+    """
+    # Parse every code string.
+
+    Returns:
+    --------
+        int: Number of operations.
+    """
+    for code_string in codes:
+        Card.from_code_string(code_string)
+    return len(codes)
+
+
+def bench_showdown(showdowns: list) -> int:
+    """
+    # Find the winners of every showdown, like resolve_round.
+
+    Returns:
+    --------
+        int: Number of operations (showdowns).
+    """
+    for board, holes in showdowns:
+        final_hands = [Hand(hole + board).final_hand for hole in holes]
+        best = max(final_hands)
+        _ = [i for i, final_hand in enumerate(final_hands) if final_hand == best]
+    return len(showdowns)
+
+
+def bench_deal(deals: List[int]) -> int:
+    """
+    # Shuffle a deck and deal a hand to each number of players.
+
+    Returns:
+    --------
+        int: Number of operations (deals).
+    """
+    deck = Deck(backend=SeededDeckBackend(SEED))
+    for players in deals:
+        deck.shuffle()
+        deck.deal(players)
+    return len(deals)
+
+
+BENCHMARKS: Dict[str, Callable[[list], int]] = {
+    "hand_construction": bench_hand_construction,
+    "final_hand_comparison": bench_final_hand_comparison,
+    "from_code_string": bench_from_code_string,
+    "showdown": bench_showdown,
+    "deal": bench_deal,
+}
+
+
+def run_benchmarks(
+    size: int = DEFAULT_SIZE,
+    repeat: int = DEFAULT_REPEAT,
+    players: int = DEFAULT_PLAYERS,
+) -> Dict[str, Dict[str, float]]:
+    """
+    # Run every benchmark and keep the best of the repetitions.
+
+    Args:
+    -----
+        size (int, optional): Size of the datasets. Defaults to DEFAULT_SIZE.
+        repeat (int, optional): Number of repetitions. Defaults to DEFAULT_REPEAT.
+        players (int, optional): Number of players in a showdown. Defaults to DEFAULT_PLAYERS.
+
+    Returns:
+    --------
+        Dict[str, Dict[str, float]]:
+            The operations per second and the latency (in microseconds) of each benchmark.
+    """
+    datasets = make_datasets(size, players)
+    results = {}
+    for name, benchmark in BENCHMARKS.items():
+        best = float("inf")
+        operations = 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            operations = benchmark(datasets[name])
+            best = min(best, time.perf_counter() - start)
+        results[name] = {
+            "ops_per_second": operations / best,
+            "latency_us": best / operations * 1e6,
+        }
+    return results
+
+
+def last_baseline(directory: str = BASELINE_DIR) -> Optional[Tuple[str, dict]]:
+    """
+    # Load the most recent baseline.
+
+    Args:
+    -----
+        directory (str, optional): Directory of the baselines. Defaults to BASELINE_DIR.
+
+    Returns:
+    --------
+        Optional[Tuple[str, dict]]: The path and the content of the baseline, None if there is none.
+    """
+    if not os.path.isdir(directory):
+        return None
+    files = sorted(name for name in os.listdir(directory) if name.endswith(".json"))
+    if not files:
+        return None
+    path = os.path.join(directory, files[-1])
+    with open(path, encoding="utf-8") as file:
+        return path, json.load(file)
+
+
+def save_baseline(
+    results: Dict[str, Dict[str, float]], settings: dict, directory: str = BASELINE_DIR
+) -> str:
+    """
+    # Save the results of a run as a new baseline.
+
+    Args:
+    -----
+        results (Dict[str, Dict[str, float]]): The results of run_benchmarks.
+        settings (dict): The size, repeat and players used for the run.
+        directory (str, optional): Directory of the baselines. Defaults to BASELINE_DIR.
+
+    Returns:
+    --------
+        str: The path of the baseline.
+    """
+    os.makedirs(directory, exist_ok=True)
+    now = datetime.now()
+    path = os.path.join(directory, now.strftime("%Y%m%d-%H%M%S") + ".json")
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(
+            {
+                "created": now.isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "settings": settings,
+                "results": results,
+            },
+            file,
+            indent=2,
+        )
+    return path
+
+
+def compare(
+    results: Dict[str, Dict[str, float]], baseline: dict, threshold: float
+) -> List[str]:
+    """
+    # Find the benchmarks that are slower than the baseline by more than the threshold.
+
+    Args:
+    -----
+        results (Dict[str, Dict[str, float]]): The results of run_benchmarks.
+        baseline (dict): A baseline saved by save_baseline.
+        threshold (float): Tolerated slowdown (0.1 for 10%).
+
+    Returns:
+    --------
+        List[str]: The names of the benchmarks that regressed.
+    """
+    regressions = []
+    for name, result in results.items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            continue
+        if result["ops_per_second"] < previous["ops_per_second"] * (1 - threshold):
+            regressions.append(name)
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    # Run the benchmarks, compare them to the last baseline and save a new one.
+
+    Returns:
+    --------
+        int: The exit status (1 if a benchmark regressed).
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the hand evaluation.")
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--players", type=int, default=DEFAULT_PLAYERS)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument(
+        "--no-save", action="store_true", help="do not save the run as a baseline"
+    )
+    args = parser.parse_args(argv)
+
+    settings = {"size": args.size, "repeat": args.repeat, "players": args.players}
+    results = run_benchmarks(**settings)
+    previous = last_baseline()
+    if previous is not None and previous[1].get("settings") != settings:
+        print(f"Ignoring {previous[0]}: it was run with other settings")
+        previous = None
+
+    print(f"{'benchmark':<24}{'ops/s':>14}{'latency (µs)':>16}{'change':>10}")
+    for name, result in results.items():
+        change = ""
+        if previous is not None and name in previous[1]["results"]:
+            before = previous[1]["results"][name]["ops_per_second"]
+            change = f"{result['ops_per_second'] / before - 1:+.1%}"
+        print(
+            f"{name:<24}{result['ops_per_second']:>14,.0f}"
+            f"{result['latency_us']:>16.2f}{change:>10}"
+        )
+
+    regressions = []
+    if previous is not None:
+        regressions = compare(results, previous[1], args.threshold)
+        print(f"\nCompared to {previous[0]}")
+        for name in regressions:
+            print(f"REGRESSION: {name} is more than {args.threshold:.0%} slower")
+    if not args.no_save:
+        print(f"Baseline saved to {save_baseline(results, settings)}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
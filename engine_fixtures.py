@@ -0,0 +1,38 @@
+"""
+This module contains the helpers shared by the unit tests of the table state engine
+(test_engine.py and test_history.py), to build tables and play them without any database.
+
+Functions:
+- new_table: Create a table whose players are not seated yet.
+- play: Play an action for the player to play.
+"""
+
+from holdem.game.engine import (
+    Seat,
+    TableState,
+    check_action,
+    do_action,
+    next_player,
+    next_stage_check,
+)
+
+
+def new_table(*chips: int) -> TableState:
+    """
+    # Create a table whose players have the given chips and are not seated yet.
+    """
+    seats = [Seat(i + 1, f"player{i + 1}", amount) for i, amount in enumerate(chips)]
+    return TableState(round_id=1, seats=seats)
+
+
+def play(state: TableState, action: str):
+    """
+    # Play an action for the player to play, then check if the stage is over.
+    """
+    seat = state.seat(state.player_to_play)
+    check, message = check_action(state, seat, action)
+    if not check:
+        raise ValueError(message)
+    do_action(state, seat, action)
+    next_player(state)
+    next_stage_check(state)
@@ -1,102 +1,199 @@
 """
 This module defines the Card class, which represents a playing card.
+
+The 52 cards of a deck are created once, when the module is imported,
+and every constructor or parser returns one of these shared instances.
+Each card carries an integer encoding used by the hand evaluators:
+
+- id: 0..51, equal to `rank * 4 + suit_index`
+- rank: 0..12, from "2" to "ACE"
+- suit_index: 0..3, in the order CLUBS, DIAMONDS, HEARTS, SPADES
+- rank_bit / suit_bit: one-hot masks of the rank (13 bits) and the suit (4 bits)
+- prime: a distinct prime per rank (2 for "2" ... 41 for "ACE")
+- bitmask: `rank_bit << 16 | suit_bit << 12 | rank << 8 | prime`
 """
 
-from typing import List
+from typing import Dict, List, Tuple
+
+VALUES: Tuple[str, ...] = (
+    "2",
+    "3",
+    "4",
+    "5",
+    "6",
+    "7",
+    "8",
+    "9",
+    "10",
+    "JACK",
+    "QUEEN",
+    "KING",
+    "ACE",
+)
+SUITS: Tuple[str, ...] = ("CLUBS", "DIAMONDS", "HEARTS", "SPADES")
+
+VALUE_CODES: Tuple[str, ...] = tuple("234567890JQKA")
+SUIT_CODES: Tuple[str, ...] = tuple("CDHS")
+PRIMES: Tuple[int, ...] = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+VALUE_UNICODE: Tuple[str, ...] = tuple("②③④⑤⑥⑦⑧⑨⑩ⒿⓆⓀⒶ")
+SUIT_UNICODE: Tuple[str, ...] = tuple("♣♦♥♠")
+
+IMAGE_URL = "https://deckofcardsapi.com/static/img/{code}.png"
 
 
 class Card:
     """
     Represents a playing card.
 
+    Cards are immutable and interned: `Card("ACE", "SPADES")` always returns
+    the same object as `Card.from_code("AS")` or `Card.from_id(51)`.
+
     Attributes:
     -----------
         value (str): The value of the card.
         suit (str): The suit of the card.
-        code (str, optional): The code of the card. Defaults to "??"
-        image (str, optional): The URL of the card image. Defaults to an empty string.
+        code (str): The code of the card (e.g. "AS", "0H").
+        image (str): The URL of the card image.
         name (str): The name of the card, combining value and suit.
         unicode (str): The Unicode representation of the card.
+        id (int): The index of the card in the deck (0..51).
+        rank (int): The index of the value (0 for "2" to 12 for "ACE").
+        suit_index (int): The index of the suit (0 for CLUBS to 3 for SPADES).
+        rank_bit (int): `1 << rank`.
+        suit_bit (int): `1 << suit_index`.
+        prime (int): The prime number associated with the rank.
+        bitmask (int): Rank bit, suit bit, rank and prime packed in one integer.
     """
 
-    def __init__(
-        self,
+    __slots__ = (
+        "id",
+        "value",
+        "suit",
+        "code",
+        "image",
+        "name",
+        "unicode",
+        "rank",
+        "suit_index",
+        "rank_bit",
+        "suit_bit",
+        "prime",
+        "bitmask",
+    )
+
+    def __new__(
+        cls,
         value: str,
         suit: str,
         code: str = "??",
         image: str = "",
-    ):
+    ) -> "Card":
         """
         Args:
         -----
             value (str): The value of the card.
             suit (str): The suit of the card.
-            code (str, optional): The code of the card. Defaults to "??"
-            image (str, optional): The URL of the card image. Defaults to an empty string.
+            code (str, optional):
+                The code of the card. Defaults to "??" (deduced from value and suit).
+            image (str, optional):
+                The URL of the card image. Ignored, the image is deduced from the code.
+
+        Returns:
+        --------
+            Card: The shared instance of the card.
 
         Raises:
         -------
             TypeError: If value, suit, code, or image is not a string.
             ValueError: If value is not one of ACE, KING, QUEEN, JACK, 10, 9, 8, 7, 6, 5, 4, 3, 2
-                        or if suit is not one of HEARTS, DIAMONDS, CLUBS, SPADES.
+                        or if suit is not one of HEARTS, DIAMONDS, CLUBS, SPADES
+                        or if code does not match value and suit.
         """
         # Checks
         if not isinstance(value, str):
             raise TypeError("Value must be a string")
         if not isinstance(suit, str):
             raise TypeError("Suit must be a string")
-        if value not in [
-            "ACE",
-            "KING",
-            "QUEEN",
-            "JACK",
-            "10",
-            "9",
-            "8",
-            "7",
-            "6",
-            "5",
-            "4",
-            "3",
-            "2",
-        ]:
+        if value not in _RANK_BY_VALUE:
             raise ValueError(
                 "Value must be one of ACE, KING, QUEEN, JACK, 10, 9, 8, 7, 6, 5, 4, 3, 2"
             )
-        if suit not in ["HEARTS", "DIAMONDS", "CLUBS", "SPADES"]:
+        if suit not in _SUIT_BY_NAME:
             raise ValueError("Suit must be one of HEARTS, DIAMONDS, CLUBS, SPADES")
         if not isinstance(code, str):
             raise TypeError("Code must be a string")
         if not isinstance(image, str):
             raise TypeError("Image must be a string")
-        # Init
-        self.value = value
-        self.suit = suit
-        self.code = code
-        self.image = image
-        self.name = f"{self.value} of {self.suit}"
-        value_unicode = {
-            "ACE": "Ⓐ",
-            "KING": "Ⓚ",
-            "QUEEN": "Ⓠ",
-            "JACK": "Ⓙ",
-            "10": "⑩",
-            "9": "⑨",
-            "8": "⑧",
-            "7": "⑦",
-            "6": "⑥",
-            "5": "⑤",
-            "4": "④",
-            "3": "③",
-            "2": "②",
-        }
-        suits_unicode = {
-            "HEARTS": "♥",
-            "DIAMONDS": "♦",
-            "CLUBS": "♣",
-            "SPADES": "♠",
+        card = CARDS[_RANK_BY_VALUE[value] * 4 + _SUIT_BY_NAME[suit]]
+        if code not in ("??", card.code):
+            raise ValueError(f"Code '{code}' does not match the {card.name}")
+        # Return
+        return card
+
+    @classmethod
+    def _create(cls, card_id: int) -> "Card":
+        """
+        # Build the shared instance of a card (only used to fill the registry).
+
+        Args:
+        -----
+            card_id (int): The index of the card in the deck (0..51).
+
+        Returns:
+        --------
+            Card: A new Card object.
+        """
+        card = object.__new__(cls)
+        rank, suit_index = divmod(card_id, 4)
+        code = VALUE_CODES[rank] + SUIT_CODES[suit_index]
+        fields = {
+            "id": card_id,
+            "value": VALUES[rank],
+            "suit": SUITS[suit_index],
+            "code": code,
+            "image": IMAGE_URL.format(code=code),
+            "name": f"{VALUES[rank]} of {SUITS[suit_index]}",
+            "unicode": f"{VALUE_UNICODE[rank]} {SUIT_UNICODE[suit_index]}",
+            "rank": rank,
+            "suit_index": suit_index,
+            "rank_bit": 1 << rank,
+            "suit_bit": 1 << suit_index,
+            "prime": PRIMES[rank],
+            "bitmask": (1 << rank) << 16
+            | (1 << suit_index) << 12
+            | rank << 8
+            | PRIMES[rank],
         }
-        self.unicode = f"{value_unicode[value]} {suits_unicode[suit]}"
+        for field, field_value in fields.items():
+            object.__setattr__(card, field, field_value)
+        return card
+
+    @staticmethod
+    def from_id(card_id: int) -> "Card":
+        """
+        # Get a Card object from its index in the deck.
+
+        Args:
+        -----
+            card_id (int): The index of the card in the deck (0..51).
+
+        Returns:
+        --------
+            Card: The shared instance of the card.
+
+        Raises:
+        -------
+            TypeError: If card_id is not an int.
+            ValueError: If card_id is not between 0 and 51.
+        """
+        # Checks
+        if not isinstance(card_id, int):
+            raise TypeError("card_id must be an int")
+        if not 0 <= card_id < 52:
+            raise ValueError("card_id must be between 0 and 51")
+        # Return
+        return CARDS[card_id]
 
     @staticmethod
     def from_deck_of_cards_api(api_dict: dict) -> "Card":
@@ -126,7 +223,7 @@ class Card:
     @staticmethod
     def from_code(code: str) -> "Card":
         """
-        # Create a Card object from a code.
+        # Get a Card object from a code.
 
         Args:
         -----
@@ -134,56 +231,32 @@ class Card:
 
         Returns:
         --------
-            Card: A Card object created from the provided code.
+            Card: The shared instance of the card.
 
         Raises:
         -------
             TypeError: If code is not a str.
-            ValueError: If code does not have a length of 2.
+            ValueError: If code does not have a length of 2 or is not a known card.
         """
-        # Checks
+        try:
+            return _BY_CODE[code]
+        except (KeyError, TypeError):
+            pass
+        # Checks (only reached for invalid codes)
         if not isinstance(code, str):
             raise TypeError("code must be a str")
         if len(code) != 2:
             raise ValueError("code must be a string of length 2")
-        # Return
-        value_dict = {
-            "A": "ACE",
-            "K": "KING",
-            "Q": "QUEEN",
-            "J": "JACK",
-            "0": "10",
-            "9": "9",
-            "8": "8",
-            "7": "7",
-            "6": "6",
-            "5": "5",
-            "4": "4",
-            "3": "3",
-            "2": "2",
-        }
-        suits_dict = {
-            "S": "SPADES",
-            "C": "CLUBS",
-            "D": "DIAMONDS",
-            "H": "HEARTS",
-        }
-        value, suit = code[0], code[1]
-        return Card(
-            value_dict[value],
-            suits_dict[suit],
-            code,
-            image=f"https://deckofcardsapi.com/static/img/{code}.png",
-        )
+        raise ValueError(f"'{code}' is not a valid card code")
 
     @staticmethod
     def from_code_string(code_string: str) -> List["Card"]:
         """
-        # Create multiple Card objects from a string of codes.
+        # Get multiple Card objects from a string of codes.
 
         Args:
         -----
-            code (str): A string representing multiple codes of multiple cards.
+            code_string (str): A string representing multiple codes of multiple cards.
 
         Returns:
         --------
@@ -191,8 +264,10 @@ class Card:
 
         Raises:
         -------
-            TypeError: If code is not a str.
-            ValueError: If code does not have a length multiple of 2.
+            TypeError: If code_string is not a str.
+            ValueError:
+                If code_string does not have a length multiple of 2
+                or contains an unknown card code.
         """
         # Checks
         if not isinstance(code_string, str):
@@ -202,28 +277,49 @@ class Card:
                 "code_string must be a string with a length being a multiple of 2"
             )
         # Return
-        codes = [code_string[i : i + 2] for i in range(0, len(code_string), 2)]
-        return [Card.from_code(code) for code in codes]
+        try:
+            return [
+                _BY_CODE[code_string[i : i + 2]] for i in range(0, len(code_string), 2)
+            ]
+        except KeyError as e:
+            raise ValueError(f"'{e.args[0]}' is not a valid card code") from e
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Card objects are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Card objects are immutable")
+
+    def __reduce__(self):
+        # Keep the cards interned when they are pickled (e.g. sent to another process)
+        return (Card.from_id, (self.id,))
 
     def __eq__(self, other: "Card") -> bool:
         # Check
         if not isinstance(other, Card):
             return False
         # Return
-        return self.value == other.value and self.suit == other.suit
+        return self.id == other.id
 
     def __ne__(self, other: "Card") -> bool:
         # Check
         if not isinstance(other, Card):
             return True
         # Return
-        return self.value != other.value or self.suit != other.suit
+        return self.id != other.id
+
+    def __hash__(self) -> int:
+        return self.id
 
     def __str__(self) -> str:
         return self.name
 
     def __repr__(self) -> str:
-        ret = f"Card('{self.value}', '{self.suit}'"
-        if self.code != "??":
-            ret += f", '{self.code}'"
-        return ret + ")"
+        return f"Card('{self.value}', '{self.suit}', '{self.code}')"
+
+
+_RANK_BY_VALUE: Dict[str, int] = {value: rank for rank, value in enumerate(VALUES)}
+_SUIT_BY_NAME: Dict[str, int] = {suit: index for index, suit in enumerate(SUITS)}
+
+CARDS: Tuple[Card, ...] = tuple(Card._create(card_id) for card_id in range(52))
+_BY_CODE: Dict[str, Card] = {card.code: card for card in CARDS}
@@ -1,59 +1,584 @@
 """
-This module represents a deck of cards using the Deck of Cards API.
+This module represents a deck of cards.
 
 It provides a Deck class that allows creating a new deck,
 drawing cards from the deck and shuffling the deck.
+The cards come from a backend:
+- LocalDeckBackend (default): the 52 cards are shuffled in the process,
+  with the random generator of the operating system (as the secrets module),
+  and drawn by slicing. Dealing a hand takes a few microseconds, without any network.
+- RemoteDeckBackend: the cards are drawn from the Deck of Cards API,
+  through one keep-alive HTTP session per process, with bounded retries and
+  a circuit breaker. After repeated failures, the deck goes on with local cards.
+- SeededDeckBackend: the cards are shuffled by a seeded generator, to replay hands.
+  DealStream gives reproducible decks, hand after hand, from a root seed.
+
+DeckPool keeps shuffled decks ready to deal, created by a background thread.
 
 Example usage:
 --------------
-    deck = Deck(deck_id="o9fy1ih84kvx")
+    deck = Deck()
     deck.shuffle()
     cards = deck.draw(5)
     print(cards)
+    board, hands = deck.deal(n_players=4)
+
+    remote_deck = Deck(deck_id="o9fy1ih84kvx", backend="remote")
+    replayed_deck = DealStream(root_seed=42, stream="table-1").deck(hand=17)
 """
 
-from time import sleep
-from typing import List, Optional
+import hashlib
+import os
+import queue
+import random
+import secrets
+import threading
+import time
+from abc import ABC, abstractmethod
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type, Union
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from holdem.game.card import Card
+from holdem.game.card import Card, CARDS
 from holdem.game.hand import Hand
 
+# The URL of the Deck of Cards API can be changed, e.g. to use holdem.game.fake_deck_api
+API_URL = os.environ.get("DECK_API_URL", "https://deckofcardsapi.com/api/deck")
+TIMEOUT = 10
+RETRIES = 2
+DEFAULT_BACKEND = "local"
+
 
 class DeckError(Exception):
     """Base class for exceptions in this module."""
 
 
+class DeckBackend(ABC):
+    """
+    Interface of the sources of cards used by a Deck.
+
+    Attributes:
+    -----------
+        deck_id (Optional[str]): The ID of the deck.
+    """
+
+    def __init__(self, deck_id: Optional[str] = None):
+        """
+        Args:
+        -----
+            deck_id (Optional[str]): The ID of an existing deck. Defaults to None (new deck).
+        """
+        self.deck_id = deck_id
+        if self.deck_id is None:
+            self.new_deck()
+
+    @abstractmethod
+    def new_deck(self):
+        """
+        Create a new shuffled deck of cards and set its ID.
+
+        Raises:
+        -------
+            DeckError: If the deck can't be created.
+        """
+
+    @abstractmethod
+    def draw(self, count: int) -> List[Card]:
+        """
+        Draw cards from the deck (count is checked by the Deck).
+
+        Args:
+        -----
+            count (int): The number of cards to draw, between 1 and 52.
+
+        Returns:
+        --------
+            List[Card]: The drawn cards.
+
+        Raises:
+        -------
+            DeckError: If the cards can't be drawn.
+        """
+
+    @abstractmethod
+    def shuffle(self):
+        """
+        Put all the cards back in the deck and shuffle it.
+
+        Raises:
+        -------
+            DeckError: If the deck can't be shuffled.
+        """
+
+
+class LocalDeckBackend(DeckBackend):
+    """
+    Deck of 52 cards shuffled in the process.
+
+    Attributes:
+    -----------
+        deck_id (str): A random ID (the deck only exists in this object).
+        cards (List[Card]): The shuffled cards.
+        position (int): The number of cards already drawn.
+    """
+
+    # Random generator of the operating system, like the secrets module
+    RANDOM = secrets.SystemRandom()
+
+    def __init__(self, deck_id: Optional[str] = None, exclude: Sequence[Card] = ()):
+        """
+        Args:
+        -----
+            deck_id (Optional[str]): The ID of the deck. Defaults to None (random ID).
+            exclude (Sequence[Card], optional):
+                Cards already drawn, left out of the deck until it is shuffled.
+                Defaults to none.
+        """
+        self.cards: List[Card] = list(CARDS)
+        self.position = 0
+        super().__init__(deck_id)
+        if deck_id is not None:
+            # The cards of a local deck can't be found from its ID: start a new one
+            self.shuffle()
+        if exclude:
+            excluded = set(exclude)
+            self.cards = [card for card in self.cards if card not in excluded]
+
+    def new_deck(self):
+        self.deck_id = secrets.token_hex(6)
+        self.shuffle()
+
+    def draw(self, count: int) -> List[Card]:
+        if self.position + count > len(self.cards):
+            raise DeckError(
+                f"Not enough cards remaining to draw {count} additional cards"
+            )
+        cards = self.cards[self.position : self.position + count]
+        self.position += count
+        return cards
+
+    def shuffle(self):
+        if len(self.cards) != len(CARDS):
+            self.cards = list(CARDS)
+        self.RANDOM.shuffle(self.cards)
+        self.position = 0
+
+
+class SeededDeckBackend(LocalDeckBackend):
+    """
+    Deck of 52 cards shuffled with a seeded generator:
+    the same seed always gives the same cards, shuffle after shuffle.
+
+    Attributes:
+    -----------
+        seed (int): The seed of the deck.
+        random (random.Random): The generator of the shuffles.
+    """
+
+    def __init__(self, seed: int, deck_id: Optional[str] = None):
+        """
+        Args:
+        -----
+            seed (int): The seed of the deck.
+            deck_id (Optional[str]): The ID of the deck. Defaults to None ("seed-<seed>").
+
+        Raises:
+        -------
+            TypeError: If seed is not an int.
+        """
+        # Checks
+        if not isinstance(seed, int):
+            raise TypeError("seed must be an int")
+        # Init
+        self.seed = seed
+        self.random = random.Random(seed)
+        super().__init__(deck_id)
+
+    def new_deck(self):
+        self.deck_id = f"seed-{self.seed}"
+        self.random.seed(self.seed)
+        self.shuffle()
+
+    def shuffle(self):
+        if len(self.cards) != len(CARDS):
+            self.cards = list(CARDS)
+        # Always shuffle the deck from the same order, so the result only depends on the seed
+        self.cards.sort(key=attrgetter("id"))
+        self.random.shuffle(self.cards)
+        self.position = 0
+
+
+def derive_seed(root_seed: int, *keys: Union[int, str]) -> int:
+    """
+    # Derive an independent seed from a root seed and keys (e.g. a stream and a hand number).
+    The streams of different keys don't overlap, whatever the number of hands drawn from each.
+
+    Args:
+    -----
+        root_seed (int): The seed of the whole session.
+        keys (Union[int, str]): The path of the derived seed.
+
+    Returns:
+    --------
+        int: A 64-bit seed.
+    """
+    path = "/".join(str(key) for key in (root_seed,) + keys)
+    digest = hashlib.blake2b(path.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class DealStream:
+    """
+    Reproducible sequence of decks: the deck of hand n in the stream s is seeded with
+    derive_seed(root_seed, s, n). Giving one stream to each table or worker process keeps
+    a whole session reproducible, and any hand can be dealt again from its number.
+
+    Attributes:
+    -----------
+        root_seed (int): The seed of the session.
+        stream (Union[int, str]): The key of the stream (e.g. a table or worker index).
+        hand (int): The number of the next hand.
+    """
+
+    def __init__(self, root_seed: int, stream: Union[int, str] = 0, hand: int = 0):
+        """
+        Args:
+        -----
+            root_seed (int): The seed of the session.
+            stream (Union[int, str], optional): The key of the stream. Defaults to 0.
+            hand (int, optional): The number of the first hand. Defaults to 0.
+        """
+        self.root_seed = root_seed
+        self.stream = stream
+        self.hand = hand
+
+    def deck(self, hand: int) -> "Deck":
+        """
+        # Get the deck of a hand of the stream.
+
+        Args:
+        -----
+            hand (int): The number of the hand.
+
+        Returns:
+        --------
+            Deck: The seeded deck of the hand.
+        """
+        return Deck(
+            backend=SeededDeckBackend(derive_seed(self.root_seed, self.stream, hand))
+        )
+
+    def next_deck(self) -> "Deck":
+        """
+        # Get the deck of the next hand of the stream.
+
+        Returns:
+        --------
+            Deck: The seeded deck of the hand.
+        """
+        deck = self.deck(self.hand)
+        self.hand += 1
+        return deck
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing service: after `threshold` consecutive failures
+    the circuit is open and the calls are refused, until `reset_timeout` seconds
+    have passed and one call is let through to check if the service is back.
+
+    Attributes:
+    -----------
+        threshold (int): Number of consecutive failures opening the circuit.
+        reset_timeout (float): Seconds before a call is tried again.
+        failures (int): Number of consecutive failures.
+        opened_at (Optional[float]): When the circuit was opened (None if closed).
+    """
+
+    def __init__(self, threshold: int = 3, reset_timeout: float = 30.0):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """
+        # Getter for the state of the circuit.
+
+        Returns:
+        --------
+            bool: True if the calls are refused.
+        """
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        """
+        # Check if a call can be made.
+
+        Returns:
+        --------
+            bool: True if the circuit is closed, or if it is time to try again.
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Half-open: let this call through, the next ones wait again
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        """
+        # Close the circuit after a successful call.
+        """
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        """
+        # Count a failed call, and open the circuit after too many of them.
+        """
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+# One HTTP session (keeping its connections alive) per process,
+# and one circuit breaker per API
+_SESSION: Tuple[int, Optional[requests.Session]] = (0, None)
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+
+
+def get_session() -> requests.Session:
+    """
+    # Get the HTTP session of the process, with bounded retries on server errors.
+
+    Returns:
+    --------
+        requests.Session: The session shared by the remote decks of the process.
+    """
+    global _SESSION  # pylint: disable=global-statement
+    pid, session = _SESSION
+    if session is None or pid != os.getpid():
+        # A forked process must not share the connections of its parent
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            max_retries=Retry(
+                total=RETRIES,
+                backoff_factor=0.1,
+                status_forcelist=(500, 502, 503, 504),
+                allowed_methods=("GET",),
+            ),
+            pool_maxsize=10,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _SESSION = (os.getpid(), session)
+    return session
+
+
+def get_circuit_breaker(base_url: str) -> CircuitBreaker:
+    """
+    # Get the circuit breaker of an API.
+
+    Args:
+    -----
+        base_url (str): The URL of the API.
+
+    Returns:
+    --------
+        CircuitBreaker: The circuit breaker shared by the remote decks using this API.
+    """
+    return _BREAKERS.setdefault(base_url, CircuitBreaker())
+
+
+class RemoteDeckBackend(DeckBackend):
+    """
+    Deck of cards of the Deck of Cards API.
+
+    The requests go through the HTTP session of the process and the circuit breaker of the API.
+    When the circuit is open (the API failed repeatedly), the deck goes on
+    with a local deck, without the cards already drawn from the API.
+
+    Attributes:
+    -----------
+        deck_id (str): The ID of the deck in the API.
+        base_url (str): The URL of the API.
+        timeout (float): Timeout of the requests, in seconds.
+        drawn (List[Card]): The cards drawn since the last shuffle.
+        fallback (Optional[LocalDeckBackend]): The local deck used once the API failed.
+    """
+
+    def __init__(
+        self,
+        deck_id: Optional[str] = None,
+        base_url: Optional[str] = None,
+        timeout: float = TIMEOUT,
+    ):
+        """
+        Args:
+        -----
+            deck_id (Optional[str]): The ID of an existing deck. Defaults to None (new deck).
+            base_url (Optional[str]): The URL of the API. Defaults to API_URL.
+            timeout (float, optional): Timeout of the requests, in seconds. Defaults to TIMEOUT.
+        """
+        self.base_url = (base_url or API_URL).rstrip("/")
+        self.timeout = timeout
+        self.breaker = get_circuit_breaker(self.base_url)
+        self.drawn: List[Card] = []
+        self.fallback: Optional[LocalDeckBackend] = None
+        super().__init__(deck_id)
+
+    def _request(self, path: str, name: str) -> dict:
+        """
+        # Send a request to the API.
+
+        Args:
+        -----
+            path (str): The path of the endpoint, after base_url.
+            name (str): The name of the request, for the error messages.
+
+        Returns:
+        --------
+            dict: The JSON response.
+
+        Raises:
+        -------
+            DeckError: If the circuit is open or if the request is not successful.
+        """
+        if not self.breaker.allow():
+            raise DeckError(f"{self.base_url} is unavailable (circuit open)")
+        try:
+            response = get_session().get(
+                f"{self.base_url}/{path}", timeout=self.timeout
+            )
+            response.raise_for_status()
+            data = response.json()
+        except Exception as e:
+            self.breaker.record_failure()
+            raise DeckError(e) from e
+        self.breaker.record_success()
+        if not data.get("success"):
+            raise DeckError(f"API says the {name} request was not successful.")
+        return data
+
+    def _call(self, remote: Callable[[], Any], local: Callable[[], Any]) -> Any:
+        """
+        # Call the API, or the local deck if the API failed repeatedly.
+
+        Args:
+        -----
+            remote (Callable[[], Any]): The call to the API.
+            local (Callable[[], Any]): The same call to the local deck.
+
+        Returns:
+        --------
+            Any: The result of the call.
+        """
+        if self.fallback is None:
+            try:
+                return remote()
+            except DeckError:
+                if not self.breaker.is_open:
+                    raise
+                print(f"{self.base_url} is unavailable: using a local deck")
+                self.fallback = LocalDeckBackend(exclude=self.drawn)
+        return local()
+
+    def new_deck(self):
+        def remote():
+            self.deck_id = self._request("new/shuffle/", "new deck")["deck_id"]
+            self.drawn = []
+
+        def local():
+            self.fallback.new_deck()
+            self.deck_id = self.fallback.deck_id
+
+        self._call(remote, local)
+
+    def draw(self, count: int) -> List[Card]:
+        def remote():
+            data = self._request(
+                f"{self.deck_id}/draw/?count={count}", f"draw ({count})"
+            )
+            cards = [Card.from_deck_of_cards_api(card) for card in data["cards"]]
+            self.drawn.extend(cards)
+            return cards
+
+        return self._call(remote, lambda: self.fallback.draw(count))
+
+    def shuffle(self):
+        def remote():
+            self._request(f"{self.deck_id}/shuffle/", "shuffle")
+            self.drawn = []
+
+        self._call(remote, lambda: self.fallback.shuffle())
+
+
+BACKENDS: Dict[str, Type[DeckBackend]] = {
+    "local": LocalDeckBackend,
+    "remote": RemoteDeckBackend,
+}
+
+
 class Deck:
     """
-    Represents a deck of cards using the Deck of Cards API.
+    Represents a deck of cards.
 
     Attributes:
     -----------
         deck_id (str): The ID of the deck.
+        backend (DeckBackend): The source of the cards.
     """
 
-    def __init__(self, deck_id: Optional[str] = None):
+    def __init__(
+        self,
+        deck_id: Optional[str] = None,
+        backend: Union[str, DeckBackend] = DEFAULT_BACKEND,
+    ):
         """
-        Initialize a Deck object. If no deck_id is provided, a new deck is created in the API.
+        Initialize a Deck object. If no deck_id is provided, a new deck is created.
 
         Args:
         -----
             deck_id (Optional[str]): The ID of an existing deck. Defaults to None.
+            backend (Union[str, DeckBackend], optional):
+                The name of the backend ("local" or "remote") or a backend object
+                (deck_id is then ignored). Defaults to DEFAULT_BACKEND.
 
         Raises:
         -------
             TypeError: If deck_id is not a string or None.
+            ValueError: If backend is not a known backend name.
+            DeckError: If the new deck can't be created.
         """
         # Checks
         if deck_id is not None and not isinstance(deck_id, str):
             raise TypeError("Deck ID must be a string (or None)")
+        if isinstance(backend, str) and backend not in BACKENDS:
+            raise ValueError(f"Backend must be one of {', '.join(BACKENDS)}")
         # Init
-        self.deck_id = deck_id
-        if self.deck_id is None:
-            self.new_deck()
-        # else:
-        #     print(f"> Using existing deck: '{self.deck_id}'\n")
+        if isinstance(backend, str):
+            backend = BACKENDS[backend](deck_id)
+        self.backend = backend
+
+    @property
+    def deck_id(self) -> Optional[str]:
+        """
+        # Getter for the ID of the deck.
+
+        Returns:
+        --------
+            Optional[str]: The ID of the deck.
+        """
+        return self.backend.deck_id
 
     def new_deck(self):
         """
@@ -63,17 +588,7 @@ class Deck:
         -------
             DeckError: If the new deck request is not successful.
         """
-        try:
-            response = requests.get(
-                "https://deckofcardsapi.com/api/deck/new/shuffle", timeout=10
-            )
-            data = response.json()
-            if not data["success"]:
-                raise DeckError("API says the new deck request was not successful.")
-        except Exception as e:
-            raise DeckError(e) from e
-        # print("> New deck:", data)
-        self.deck_id = data["deck_id"]
+        self.backend.new_deck()
 
     def draw(self, count: int) -> List[Card]:
         """
@@ -102,24 +617,43 @@ class Deck:
             return []
         if not 1 <= count <= 52:
             raise ValueError("Count must be between 0 and 52")
-        # Request
-        try:
-            response = requests.get(
-                f"https://deckofcardsapi.com/api/deck/{self.deck_id}/draw/?count={count}",
-                timeout=10,
-            )
-            data = response.json()
-            if not data["success"]:
-                raise DeckError(
-                    f"API says the draw ({count}) request was not successful."
-                )
-        except Exception as e:
-            raise DeckError(e) from e
-        cards = [Card.from_deck_of_cards_api(card_dict) for card_dict in data["cards"]]
-        # print(
-        #     f"> Draw ({count}):", ", ".join([card.unicode for card in cards]), cards
-        # )
-        return cards
+        # Draw
+        return self.backend.draw(count)
+
+    def deal(
+        self, n_players: int, board: int = 5
+    ) -> Tuple[List[Card], List[List[Card]]]:
+        """
+        Deal a whole hand: the community cards and 2 cards per player,
+        drawn at once from the backend (one slice, or one request to the API).
+
+        Args:
+        -----
+            n_players (int): The number of players.
+            board (int, optional): The number of community cards. Defaults to 5.
+
+        Returns:
+        --------
+            Tuple[List[Card], List[List[Card]]]:
+                - List[Card]: The community cards.
+                - List[List[Card]]: The 2 cards of each player.
+
+        Raises:
+        -------
+            TypeError: If n_players or board is not an integer.
+            ValueError: If there are not enough cards in a deck for the hand.
+            DeckError: If draw request is not successful.
+        """
+        # Checks
+        if not isinstance(n_players, int) or not isinstance(board, int):
+            raise TypeError("n_players and board must be integers")
+        if n_players < 0 or board < 0 or board + 2 * n_players > 52:
+            raise ValueError("There are not enough cards in a deck for this hand")
+        # Deal
+        cards = self.draw(board + 2 * n_players)
+        return cards[:board], [
+            cards[board + 2 * i : board + 2 * i + 2] for i in range(n_players)
+        ]
 
     def shuffle(self):
         """
@@ -133,17 +667,8 @@ class Deck:
         # Checks
         if self.deck_id is None:
             raise ValueError("No deck exists")
-        # Request
-        try:
-            response = requests.get(
-                f"https://deckofcardsapi.com/api/deck/{self.deck_id}/shuffle/",
-                timeout=10,
-            )
-            data = response.json()
-            if not data["success"]:
-                raise DeckError("API says the shuffle request was not successful.")
-        except Exception as e:
-            raise DeckError(e) from e
+        # Shuffle
+        self.backend.shuffle()
 
     def __str__(self) -> str:
         return f"Deck with ID: {self.deck_id}"
@@ -152,8 +677,149 @@ class Deck:
         return f"Deck('{self.deck_id}')"
 
 
+class DeckPool:
+    """
+    Bounded pool of shuffled decks, ready to deal.
+
+    A daemon thread creates the decks ahead of demand (which may need the network
+    with the remote backend), so taking one is O(1). When the pool is empty
+    (a miss), the deck is created by the caller. Each deck is given out once:
+    the pool never deals the same shuffle twice, even in a forked process
+    (the decks created by the parent process are dropped).
+
+    Attributes:
+    -----------
+        size (int): The maximum number of ready decks.
+        factory (Callable[[], Deck]): Creates a new shuffled deck.
+        hits (int): Number of decks taken from the pool.
+        misses (int): Number of decks created by the caller because the pool was empty.
+        refills (int): Number of decks created.
+        refill_seconds (float): Total time spent creating the decks.
+        max_refill_seconds (float): Longest time spent creating a deck.
+        errors (int): Number of decks that could not be created by the thread.
+    """
+
+    def __init__(self, factory: Callable[[], Deck] = Deck, size: int = 8):
+        """
+        Args:
+        -----
+            factory (Callable[[], Deck], optional):
+                Creates a new shuffled deck. Defaults to Deck (a new local deck).
+            size (int, optional): The maximum number of ready decks. Defaults to 8.
+
+        Raises:
+        -------
+            ValueError: If size is not positive.
+        """
+        # Checks
+        if size < 1:
+            raise ValueError("size must be positive")
+        # Init
+        self.size = size
+        self.factory = factory
+        self.hits = 0
+        self.misses = 0
+        self.refills = 0
+        self.refill_seconds = 0.0
+        self.max_refill_seconds = 0.0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._pid = 0
+        self._queue: "queue.Queue[Deck]" = queue.Queue(maxsize=size)
+        self._thread: Optional[threading.Thread] = None
+
+    def _create(self) -> Deck:
+        """
+        # Create a new deck and measure the time it took.
+        """
+        start = time.perf_counter()
+        deck = self.factory()
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.refills += 1
+            self.refill_seconds += elapsed
+            self.max_refill_seconds = max(self.max_refill_seconds, elapsed)
+        return deck
+
+    def _refill(self, ready: "queue.Queue[Deck]"):
+        """
+        # Keep the pool full (run by the thread).
+        """
+        while True:
+            try:
+                deck = self._create()
+            except DeckError:
+                with self._lock:
+                    self.errors += 1
+                time.sleep(1)
+                continue
+            ready.put(deck)
+
+    def _start(self):
+        """
+        # Start the thread filling the pool, once per process.
+        """
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # First call in this process: decks inherited from a parent are not used
+            self._pid = os.getpid()
+            self._queue = queue.Queue(maxsize=self.size)
+            self._thread = threading.Thread(
+                target=self._refill, args=(self._queue,), daemon=True
+            )
+            self._thread.start()
+
+    def take(self) -> Deck:
+        """
+        # Take a shuffled deck, from the pool if one is ready.
+
+        Returns:
+        --------
+            Deck: A deck that was never given out before.
+
+        Raises:
+        -------
+            DeckError: If the pool is empty and the deck can't be created.
+        """
+        self._start()
+        try:
+            deck = self._queue.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                self.misses += 1
+            return self._create()
+        with self._lock:
+            self.hits += 1
+        return deck
+
+    def stats(self) -> Dict[str, float]:
+        """
+        # Get the metrics of the pool.
+
+        Returns:
+        --------
+            Dict[str, float]: The hits, misses, hit ratio, ready decks,
+            refills, mean and max refill latency (in seconds) and refill errors.
+        """
+        with self._lock:
+            taken = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / taken if taken else 0.0,
+                "ready": self._queue.qsize(),
+                "refills": self.refills,
+                "mean_refill_seconds": (
+                    self.refill_seconds / self.refills if self.refills else 0.0
+                ),
+                "max_refill_seconds": self.max_refill_seconds,
+                "errors": self.errors,
+            }
+
+
 if __name__ == "__main__":
-    deck = Deck(deck_id="o9fy1ih84kvx")
+    deck = Deck(deck_id="o9fy1ih84kvx", backend="remote")
 
     STEPS = 30
     COUNT = 7
@@ -163,4 +829,4 @@ if __name__ == "__main__":
         print(hand)
         deck.shuffle()
         print()  # Empty line
-        sleep(5)
+        time.sleep(5)
@@ -0,0 +1,618 @@
+# pylint: disable=W0622
+# W0622: Redefining built-in 'round'
+#   => Irrelevant as round() will never be used here (there are no floats)
+
+"""
+This module contains the rules of a Texas Hold'em round, independent from the database.
+
+The state of a table is a plain Python object (TableState, with one Seat per player),
+and the transitions are functions modifying it in place: the blinds, the actions,
+the moves to the next player and to the next stage, and the showdown.
+Each transition also appends its events to the state (TableState.events), as compact lists
+that holdem.game.history can apply again to rebuild the state, for the hand history.
+holdem.game.game loads the state of a Round from the database, applies the transitions
+and saves the state once, and simulations can run the same rules without any database.
+
+Classes:
+- Seat: A player seated at the table.
+- TableState: The state of a table during a round.
+
+Functions:
+- sit: Seat a new player at the table.
+- leave: Remove a player from the table.
+- take_seats: Shift the dealer position.
+- deal: Deal the community cards and the hole cards.
+- prepare_round: Prepare a new round (seats, cards, blinds, first player).
+- pay_blind: Place a blind.
+- next_player: Move to the next player's turn.
+- next_stage: Move to the next stage of the round.
+- next_stage_check: Move to the next stage if the betting round is over.
+- filter_players: Filter the active players and the players that can bet.
+- check_action: Check the validity of an action.
+- do_action: Perform the action of a player.
+- stakes: Get the contributions and the hands of the players, to split the pots.
+- resolve_round: Determine the winners of the round and distribute the pot.
+"""
+
+from dataclasses import astuple, dataclass, field
+from enum import Enum
+from operator import attrgetter
+from typing import List, Optional, Sequence, Tuple
+
+from holdem.game.card import Card
+from holdem.game.deck import Deck
+from holdem.game.hand import FinalHand, Hand
+from holdem.game.pots import Stake, side_pots
+
+INACTIVE_ACTIONS = ("fold", "spectator")
+
+
+class Stage(Enum):
+    """
+    # Enumeration representing different stages of a round in Texas Hold'em.
+    """
+
+    WAITING = 0
+    PRE_FLOP = 1
+    FLOP = 2
+    TURN = 3
+    RIVER = 4
+    SHOWDOWN = 5
+    FINISHED_EARLY = 6
+
+
+@dataclass(slots=True)
+class Seat:
+    """
+    # A player seated at the table (the game fields of a User).
+
+    Attributes:
+    -----------
+        user_id (int): The ID of the user.
+        name (str): The username.
+        chips (int): The chips in front of the player.
+        bet (int): The chips bet during the current stage.
+        total_bet (int): The chips bet during the whole round.
+        hand (str): The codes of the hole cards.
+        action (str): The last action ("", "call", "fold", "spectator", blinds or raise amount).
+        order (int): The position of the player (-1 when he is not seated).
+    """
+
+    user_id: int
+    name: str = ""
+    chips: int = 1000
+    bet: int = 0
+    total_bet: int = 0
+    hand: str = ""
+    action: str = ""
+    order: int = -1
+
+
+@dataclass(slots=True)
+class TableState:
+    """
+    # The state of a table during a round (the fields of a Round and its players).
+
+    Attributes:
+    -----------
+        round_id (int): The ID of the round.
+        seats (List[Seat]): The players of the round.
+        stage (int): The stage of the round (a Stage value).
+        pot (int): The chips in the pot.
+        blind (int): The small blind.
+        min_raise (int): The minimum raise.
+        player_to_play (int): The user ID of the player to play (0 if none).
+        board (str): The codes of the 5 community cards.
+        winners_name (str): The names of the winners, once the round is resolved.
+        winner_hand (str): The name of the best hand, once the round is resolved.
+        departed (List[Seat]):
+            Players who left the round after putting chips in the pot
+            (they can't win, but their chips are in the pots).
+        events (List[list]): The events of the round not saved yet (see holdem.game.history).
+    """
+
+    round_id: int = 0
+    seats: List[Seat] = field(default_factory=list)
+    stage: int = Stage.WAITING.value
+    pot: int = 0
+    blind: int = 25
+    min_raise: int = 25
+    player_to_play: int = 0
+    board: str = ""
+    winners_name: str = ""
+    winner_hand: str = ""
+    departed: List[Seat] = field(default_factory=list)
+    events: List[list] = field(default_factory=list)
+
+    def seat(self, user_id: int) -> Seat:
+        """
+        # Get the seat of a player.
+
+        Args:
+        -----
+            user_id (int): The ID of the user.
+
+        Returns:
+        --------
+            Seat: The seat of the player.
+
+        Raises:
+        -------
+            ValueError: If the player is not in the round.
+        """
+        for seat in self.seats:
+            if seat.user_id == user_id:
+                return seat
+        raise ValueError(f"Player {user_id} is not in the round")
+
+    @property
+    def current_bet(self) -> int:
+        """
+        # Getter for the highest bet of the current stage.
+
+        Returns:
+        --------
+            int: The highest bet.
+        """
+        return max((seat.bet for seat in self.seats), default=0)
+
+    def by_order(self) -> List[Seat]:
+        """
+        # Get the seats sorted by order (the players who are not seated first).
+
+        Returns:
+        --------
+            List[Seat]: The sorted seats.
+        """
+        return sorted(self.seats, key=attrgetter("order"))
+
+    def snapshot(self) -> list:
+        """
+        # Get the state as a compact list (without the events), to be saved as JSON.
+
+        Returns:
+        --------
+            list: The fields of the state, with a list of fields per seat.
+        """
+        return [
+            self.round_id,
+            [list(astuple(seat)) for seat in self.seats],
+            self.stage,
+            self.pot,
+            self.blind,
+            self.min_raise,
+            self.player_to_play,
+            self.board,
+            self.winners_name,
+            self.winner_hand,
+            [list(astuple(seat)) for seat in self.departed],
+        ]
+
+    @classmethod
+    def from_snapshot(cls, data: list) -> "TableState":
+        """
+        # Create a state from a snapshot.
+
+        Args:
+        -----
+            data (list): A list returned by snapshot.
+
+        Returns:
+        --------
+            TableState: The state.
+        """
+        state = cls(*data)
+        state.seats = [Seat(*fields) for fields in state.seats]
+        state.departed = [Seat(*fields) for fields in state.departed]
+        return state
+
+
+def sit(state: TableState, seat: Seat):
+    """
+    # Seat a new player at the table (he is a spectator until the next round).
+
+    Args:
+    -----
+        - state (TableState): The state of the table.
+        - seat (Seat): The seat of the new player.
+    """
+    state.seats.append(seat)
+    state.events.append(["sit", list(astuple(seat))])
+
+
+def leave(state: TableState, user_id: int):
+    """
+    # Remove a player from the table (his chips stay in the pot).
+    If it is his turn, the next player plays.
+
+    Args:
+    -----
+        - state (TableState): The state of the table.
+        - user_id (int): The ID of the user leaving.
+    """
+    if state.player_to_play == user_id:
+        next_player(state)
+    seat = state.seat(user_id)
+    state.seats.remove(seat)
+    if seat.total_bet > 0:
+        state.departed.append(seat)
+    state.events.append(["leave", user_id])
+
+
+def take_seats(state: TableState):
+    """
+    # Shift the dealer position: the seated players move by one position,
+    and the new players take the last positions.
+
+    Args:
+    -----
+        state (TableState): The state of the table.
+    """
+    seated = sorted(
+        (seat for seat in state.seats if seat.order >= 0), key=attrgetter("order")
+    )
+    players = seated + [seat for seat in state.seats if seat.order < 0]
+    for i, seat in enumerate(players):
+        seat.order = (i + 1) % len(players)
+
+
+def deal(state: TableState, deck: Deck):
+    """
+    # Deal the community cards and 2 cards per player (in the order of the seats).
+
+    Args:
+    -----
+        - state (TableState): The state of the table.
+        - deck (Deck): The shuffled deck.
+    """
+    seats = sorted(state.seats, key=attrgetter("order", "user_id"))
+    board, hands = deck.deal(len(seats))
+    state.board = "".join(card.code for card in board)
+    for seat, hand in zip(seats, hands):
+        seat.action = ""
+        seat.hand = "".join(card.code for card in hand)
+    state.events.append(
+        ["deal", state.board, [[seat.user_id, seat.order, seat.hand] for seat in seats]]
+    )
+
+
+def prepare_round(state: TableState, deck: Deck):
+    """
+    # Prepare a new round of Texas Hold'em.
+
+    - Shifts the dealer position.
+    - Deals cards to players.
+    - Sets blinds.
+    - Determines the player to play first.
+
+    Args:
+    -----
+        - state (TableState): The state of the table.
+        - deck (Deck): The shuffled deck.
+    """
+    # The table at the beginning of the hand, from which the hand can be replayed
+    state.events.append(["hand", state.snapshot()])
+    state.stage = Stage.PRE_FLOP.value
+    state.events.append(["stage", state.stage])
+    take_seats(state)
+    deal(state, deck)
+
+    # Set the blinds
+    players = state.by_order()
+    if len(players) == 2:
+        # In a two player game, the dealer is the small blind and the other player is the big blind
+        # The dealer is the one who starts in the pre-flop
+        sb, bb = players
+        if sb.bet == 0:
+            pay_blind(state, sb, state.blind, "small blind")
+        if bb.bet == 0:
+            pay_blind(state, bb, state.blind * 2, "big blind")
+        if sb.chips > 0:
+            state.player_to_play = sb.user_id
+            state.events.append(["turn", state.player_to_play])
+        elif bb.chips > 0:
+            state.player_to_play = bb.user_id
+            state.events.append(["turn", state.player_to_play])
+        else:
+            # Rare case where the players are all-in by the blinds
+            state.stage = Stage.SHOWDOWN.value
+            state.events.append(["stage", state.stage])
+    else:
+        sb, bb = players[1], players[2]
+        if sb.bet == 0:
+            pay_blind(state, sb, state.blind, "small blind")
+        if bb.bet == 0:
+            pay_blind(state, bb, state.blind * 2, "big blind")
+        for i in [0] + list(range(3, len(players))):
+            players[i].action = ""
+        state.player_to_play = players[3 % len(players)].user_id
+        state.events.append(["turn", state.player_to_play])
+
+
+def pay_blind(state: TableState, seat: Seat, blind: int, action: str):
+    """
+    # Place a blind in the current round.
+
+    Args:
+    -----
+        - state (TableState): The state of the table.
+        - seat (Seat): The player placing the blind.
+        - blind (int): The amount of chips bet by the player due to the blind.
+        - action (str): The name of the blind ("small blind" or "big blind").
+
+    Raises:
+    -------
+        TypeError: If blind or action is not the expected type.
+    """
+    # Checks
+    if not isinstance(blind, int):
+        raise TypeError("blind must be an int")
+    if not isinstance(action, str):
+        raise TypeError("action must be a string")
+    # Update
+    seat.action = action
+    blind = min(blind, seat.chips)
+    seat.bet += blind
+    seat.total_bet += blind
+    seat.chips -= blind
+    state.pot += blind
+    state.events.append(["blind", seat.user_id, action, blind])
+
+
+def next_player(state: TableState):
+    """
+    # Move to the next player's turn in the round
+    (the players who folded, are spectators or are all-in are skipped).
+
+    Args:
+    -----
+        state (TableState): The state of the table.
+
+    Raises:
+    -------
+        ValueError: If the player to play is not seated.
+    """
+    ordered = sorted(
+        (seat for seat in state.seats if seat.order >= 0), key=attrgetter("order")
+    )
+    n = len(ordered)
+    for i, seat in enumerate(ordered):
+        if seat.user_id == state.player_to_play:
+            next_seat = ordered[(i + 1) % n]
+            for j in range(2, len(state.seats)):
+                if next_seat.action in INACTIVE_ACTIONS or next_seat.chips == 0:
+                    next_seat = ordered[(i + j) % n]
+                else:
+                    break
+            state.player_to_play = next_seat.user_id
+            state.events.append(["turn", state.player_to_play])
+            return
+    # Should never happen : if the user that is the player_to_play is removed,
+    #   player_to_play should have been updated before
+    raise ValueError("Player to play not found in the round's players")
+
+
+def next_stage(state: TableState):
+    """
+    # Move to the next stage of the round.
+
+    Args:
+    -----
+        state (TableState): The state of the table.
+    """
+    state.stage += 1
+    for seat in state.seats:
+        seat.bet = 0
+    for seat in filter_players(state)[1]:
+        seat.action = ""
+    if state.stage < Stage.SHOWDOWN.value:
+        # From the dealer (the spectators who joined during the round are not seated)
+        seated = [seat for seat in state.by_order() if seat.order >= 0]
+        state.player_to_play = seated[0].user_id
+    state.min_raise = state.blind
+    state.events.append(["street", state.stage])
+    next_player(state)
+
+
+def next_stage_check(state: TableState):
+    """
+    # Checks if the round should go to the next stage, and makes it do so if true.
+
+    Args:
+    -----
+        state (TableState): The state of the table.
+    """
+    active_players, betting_players = filter_players(state)
+    if len(betting_players) < 2:
+        # If there are <2 players able to bet, the round is finished
+        if len(active_players) <= 1:
+            # If there is only 1 active player (or less), the round is finished early
+            state.stage = Stage.FINISHED_EARLY.value
+        else:
+            # Else a showdown is necessary
+            state.stage = Stage.SHOWDOWN.value
+        state.events.append(["stage", state.stage])
+        return
+    # If all players have same bet, go to next stage
+    bets = {seat.bet for seat in betting_players}
+    if len(bets) == 1:
+        actions = {seat.action for seat in betting_players}
+        if bets.pop() == 0:
+            # Need to check if all bets are 0 because everyone checked,
+            # not because of the reset due to moving to the stage
+            if "" not in actions:
+                next_stage(state)
+        elif "big blind" not in actions:
+            # Big blind plays again even if everyone called
+            next_stage(state)
+
+
+def filter_players(state: TableState) -> Tuple[List[Seat], List[Seat]]:
+    """
+    # Filter the players based on if they are active and if they can bet.
+
+    Args:
+    -----
+        state (TableState): The state of the table.
+
+    Returns:
+    --------
+    Tuple[List[Seat], List[Seat]]:
+        - List[Seat]: The active players (players who have not folded or become spectators).
+        - List[Seat]: The betting players (active players who have chips greater than 0).
+    """
+    active_players = [
+        seat for seat in state.seats if seat.action not in INACTIVE_ACTIONS
+    ]
+    betting_players = [seat for seat in active_players if seat.chips > 0]
+    return active_players, betting_players
+
+
+def check_action(state: TableState, seat: Seat, action: str) -> Tuple[bool, str]:
+    """
+    # Checks that the action is possible.
+
+    Args:
+    -----
+        - state (TableState): The state of the table.
+        - seat (Seat): The player taking the action.
+        - action (str): The action taken by the player.
+
+    Returns:
+    --------
+    Tuple[bool, str]:
+        - bool: If the action is valid
+        - str: An error message if the action is invalid
+
+    Raises:
+    -------
+        TypeError: If action is not a string
+    """
+    # Checks
+    if not isinstance(action, str):
+        raise TypeError("action must be an integer or a string")
+    # If the action is an integer, it represents a raise amount
+    if action.isdigit():
+        raise_amount = int(action)
+        user_cost = state.current_bet + raise_amount - seat.bet
+        # Verify that the player has enough chips to make the raise
+        if user_cost > seat.chips:
+            return False, "You don't have enough chips"
+        # Verify that the raise amount is at least the minimum raise
+        # except if the raise makes the player all-in
+        if raise_amount < state.min_raise and user_cost != seat.chips:
+            return False, "Raise must be at least " + str(state.min_raise)
+    return True, ""
+
+
+def do_action(state: TableState, seat: Seat, action: str):
+    """
+    # Perform an action for a player.
+
+    Args:
+    -----
+        - state (TableState): The state of the table.
+        - seat (Seat): The player performing the action.
+        - action (str): The action to be performed ("call", "fold",
+            or digits representing the amount to raise).
+    """
+    seat.action = action
+    if action == "call":
+        amount = min(state.current_bet - seat.bet, seat.chips)
+    elif action.isdigit():
+        amount = state.current_bet - seat.bet + int(action)
+        state.min_raise = int(action)
+    else:
+        amount = 0
+    state.events.append(["act", seat.user_id, action, amount])
+    seat.bet += amount
+    seat.total_bet += amount
+    seat.chips -= amount
+    state.pot += amount
+
+
+def stakes(state: TableState, final_hands: Sequence[FinalHand]) -> List[Stake]:
+    """
+    # Get the stakes of the players (see holdem.game.pots),
+    from the first player after the dealer, so the odd chips go to him first.
+
+    Args:
+    -----
+        - state (TableState): The state of the table.
+        - final_hands (Sequence[FinalHand]): The final hands of the seats.
+
+    Returns:
+    --------
+        List[Stake]: The stakes, whose seats are the indices in state.seats + state.departed.
+    """
+    n_seated = max(sum(seat.order >= 0 for seat in state.seats), 1)
+    seats = sorted(
+        range(len(state.seats)),
+        key=lambda i: (
+            (state.seats[i].order - 1) % n_seated
+            if state.seats[i].order >= 0
+            else n_seated
+        ),
+    )
+    result = [
+        Stake(
+            i,
+            state.seats[i].total_bet,
+            state.seats[i].action in INACTIVE_ACTIONS,
+            final_hands[i],
+        )
+        for i in seats
+    ]
+    result += [
+        Stake(len(state.seats) + i, seat.total_bet, True)
+        for i, seat in enumerate(state.departed)
+    ]
+    return result
+
+
+def resolve_round(state: TableState, final_hands: Optional[Sequence[FinalHand]] = None):
+    """
+    # Determine the winners of the round & distribute the pot.
+    A player can only win the amount of chips he has contributed to the pot from each other player
+    (see holdem.game.pots.side_pots).
+
+    Args:
+    -----
+        - state (TableState): The state of the table.
+        - final_hands (Optional[Sequence[FinalHand]], optional):
+            The final hands of the seats, if already known. Defaults to None.
+    """
+    # Determine the final hands
+    if final_hands is None:
+        board = Card.from_code_string(state.board)
+        final_hands = [
+            Hand(Card.from_code_string(seat.hand) + board).final_hand
+            for seat in state.seats
+        ]
+
+    # Separate the different pots and distribute the chips
+    pots, payouts = side_pots(stakes(state, final_hands))
+    for index, chips in payouts.items():
+        state.seats[index].chips += chips
+    main_pot = next((pot for pot in pots if pot.winners), None)
+    if len(filter_players(state)[0]) > 1 and main_pot is not None:
+        # The best hand shown is the one winning the main pot (the first one with winners)
+        state.winner_hand = final_hands[main_pot.winners[0]].name
+
+    # Reset the players' bets
+    for seat in state.seats + state.departed:
+        seat.bet = 0
+        seat.total_bet = 0
+
+    # Set the winners
+    state.winners_name = ", ".join(
+        seat.name for index, seat in enumerate(state.seats) if index in payouts
+    )
+    state.events.append(
+        [
+            "win",
+            state.winners_name,
+            state.winner_hand,
+            [[state.seats[index].user_id, chips] for index, chips in payouts.items()],
+        ]
+    )
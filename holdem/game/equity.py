@@ -0,0 +1,505 @@
+"""
+This module computes the equity of Texas Hold'em hands.
+
+The equity of a player is the share of the pot he wins on average:
+a win counts for 1, a tie between k players counts for 1/k.
+It is estimated by dealing random runouts of the board
+(the missing community cards) and evaluating every hand with the lookup table evaluator.
+
+On the flop and the turn, every runout can be enumerated to get the exact equities.
+The enumeration keeps the rank histogram and the suit masks of each player
+(hole cards + board) and only adds or removes one card between two boards.
+
+Otherwise the runouts are split in batches dealt by a pool of processes,
+each batch with its own random generator seeded from the root seed.
+The computation stops when the requested number of runouts is dealt,
+when the time budget is spent or when the confidence interval is tight enough.
+
+Classes:
+- EquityResult: Wins, ties and equities of the players.
+
+Functions:
+- exact_equity: Compute the exact equities by enumerating every runout.
+- monte_carlo_equity: Estimate the equities by dealing random runouts.
+
+Example usage:
+--------------
+    python -m holdem.game.equity ASKS QHQD --board 2C7D9H --samples 200000
+"""
+
+import math
+import os
+import random
+import secrets
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import List, Optional, Sequence, Tuple
+
+from holdem.game.card import Card
+from holdem.game.deck import derive_seed
+from holdem.game.evaluator import evaluate_counts, evaluate_ids
+
+# Above this number of hand evaluations, exact_equity falls back to sampling
+MAX_EXACT_EVALUATIONS = 2_000_000
+
+# z-score of a 95% confidence interval
+Z_95 = 1.96
+
+# (wins, ties, shares, squared shares, samples) of a batch of runouts
+BatchResult = Tuple[List[int], List[int], List[float], List[float], int]
+
+
+class EquityResult:
+    """
+    # Wins, ties and equities of the players, accumulated over runouts of the board.
+
+    Attributes:
+    -----------
+        hands (List[List[Card]]): The hole cards of each player.
+        board (List[Card]): The known community cards.
+        wins (List[int]): Number of runouts won alone by each player.
+        ties (List[int]): Number of runouts tied by each player.
+        shares (List[float]): Sum of the pot shares won by each player.
+        squares (List[float]): Sum of the squared pot shares (for the confidence interval).
+        samples (int): Number of runouts.
+        exact (bool): If every possible runout was evaluated once.
+        elapsed (float): Duration of the computation, in seconds.
+    """
+
+    def __init__(self, hands: List[List[Card]], board: List[Card], exact: bool = False):
+        """
+        Args:
+        -----
+            hands (List[List[Card]]): The hole cards of each player.
+            board (List[Card]): The known community cards.
+            exact (bool, optional): If every runout is evaluated. Defaults to False.
+        """
+        self.hands = hands
+        self.board = board
+        self.wins = [0] * len(hands)
+        self.ties = [0] * len(hands)
+        self.shares = [0.0] * len(hands)
+        self.squares = [0.0] * len(hands)
+        self.samples = 0
+        self.exact = exact
+        self.elapsed = 0.0
+
+    def add(self, batch: BatchResult):
+        """
+        # Merge the result of a batch of runouts.
+
+        Args:
+        -----
+            batch (BatchResult): Wins, ties, shares, squared shares and number of runouts.
+        """
+        wins, ties, shares, squares, samples = batch
+        for i in range(len(self.hands)):
+            self.wins[i] += wins[i]
+            self.ties[i] += ties[i]
+            self.shares[i] += shares[i]
+            self.squares[i] += squares[i]
+        self.samples += samples
+
+    @property
+    def equities(self) -> List[float]:
+        """
+        # Getter for the equity of each player.
+
+        Returns:
+        --------
+            List[float]: Average share of the pot won by each player (sums to 1).
+        """
+        if self.samples == 0:
+            return [0.0] * len(self.hands)
+        return [share / self.samples for share in self.shares]
+
+    def confidence_interval(self, z: float = Z_95) -> float:
+        """
+        # Half-width of the confidence interval of the least precise equity.
+
+        Args:
+        -----
+            z (float, optional): z-score of the interval. Defaults to 1.96 (95%).
+
+        Returns:
+        --------
+            float: The half-width (0 for an exact result, infinity without runouts).
+        """
+        if self.exact:
+            return 0.0
+        if self.samples < 2:
+            return math.inf
+        half_width = 0.0
+        for share, square in zip(self.shares, self.squares):
+            mean = share / self.samples
+            variance = max(square / self.samples - mean * mean, 0.0)
+            half_width = max(half_width, z * math.sqrt(variance / self.samples))
+        return half_width
+
+    @property
+    def boards_per_second(self) -> float:
+        """
+        # Getter for the number of runouts evaluated per second.
+
+        Returns:
+        --------
+            float: Runouts per second (0 if nothing was timed).
+        """
+        return self.samples / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self) -> str:
+        lines = []
+        for hand, equity, wins, ties in zip(
+            self.hands, self.equities, self.wins, self.ties
+        ):
+            lines.append(
+                f"{''.join(card.code for card in hand)}: {equity:7.2%}"
+                f" (win {wins / max(self.samples, 1):7.2%},"
+                f" tie {ties / max(self.samples, 1):7.2%})"
+            )
+        kind = "exact" if self.exact else f"± {self.confidence_interval():.2%}"
+        lines.append(
+            f"{self.samples} runouts ({kind}) in {self.elapsed:.2f}s"
+            f" - {self.boards_per_second:,.0f} boards/s"
+        )
+        return "\n".join(lines)
+
+
+def check_cards(
+    hands: List[List[Card]], board: List[Card], dead: List[Card]
+) -> List[int]:
+    """
+    # Check the known cards of an equity calculation.
+
+    Args:
+    -----
+        hands (List[List[Card]]): The hole cards of each player (2 to 10 players).
+        board (List[Card]): The known community cards (0 to 5).
+        dead (List[Card]): Cards that can't be dealt.
+
+    Returns:
+    --------
+        List[int]: Ids of the cards that can still be dealt.
+
+    Raises:
+    -------
+        TypeError: If the cards are not lists of Card objects.
+        ValueError: If the number of players or cards is invalid or if a card is repeated.
+    """
+    # Checks
+    if not isinstance(hands, list) or not all(isinstance(h, list) for h in hands):
+        raise TypeError("hands must be a list of lists of cards")
+    if not 2 <= len(hands) <= 10:
+        raise ValueError("There must be between 2 and 10 players")
+    if any(len(hand) != 2 for hand in hands):
+        raise ValueError("Each player must have 2 hole cards")
+    if len(board) > 5:
+        raise ValueError("The board can't have more than 5 cards")
+    known = [card for hand in hands for card in hand] + board + dead
+    if not all(isinstance(card, Card) for card in known):
+        raise TypeError("All cards must be Card objects")
+    if len({card.id for card in known}) != len(known):
+        raise ValueError("A card can't be used twice")
+    # Return
+    known_ids = {card.id for card in known}
+    return [card_id for card_id in range(52) if card_id not in known_ids]
+
+
+def score_runout(
+    hole_ids: Sequence[List[int]], board_ids: List[int], batch: BatchResult
+):
+    """
+    # Evaluate one complete board for every player and add the result to a batch.
+
+    Args:
+    -----
+        hole_ids (Sequence[List[int]]): Ids of the hole cards of each player.
+        board_ids (List[int]): Ids of the 5 community cards.
+        batch (BatchResult): The batch to update (its sample count is not changed).
+    """
+    score_strengths([evaluate_ids(hole + board_ids) for hole in hole_ids], batch)
+
+
+def score_strengths(strengths: List[int], batch: BatchResult):
+    """
+    # Add the result of one complete board to a batch, given the strength of each player.
+
+    Args:
+    -----
+        strengths (List[int]): The strength of the hand of each player.
+        batch (BatchResult): The batch to update (its sample count is not changed).
+    """
+    wins, ties, shares, squares, _ = batch
+    best = max(strengths)
+    winners = [i for i, strength in enumerate(strengths) if strength == best]
+    if len(winners) == 1:
+        wins[winners[0]] += 1
+        shares[winners[0]] += 1.0
+        squares[winners[0]] += 1.0
+    else:
+        share = 1.0 / len(winners)
+        for i in winners:
+            ties[i] += 1
+            shares[i] += share
+            squares[i] += share * share
+
+
+def simulate_batch(
+    hole_ids: List[List[int]],
+    board_ids: List[int],
+    deck_ids: List[int],
+    samples: int,
+    seed: int,
+) -> BatchResult:
+    """
+    # Deal and evaluate a batch of random runouts (run in the worker processes).
+
+    Args:
+    -----
+        hole_ids (List[List[int]]): Ids of the hole cards of each player.
+        board_ids (List[int]): Ids of the known community cards.
+        deck_ids (List[int]): Ids of the cards that can be dealt.
+        samples (int): Number of runouts.
+        seed (int): Seed of the random generator of the batch.
+
+    Returns:
+    --------
+        BatchResult: Wins, ties, shares, squared shares and number of runouts.
+    """
+    rng = random.Random(seed)
+    n_players = len(hole_ids)
+    batch: BatchResult = (
+        [0] * n_players,
+        [0] * n_players,
+        [0.0] * n_players,
+        [0.0] * n_players,
+        samples,
+    )
+    missing = 5 - len(board_ids)
+    for _ in range(samples):
+        score_runout(hole_ids, board_ids + rng.sample(deck_ids, missing), batch)
+    return batch
+
+
+def exact_equity(
+    hands: List[List[Card]],
+    board: Optional[List[Card]] = None,
+    dead: Optional[List[Card]] = None,
+    max_evaluations: int = MAX_EXACT_EVALUATIONS,
+    **monte_carlo_kwargs,
+) -> EquityResult:
+    """
+    # Compute the exact equity of each player by enumerating every runout of the board.
+    If there are more than max_evaluations hands to evaluate (e.g. preflop),
+    the equities are estimated by monte_carlo_equity instead.
+
+    Args:
+    -----
+        hands (List[List[Card]]): The hole cards of each player (2 to 10 players).
+        board (List[Card], optional): The known community cards. Defaults to no card.
+        dead (List[Card], optional): Cards that can't be dealt. Defaults to no card.
+        max_evaluations (int, optional):
+            Maximum number of boards times players to enumerate.
+            Defaults to MAX_EXACT_EVALUATIONS.
+        **monte_carlo_kwargs: Arguments of monte_carlo_equity, used for the fallback.
+
+    Returns:
+    --------
+        EquityResult: The wins, ties and equities of the players (exact if enumerated).
+
+    Raises:
+    -------
+        TypeError: If the cards are not lists of Card objects.
+        ValueError: If the number of players or cards is invalid.
+    """
+    # Checks
+    board = list(board or [])
+    dead = list(dead or [])
+    deck_ids = check_cards(hands, board, dead)
+    missing = 5 - len(board)
+    if len(deck_ids) < missing:
+        raise ValueError("Not enough cards left to complete the board")
+    if math.comb(len(deck_ids), missing) * len(hands) > max_evaluations:
+        return monte_carlo_equity(hands, board, dead, **monte_carlo_kwargs)
+    # Init: rank histogram and suit masks of each player, with the known board
+    start = time.perf_counter()
+    states: List[Tuple[List[int], List[int]]] = []
+    for hand in hands:
+        counts = [0] * 13
+        suit_masks = [0] * 4
+        for card in hand + board:
+            counts[card.rank] += 1
+            suit_masks[card.suit_index] |= card.rank_bit
+        states.append((counts, suit_masks))
+    n_players = len(hands)
+    batch: BatchResult = (
+        [0] * n_players,
+        [0] * n_players,
+        [0.0] * n_players,
+        [0.0] * n_players,
+        0,
+    )
+
+    def walk(first: int, remaining: int) -> int:
+        # Add each possible next card to every state, then remove it
+        if remaining == 0:
+            score_strengths(
+                [
+                    evaluate_counts(counts, suit_masks, 7)
+                    for counts, suit_masks in states
+                ],
+                batch,
+            )
+            return 1
+        boards = 0
+        for index in range(first, len(deck_ids) - remaining + 1):
+            card_id = deck_ids[index]
+            rank, suit, bit = card_id >> 2, card_id & 3, 1 << (card_id >> 2)
+            for counts, suit_masks in states:
+                counts[rank] += 1
+                suit_masks[suit] |= bit
+            boards += walk(index + 1, remaining - 1)
+            for counts, suit_masks in states:
+                counts[rank] -= 1
+                suit_masks[suit] ^= bit
+        return boards
+
+    n_boards = walk(0, missing)
+    result = EquityResult(hands, board, exact=True)
+    result.add(batch[:4] + (n_boards,))
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def monte_carlo_equity(
+    hands: List[List[Card]],
+    board: Optional[List[Card]] = None,
+    dead: Optional[List[Card]] = None,
+    samples: int = 100_000,
+    workers: Optional[int] = None,
+    time_budget: Optional[float] = None,
+    target_ci: Optional[float] = None,
+    seed: Optional[int] = None,
+    batch_size: int = 5_000,
+) -> EquityResult:
+    """
+    # Estimate the equity of each player by dealing random runouts of the board.
+
+    Args:
+    -----
+        hands (List[List[Card]]): The hole cards of each player (2 to 10 players).
+        board (List[Card], optional): The known community cards. Defaults to no card.
+        dead (List[Card], optional): Cards that can't be dealt. Defaults to no card.
+        samples (int, optional): Maximum number of runouts. Defaults to 100000.
+        workers (int, optional):
+            Number of worker processes. Defaults to the number of CPUs.
+            With 0 or 1, the runouts are dealt in the current process.
+        time_budget (float, optional): Maximum duration in seconds. Defaults to None.
+        target_ci (float, optional):
+            Stop when the 95% confidence interval of every equity is narrower than ± target_ci.
+            Defaults to None.
+        seed (int, optional): Root seed, for reproducible results. Defaults to a random seed.
+        batch_size (int, optional): Number of runouts per task. Defaults to 5000.
+
+    Returns:
+    --------
+        EquityResult: The wins, ties and equities of the players.
+
+    Raises:
+    -------
+        TypeError: If the cards are not lists of Card objects.
+        ValueError: If the number of players, cards or samples is invalid.
+    """
+    # Checks
+    board = list(board or [])
+    dead = list(dead or [])
+    deck_ids = check_cards(hands, board, dead)
+    if samples < 1 or batch_size < 1:
+        raise ValueError("samples and batch_size must be positive")
+    if len(deck_ids) < 5 - len(board):
+        raise ValueError("Not enough cards left to complete the board")
+    # Init
+    start = time.perf_counter()
+    hole_ids = [[card.id for card in hand] for hand in hands]
+    board_ids = [card.id for card in board]
+    root_seed = secrets.randbits(64) if seed is None else seed
+    result = EquityResult(hands, board)
+    sizes = [min(batch_size, samples - i) for i in range(0, samples, batch_size)]
+
+    def done() -> bool:
+        if time_budget is not None and time.perf_counter() - start >= time_budget:
+            return True
+        return target_ci is not None and result.confidence_interval() <= target_ci
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        for index, size in enumerate(sizes):
+            result.add(
+                simulate_batch(
+                    hole_ids, board_ids, deck_ids, size, derive_seed(root_seed, index)
+                )
+            )
+            if done():
+                break
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = set()
+            next_index = 0
+            while next_index < len(sizes) or pending:
+                # Keep two batches per worker in flight
+                while next_index < len(sizes) and len(pending) < 2 * workers:
+                    pending.add(
+                        executor.submit(
+                            simulate_batch,
+                            hole_ids,
+                            board_ids,
+                            deck_ids,
+                            sizes[next_index],
+                            derive_seed(root_seed, next_index),
+                        )
+                    )
+                    next_index += 1
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    result.add(future.result())
+                if done():
+                    for future in pending:
+                        future.cancel()
+                    break
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compute the equity of poker hands.")
+    parser.add_argument(
+        "hands", nargs="+", help="Hole cards of each player (e.g. ASKD)"
+    )
+    parser.add_argument("--board", default="", help="Known community cards")
+    parser.add_argument("--dead", default="", help="Cards that can't be dealt")
+    parser.add_argument("--samples", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--time-budget", type=float, default=None)
+    parser.add_argument("--target-ci", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--exact", action="store_true", help="Enumerate every runout when possible"
+    )
+    args = parser.parse_args()
+
+    calculator = exact_equity if args.exact else monte_carlo_equity
+    print(
+        calculator(
+            [Card.from_code_string(hand.upper()) for hand in args.hands],
+            board=Card.from_code_string(args.board.upper()),
+            dead=Card.from_code_string(args.dead.upper()),
+            samples=args.samples,
+            workers=args.workers,
+            time_budget=args.time_budget,
+            target_ci=args.target_ci,
+            seed=args.seed,
+        )
+    )
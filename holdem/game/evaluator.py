@@ -0,0 +1,453 @@
+"""
+This module contains a table-driven evaluator for 5, 6 and 7 card hands.
+
+Every hand is mapped to one integer strength, from 1 (7-5-4-3-2 high card)
+to 7462 (royal flush): comparing two hands is a single int comparison.
+The strength only depends on the best 5-card hand, so two hands with the same
+strength are tied.
+
+The evaluation uses two lookup tables:
+- FLUSH: indexed by the 13-bit rank mask of the flush suit (8192 entries).
+  With 7 cards or less, a hand holding a flush can't hold anything better
+  than what its flush suit provides, so this table is enough in that case.
+- NOFLUSH: indexed by a perfect hash of the rank histogram
+  (13 counts between 0 and 4 summing to the number of cards).
+  The hash ranks the histogram among all the histograms with the same sum,
+  so the table has no hole (6175 + 18395 + 49205 entries for 5, 6 and 7 cards).
+
+The tables are generated by `generate_table` (or `python -m holdem.game.evaluator`)
+and stored as little-endian uint16 in `holdem/game/data/hand_ranks.bin`,
+which is memory-mapped at import.
+
+Functions:
+- evaluate: Evaluate a list of Card objects.
+- evaluate_ids: Evaluate a sequence of card ids (0..51).
+- evaluate_counts: Evaluate a rank histogram and the per-suit rank masks.
+- hand_power: Get the FinalHandPower value of a strength.
+- decode_rank: Get the FinalHandPower value and the ranks of the 5 cards of a strength.
+- generate_table: Generate the lookup table file.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from holdem.game.card import Card
+
+TABLE_PATH = os.path.join(os.path.dirname(__file__), "data", "hand_ranks.bin")
+TABLE_MAGIC = b"HRNK"
+TABLE_VERSION = 1
+# magic, version, number of FLUSH entries, number of NOFLUSH entries (+ padding)
+TABLE_HEADER = struct.Struct("<4sHII2x")
+
+MIN_CARDS = 5
+MAX_CARDS = 7
+N_RANKS = 13
+MAX_STRENGTH = 7462
+
+# Values of FinalHandPower (not imported to keep this module independent from hand.py)
+HIGH_CARD = 0
+ONE_PAIR = 1
+TWO_PAIRS = 2
+THREE_OF_A_KIND = 3
+STRAIGHT = 4
+FLUSH = 5
+FULL_HOUSE = 6
+FOUR_OF_A_KIND = 7
+STRAIGHT_FLUSH = 8
+ROYAL_FLUSH = 9
+
+# Ranks (0 for "2" to 12 for "ACE") of the 10 straights, from the wheel to the broadway
+STRAIGHTS: Tuple[Tuple[int, ...], ...] = ((3, 2, 1, 0, 12),) + tuple(
+    tuple(range(top, top - 5, -1)) for top in range(4, 13)
+)
+
+
+def _hand_classes() -> List[Tuple[int, Tuple[int, ...]]]:
+    """
+    # Enumerate the 7462 distinct 5-card hands, from the weakest to the strongest.
+
+    Returns:
+    --------
+        List[Tuple[int, Tuple[int, ...]]]:
+            For each hand, its FinalHandPower value and the ranks of its 5 cards,
+            ordered like FinalHand.value (e.g. pair first, then kickers).
+    """
+    straight_sets = {frozenset(straight) for straight in STRAIGHTS}
+    high_cards = [
+        ranks
+        for ranks in combinations(range(N_RANKS - 1, -1, -1), 5)
+        if frozenset(ranks) not in straight_sets
+    ]
+    high_cards.reverse()
+    classes: List[Tuple[int, Tuple[int, ...]]] = []
+    classes += [(HIGH_CARD, ranks) for ranks in high_cards]
+    for pair in range(N_RANKS):
+        others = [rank for rank in range(N_RANKS - 1, -1, -1) if rank != pair]
+        kickers = list(combinations(others, 3))
+        kickers.reverse()
+        classes += [(ONE_PAIR, (pair, pair) + kicker) for kicker in kickers]
+    for high in range(N_RANKS):
+        for low in range(high):
+            for kicker in range(N_RANKS):
+                if kicker not in (high, low):
+                    classes.append((TWO_PAIRS, (high, high, low, low, kicker)))
+    for trips in range(N_RANKS):
+        others = [rank for rank in range(N_RANKS - 1, -1, -1) if rank != trips]
+        kickers = list(combinations(others, 2))
+        kickers.reverse()
+        classes += [(THREE_OF_A_KIND, (trips,) * 3 + kicker) for kicker in kickers]
+    classes += [(STRAIGHT, straight) for straight in STRAIGHTS]
+    classes += [(FLUSH, ranks) for ranks in high_cards]
+    for trips in range(N_RANKS):
+        for pair in range(N_RANKS):
+            if pair != trips:
+                classes.append((FULL_HOUSE, (trips,) * 3 + (pair,) * 2))
+    for quads in range(N_RANKS):
+        for kicker in range(N_RANKS):
+            if kicker != quads:
+                classes.append((FOUR_OF_A_KIND, (quads,) * 4 + (kicker,)))
+    classes += [(STRAIGHT_FLUSH, straight) for straight in STRAIGHTS[:-1]]
+    classes.append((ROYAL_FLUSH, STRAIGHTS[-1]))
+    return classes
+
+
+# CLASSES[strength - 1] is the hand of this strength
+CLASSES: List[Tuple[int, Tuple[int, ...]]] = _hand_classes()
+# First strength of each FinalHandPower value
+POWER_FLOORS: List[int] = [
+    next(i + 1 for i, (power, _) in enumerate(CLASSES) if power == hand_power)
+    for hand_power in range(ROYAL_FLUSH + 1)
+]
+
+
+def _quinary_counts() -> List[List[int]]:
+    """
+    # Count the rank histograms.
+
+    Returns:
+    --------
+        List[List[int]]:
+            counts[n][k] is the number of histograms over n ranks
+            (each count between 0 and 4) summing to k, for k <= MAX_CARDS.
+    """
+    counts = [[1] + [0] * MAX_CARDS]
+    for n in range(1, N_RANKS + 1):
+        counts.append(
+            [
+                sum(counts[n - 1][k - c] for c in range(min(k, 4) + 1))
+                for k in range(MAX_CARDS + 1)
+            ]
+        )
+    return counts
+
+
+_COUNTS = _quinary_counts()
+# HASH_STEP[(rank * 5 + count) * 8 + remaining] is the number of histograms over the ranks
+# >= rank, summing to `remaining`, which have less than `count` cards of this rank
+HASH_STEP: List[int] = [
+    sum(
+        _COUNTS[N_RANKS - 1 - rank][remaining - c]
+        for c in range(count)
+        if c <= remaining
+    )
+    for rank in range(N_RANKS)
+    for count in range(5)
+    for remaining in range(MAX_CARDS + 1)
+]
+# Offset of the hands of n cards in the NOFLUSH table
+NOFLUSH_OFFSETS: Dict[int, int] = {
+    n: sum(_COUNTS[N_RANKS][k] for k in range(MIN_CARDS, n))
+    for n in range(MIN_CARDS, MAX_CARDS + 1)
+}
+NOFLUSH_SIZE = sum(_COUNTS[N_RANKS][k] for k in range(MIN_CARDS, MAX_CARDS + 1))
+FLUSH_SIZE = 1 << N_RANKS
+
+# Each card adds 1 << (3 * suit) to the suit hash: 3 bits per suit can count up to 7 cards
+_SUIT_ADD: Tuple[int, ...] = tuple(1 << (3 * (card_id & 3)) for card_id in range(52))
+# _FLUSH_SUIT[suit_hash] is the suit having at least 5 cards, or -1
+_FLUSH_SUIT: Tuple[int, ...] = tuple(
+    next((suit for suit in range(4) if (suit_hash >> (3 * suit)) & 7 >= 5), -1)
+    for suit_hash in range(1 << 12)
+)
+
+
+def quinary_hash(counts: Sequence[int], n_cards: int) -> int:
+    """
+    # Perfect hash of a rank histogram, among the histograms with the same number of cards.
+
+    Args:
+    -----
+        counts (Sequence[int]): Number of cards of each rank (13 values between 0 and 4).
+        n_cards (int): Sum of counts.
+
+    Returns:
+    --------
+        int: Index of the histogram, between 0 and (number of histograms of n_cards) - 1.
+    """
+    index = 0
+    remaining = n_cards
+    step = HASH_STEP
+    for rank in range(N_RANKS):
+        count = counts[rank]
+        if count:
+            index += step[(rank * 5 + count) * 8 + remaining]
+            remaining -= count
+            if not remaining:
+                break
+    return index
+
+
+def _best_five(ranks: Tuple[int, ...], flush: bool, strengths: dict) -> int:
+    """
+    # Strength of the best 5-card hand among the given ranks.
+
+    Args:
+    -----
+        ranks (Tuple[int, ...]): Ranks of the cards (5 to 7).
+        flush (bool): If all the cards are of the same suit.
+        strengths (dict): Strength of each (sorted ranks, flush) 5-card hand.
+
+    Returns:
+    --------
+        int: The best strength.
+    """
+    return max(
+        strengths[(tuple(sorted(five, reverse=True)), flush)]
+        for five in combinations(ranks, 5)
+    )
+
+
+def build_table() -> Tuple[array, array]:
+    """
+    # Compute the FLUSH and NOFLUSH tables.
+
+    Returns:
+    --------
+        Tuple[array, array]: The FLUSH and NOFLUSH tables (uint16 arrays).
+    """
+    strengths: dict = {}
+    for strength, (hand_power, ranks) in enumerate(CLASSES, start=1):
+        flush = hand_power in (FLUSH, STRAIGHT_FLUSH, ROYAL_FLUSH)
+        strengths[(tuple(sorted(ranks, reverse=True)), flush)] = strength
+
+    flush_table = array("H", [0]) * FLUSH_SIZE
+    for mask in range(FLUSH_SIZE):
+        ranks = tuple(rank for rank in range(N_RANKS) if mask >> rank & 1)
+        if MIN_CARDS <= len(ranks) <= MAX_CARDS:
+            flush_table[mask] = _best_five(ranks, True, strengths)
+
+    noflush_table = array("H", [0]) * NOFLUSH_SIZE
+
+    def fill(rank: int, counts: List[int], remaining: int, n_cards: int):
+        if rank == N_RANKS:
+            if remaining == 0:
+                ranks = tuple(r for r in range(N_RANKS) for _ in range(counts[r]))
+                index = NOFLUSH_OFFSETS[n_cards] + quinary_hash(counts, n_cards)
+                noflush_table[index] = _best_five(ranks, False, strengths)
+            return
+        for count in range(min(remaining, 4) + 1):
+            counts[rank] = count
+            fill(rank + 1, counts, remaining - count, n_cards)
+        counts[rank] = 0
+
+    for n_cards in range(MIN_CARDS, MAX_CARDS + 1):
+        fill(0, [0] * N_RANKS, n_cards, n_cards)
+    return flush_table, noflush_table
+
+
+def generate_table(path: str = TABLE_PATH):
+    """
+    # Generate the lookup table file.
+
+    Args:
+    -----
+        path (str, optional): Where to write the table. Defaults to TABLE_PATH.
+    """
+    flush_table, noflush_table = build_table()
+    if sys.byteorder != "little":
+        flush_table.byteswap()
+        noflush_table.byteswap()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(
+            TABLE_HEADER.pack(
+                TABLE_MAGIC, TABLE_VERSION, len(flush_table), len(noflush_table)
+            )
+        )
+        file.write(flush_table.tobytes())
+        file.write(noflush_table.tobytes())
+
+
+def load_table(path: str = TABLE_PATH) -> Tuple[Sequence[int], Sequence[int]]:
+    """
+    # Load the lookup tables, memory-mapping the table file.
+    If the file does not exist, the tables are computed in memory (a few seconds).
+
+    Args:
+    -----
+        path (str, optional): The table file. Defaults to TABLE_PATH.
+
+    Returns:
+    --------
+        Tuple[Sequence[int], Sequence[int]]: The FLUSH and NOFLUSH tables.
+
+    Raises:
+    -------
+        ValueError: If the file is not a valid table file.
+    """
+    if not os.path.exists(path):
+        return build_table()
+    with open(path, "rb") as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, flush_size, noflush_size = TABLE_HEADER.unpack_from(mapped)
+    if (magic, version, flush_size, noflush_size) != (
+        TABLE_MAGIC,
+        TABLE_VERSION,
+        FLUSH_SIZE,
+        NOFLUSH_SIZE,
+    ):
+        raise ValueError(f"{path} is not a valid hand rank table (version {version})")
+    start = TABLE_HEADER.size
+    middle = start + 2 * flush_size
+    if sys.byteorder != "little":
+        flush_table = array("H", mapped[start:middle])
+        noflush_table = array("H", mapped[middle : middle + 2 * noflush_size])
+        flush_table.byteswap()
+        noflush_table.byteswap()
+        return flush_table, noflush_table
+    view = memoryview(mapped)
+    return view[start:middle].cast("H"), view[middle : middle + 2 * noflush_size].cast(
+        "H"
+    )
+
+
+FLUSH_TABLE, NOFLUSH_TABLE = load_table()
+
+
+def evaluate_ids(card_ids: Sequence[int]) -> int:
+    """
+    # Evaluate a hand given as card ids.
+
+    Args:
+    -----
+        card_ids (Sequence[int]): Ids of 5 to 7 distinct cards (Card.id, 0..51).
+
+    Returns:
+    --------
+        int: Strength of the hand, between 1 and MAX_STRENGTH (higher is better).
+    """
+    suit_hash = 0
+    counts = [0] * N_RANKS
+    for card_id in card_ids:
+        suit_hash += _SUIT_ADD[card_id]
+        counts[card_id >> 2] += 1
+    flush_suit = _FLUSH_SUIT[suit_hash]
+    if flush_suit >= 0:
+        mask = 0
+        for card_id in card_ids:
+            if card_id & 3 == flush_suit:
+                mask |= 1 << (card_id >> 2)
+        return FLUSH_TABLE[mask]
+    n_cards = len(card_ids)
+    return NOFLUSH_TABLE[NOFLUSH_OFFSETS[n_cards] + quinary_hash(counts, n_cards)]
+
+
+def evaluate(cards: Iterable[Card]) -> int:
+    """
+    # Evaluate a hand.
+
+    Args:
+    -----
+        cards (Iterable[Card]): 5 to 7 distinct cards.
+
+    Returns:
+    --------
+        int: Strength of the hand, between 1 and MAX_STRENGTH (higher is better).
+
+    Raises:
+    -------
+        ValueError: If the number of cards is not between 5 and 7.
+    """
+    card_ids = [card.id for card in cards]
+    if not MIN_CARDS <= len(card_ids) <= MAX_CARDS:
+        raise ValueError("Only hands of 5 to 7 cards can be evaluated")
+    return evaluate_ids(card_ids)
+
+
+def evaluate_counts(
+    counts: Sequence[int], suit_masks: Sequence[int], n_cards: Optional[int] = None
+) -> int:
+    """
+    # Evaluate a hand given as a rank histogram and the rank mask of each suit.
+    Useful when the histogram is maintained incrementally.
+
+    Args:
+    -----
+        counts (Sequence[int]): Number of cards of each rank (13 values, summing to 5..7).
+        suit_masks (Sequence[int]): 13-bit rank mask of each suit (4 values).
+        n_cards (int, optional): Sum of counts, if already known. Defaults to None.
+
+    Returns:
+    --------
+        int: Strength of the hand, between 1 and MAX_STRENGTH (higher is better).
+    """
+    for mask in suit_masks:
+        if mask.bit_count() >= MIN_CARDS:
+            return FLUSH_TABLE[mask]
+    if n_cards is None:
+        n_cards = sum(counts)
+    return NOFLUSH_TABLE[NOFLUSH_OFFSETS[n_cards] + quinary_hash(counts, n_cards)]
+
+
+def hand_power(strength: int) -> int:
+    """
+    # Get the power of a hand from its strength.
+
+    Args:
+    -----
+        strength (int): Strength of the hand (1..MAX_STRENGTH).
+
+    Returns:
+    --------
+        int: The FinalHandPower value of the hand.
+    """
+    return bisect_right(POWER_FLOORS, strength) - 1
+
+
+def decode_rank(strength: int) -> Tuple[int, Tuple[int, ...]]:
+    """
+    # Get the power and the ranks of the 5 cards of a hand from its strength.
+
+    Args:
+    -----
+        strength (int): Strength of the hand (1..MAX_STRENGTH).
+
+    Returns:
+    --------
+        Tuple[int, Tuple[int, ...]]:
+            - int: The FinalHandPower value of the hand.
+            - Tuple[int, ...]: The ranks (0..12) of the cards, ordered like FinalHand.value.
+
+    Raises:
+    -------
+        TypeError: If strength is not an int.
+        ValueError: If strength is not between 1 and MAX_STRENGTH.
+    """
+    # Checks
+    if not isinstance(strength, int):
+        raise TypeError("strength must be an int")
+    if not 1 <= strength <= MAX_STRENGTH:
+        raise ValueError(f"strength must be between 1 and {MAX_STRENGTH}")
+    # Return
+    return CLASSES[strength - 1]
+
+
+if __name__ == "__main__":
+    generate_table()
+    print(f"Hand rank table written to {TABLE_PATH}")
@@ -0,0 +1,393 @@
+# pylint: disable=W0622, E1101
+# W0622: Redefining built-in 'round'
+#   => Irrelevant as round() will never be used here (there are no floats)
+# E1101: Class 'Round' has no 'objects' member
+#   => This is a false positive, as the objects function is provided by Django.
+
+"""
+This module exports the hand histories of the rounds, from their events
+(see holdem.models.HandEvent and holdem.game.history).
+
+The events are read in one query, streamed by chunks (iterator), and each hand is formatted
+as soon as its last event is read, so exporting any number of hands uses constant memory.
+Two formats are available: JSON lines (one JSON object per hand) and the text format
+of the PokerStars hand histories, read by the usual hand trackers.
+
+Functions:
+- select_rounds: Select the rounds of a date range, a player or a table.
+- hand_records: Build the records of the hands of the rounds, from their events.
+- to_json: Format a hand record as a JSON line.
+- to_pokerstars: Format a hand record as a PokerStars hand history.
+- export_hands: Export the hands of rounds in a format.
+
+Constants:
+- FORMATS: The export formats, with their function and their content type.
+- STREETS: The names of the streets and the number of community cards revealed on them.
+"""
+
+import json
+from datetime import date, datetime, timezone
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, Iterator, Optional
+
+from django.db.models import Min, Q
+from django.utils import timezone as django_timezone
+from holdem.game import history
+from holdem.game.engine import Stage, TableState
+from holdem.models import HandEvent, Round
+
+STREETS = {
+    Stage.FLOP.value: ("FLOP", 3),
+    Stage.TURN.value: ("TURN", 4),
+    Stage.RIVER.value: ("RIVER", 5),
+}
+
+
+def select_rounds(
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    player: Optional[str] = None,
+    table: Optional[int] = None,
+):
+    """
+    # Select the resolved rounds started in a date range, played by a player or at a table
+    (the hands still in play are never exported: their hole cards are secret).
+
+    Args:
+    -----
+        - since (Optional[date], optional): The first day. Defaults to None (no limit).
+        - until (Optional[date], optional): The last day. Defaults to None (no limit).
+        - player (Optional[str], optional): The username of a player,
+            including if he left the round. Defaults to None (all players).
+        - table (Optional[int], optional): The ID of a table. Defaults to None (all tables).
+
+    Returns:
+    --------
+        QuerySet: The rounds, annotated with the time of their first event (started).
+    """
+    rounds = Round.objects.annotate(started=Min("events__created")).filter(
+        started__isnull=False, stage__gte=Stage.SHOWDOWN.value
+    )
+    if since is not None:
+        rounds = rounds.filter(started__date__gte=since)
+    if until is not None:
+        rounds = rounds.filter(started__date__lte=until)
+    if player is not None:
+        rounds = rounds.filter(
+            Q(players__username=player) | Q(contributions__user__username=player)
+        )
+    if table is not None:
+        rounds = rounds.filter(table_id=table)
+    return rounds
+
+
+def _card(code: str) -> str:
+    """
+    # Convert the code of a card (e.g. "0H") to the PokerStars notation (e.g. "Th").
+    """
+    return ("T" if code[0] == "0" else code[0]) + code[1].lower()
+
+
+def _cards(codes: str) -> str:
+    """
+    # Convert the codes of cards to the PokerStars notation, separated by spaces.
+    """
+    return " ".join(_card(codes[i : i + 2]) for i in range(0, len(codes), 2))
+
+
+def _utc(created: datetime) -> datetime:
+    """
+    # Convert the time of an event to UTC (the times are naive, in the time zone
+    of the settings, when USE_TZ is False).
+    """
+    if django_timezone.is_naive(created):
+        created = django_timezone.make_aware(
+            created, django_timezone.get_default_timezone()
+        )
+    return created.astimezone(timezone.utc)
+
+
+def _hand_record(round_id: int, rows) -> Optional[Dict]:
+    """
+    # Build the record of the hand of a round by applying its events again,
+    or None if the round has no hand (it never started) or is not resolved yet.
+    """
+    state = TableState(round_id=round_id)
+    record = None
+    resolved = False
+    for _, table, max_seats, created, data in rows:
+        event = history.decode(data)
+        kind = event[0]
+        if kind == "hand":
+            record = {
+                "round": round_id,
+                "table": table,
+                "max_seats": max_seats,
+                "started": _utc(created).isoformat(sep=" ", timespec="seconds"),
+                "blind": event[1][4],
+                "players": [],
+                "board": "",
+                "actions": [],
+                "shown": {},
+                "pot": 0,
+                "payouts": {},
+                "winner_hand": "",
+            }
+        elif record is None:
+            history.apply_event(state, event)
+            continue
+        elif kind == "deal":
+            # The seats keep the order of the IDs of the players from hand to hand,
+            # and the dealer (order 0) has the button
+            dealt = sorted(event[2])
+            record["players"] = [
+                {
+                    "name": state.seat(user_id).name,
+                    "seat": seat,
+                    "chips": state.seat(user_id).chips,
+                    "hand": hand,
+                }
+                for seat, (user_id, _, hand) in enumerate(dealt, 1)
+            ]
+            record["button"] = next(
+                seat for seat, (_, order, _) in enumerate(dealt, 1) if order == 0
+            )
+            record["board"] = event[1]
+            record["street"] = Stage.PRE_FLOP.value
+        elif kind in ("blind", "act"):
+            seat = state.seat(event[1])
+            action = event[2]
+            if action == "call" and event[3] == 0:
+                action = "check"
+            elif action.isdigit():
+                action = "raise" if state.current_bet > 0 else "bet"
+            record["actions"].append(
+                {
+                    "street": record["street"],
+                    "player": seat.name,
+                    "action": action,
+                    "amount": event[3],
+                    "to": seat.bet + event[3],
+                    "all_in": event[3] > 0 and event[3] == seat.chips,
+                }
+            )
+        elif kind in ("street", "stage") and event[1] <= Stage.SHOWDOWN.value:
+            record["street"] = event[1]
+        elif kind == "win":
+            resolved = True
+            record["pot"] = state.pot
+            record["winner_hand"] = event[2]
+            record["payouts"] = {state.seat(u).name: chips for u, chips in event[3]}
+            if record["street"] == Stage.SHOWDOWN.value:
+                record["shown"] = {
+                    seat.name: seat.hand
+                    for seat in state.by_order()
+                    if seat.order >= 0 and seat.action not in ("fold", "spectator")
+                }
+        history.apply_event(state, event)
+    if record is None or "street" not in record or not resolved:
+        return None
+    # Only the hole cards shown at the showdown
+    for player in record["players"]:
+        if player["name"] not in record["shown"]:
+            player["hand"] = ""
+    # Only the community cards revealed on the streets that were played
+    revealed = STREETS.get(min(record["street"], Stage.RIVER.value), ("", 0))[1]
+    record["board"] = record["board"][: 2 * revealed]
+    return record
+
+
+def hand_records(rounds, chunk_size: int = 2000) -> Iterator[Dict]:
+    """
+    # Build the records of the hands of rounds, from their events.
+    The events are read in one query, by chunks of chunk_size events.
+
+    Args:
+    -----
+        - rounds (QuerySet): The rounds (see select_rounds).
+        - chunk_size (int, optional): The number of events read at once. Defaults to 2000.
+
+    Yields:
+    -------
+        Dict: The record of a hand: its round, table, start time (UTC), blind,
+            players (name, seat, chips and hole cards if shown), seat of the button,
+            community cards revealed, last street played,
+            actions (street, player, action, chips put in the pot, bet of the player
+            on the street after the action, all-in), cards shown, pot, payouts
+            and winning hand.
+    """
+    events = (
+        HandEvent.objects.filter(round__in=rounds.values("id"))
+        .order_by("round_id", "seq")
+        .values_list(
+            "round_id",
+            "round__table__name",
+            "round__table__max_seats",
+            "created",
+            "data",
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+    for round_id, rows in groupby(events, key=itemgetter(0)):
+        record = _hand_record(round_id, rows)
+        if record is not None:
+            yield record
+
+
+def to_json(record: Dict) -> str:
+    """
+    # Format a hand record as a JSON line.
+
+    Args:
+    -----
+        record (Dict): The record of the hand.
+
+    Returns:
+    --------
+        str: The JSON object, followed by a new line.
+    """
+    return json.dumps(record, separators=(",", ":")) + "\n"
+
+
+def to_pokerstars(record: Dict) -> str:
+    """
+    # Format a hand record as a PokerStars hand history (play money, no limit, no rake).
+
+    Args:
+    -----
+        record (Dict): The record of the hand.
+
+    Returns:
+    --------
+        str: The text of the hand, followed by empty lines (separating the hands).
+    """
+    blind = record["blind"]
+    started = datetime.fromisoformat(record["started"]).strftime("%Y/%m/%d %H:%M:%S")
+    lines = [
+        f"PokerStars Hand #{record['round']}:  Hold'em No Limit ({blind}/{2 * blind})"
+        f" - {started} UTC",
+        f"Table '{record['table']}' {record['max_seats']}-max"
+        f" Seat #{record['button']} is the button",
+    ]
+    for player in record["players"]:
+        lines.append(
+            f"Seat {player['seat']}: {player['name']} ({player['chips']} in chips)"
+        )
+
+    # The blinds, then the actions street by street
+    board = record["board"]
+    actions = record["actions"]
+    blinds = [a for a in actions if a["action"] in ("small blind", "big blind")]
+    lines += [_action_line(action, 0) for action in blinds]
+    lines.append("*** HOLE CARDS ***")
+    street = Stage.PRE_FLOP.value
+    current_bet = max((action["to"] for action in blinds), default=0)
+    for action in actions[len(blinds) :]:
+        while street < action["street"]:
+            street += 1
+            current_bet = 0
+            lines += _street_lines(board, street)
+        lines.append(_action_line(action, current_bet))
+        current_bet = max(current_bet, action["to"])
+    while street < Stage.RIVER.value:
+        street += 1
+        lines += _street_lines(board, street)
+
+    if record["shown"]:
+        lines.append("*** SHOW DOWN ***")
+        for name, hand in record["shown"].items():
+            lines.append(f"{name}: shows [{_cards(hand)}]")
+    for name, chips in record["payouts"].items():
+        lines.append(f"{name} collected {chips} from pot")
+
+    lines.append("*** SUMMARY ***")
+    lines.append(f"Total pot {record['pot']} | Rake 0")
+    if board:
+        lines.append(f"Board [{_cards(board)}]")
+    for player in record["players"]:
+        line = f"Seat {player['seat']}: {player['name']}"
+        if player["name"] in record["shown"]:
+            line += f" showed [{_cards(player['hand'])}]"
+        if player["name"] in record["payouts"]:
+            line += f" and won ({record['payouts'][player['name']]})"
+            if record["winner_hand"]:
+                line += f" with {record['winner_hand']}"
+        lines.append(line)
+    return "\n".join(lines) + "\n\n\n"
+
+
+def _street_lines(board: str, street: int):
+    """
+    # Get the header of a street, with the community cards revealed on it.
+    """
+    if street not in STREETS:
+        return []
+    name, revealed = STREETS[street]
+    if len(board) < 2 * revealed:
+        return []
+    if street == Stage.FLOP.value:
+        return [f"*** FLOP *** [{_cards(board[:6])}]"]
+    return [
+        f"*** {name} *** [{_cards(board[:2 * revealed - 2])}]"
+        f" [{_cards(board[2 * revealed - 2:2 * revealed])}]"
+    ]
+
+
+def _action_line(action: Dict, current_bet: int) -> str:
+    """
+    # Format an action of a hand record, given the highest bet of the street before it.
+    """
+    name, kind, amount = action["player"], action["action"], action["amount"]
+    if kind == "small blind":
+        line = f"{name}: posts small blind {amount}"
+    elif kind == "big blind":
+        line = f"{name}: posts big blind {amount}"
+    elif kind == "fold":
+        line = f"{name}: folds"
+    elif kind == "check":
+        line = f"{name}: checks"
+    elif kind == "call":
+        line = f"{name}: calls {amount}"
+    elif kind == "bet":
+        line = f"{name}: bets {amount}"
+    elif kind == "raise":
+        line = f"{name}: raises {action['to'] - current_bet} to {action['to']}"
+    else:
+        line = f"{name}: {kind}"
+    if action["all_in"]:
+        line += " and is all-in"
+    return line
+
+
+FORMATS = {
+    "jsonl": (to_json, "application/jsonl"),
+    "pokerstars": (to_pokerstars, "text/plain; charset=utf-8"),
+}
+
+
+def export_hands(
+    rounds, format: str = "jsonl", chunk_size: int = 2000
+) -> Iterator[str]:
+    """
+    # Export the hands of rounds in a format, one hand at a time.
+
+    Args:
+    -----
+        - rounds (QuerySet): The rounds (see select_rounds).
+        - format (str, optional): "jsonl" or "pokerstars". Defaults to "jsonl".
+        - chunk_size (int, optional): The number of events read at once. Defaults to 2000.
+
+    Yields:
+    -------
+        str: The text of a hand.
+
+    Raises:
+    -------
+        ValueError: If the format is unknown.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Unknown format: {format} (expected one of {list(FORMATS)})")
+    formatter = FORMATS[format][0]
+    for record in hand_records(rounds, chunk_size):
+        yield formatter(record)
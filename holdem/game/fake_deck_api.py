@@ -0,0 +1,244 @@
+"""
+This module is a local stand-in for the Deck of Cards API (deckofcardsapi.com).
+
+It serves the endpoints used by holdem.game.deck.RemoteDeckBackend:
+- /api/deck/new/shuffle/
+- /api/deck/<deck_id>/draw/?count=<count>
+- /api/deck/<deck_id>/shuffle/
+
+with a configurable latency and error rate, so the HTTP client of the remote decks
+(connection pooling, retries, circuit breaker and fallback) can be tested
+and benchmarked offline.
+
+Usage:
+    python -m holdem.game.fake_deck_api [--port 8001] [--latency 0.05] [--error-rate 0.1]
+    DECK_API_URL=http://127.0.0.1:8001/api/deck python manage.py runserver
+"""
+
+import argparse
+import json
+import random
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from holdem.game.card import Card, CARDS
+
+
+class FakeDeckAPIServer(ThreadingHTTPServer):
+    """
+    HTTP server emulating the Deck of Cards API.
+
+    Attributes:
+    -----------
+        latency (float): Delay added to each response, in seconds.
+        error_rate (float): Probability of answering a request with an HTTP 500 error.
+        decks (Dict[str, List[str]]): The remaining card codes of each deck.
+        requests_count (int): Number of requests received.
+        connections_count (int): Number of connections opened by the clients.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address=("127.0.0.1", 0),
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+        -----
+            address (Tuple[str, int], optional):
+                The host and port to listen on. Defaults to a free port on 127.0.0.1.
+            latency (float, optional): Delay added to each response, in seconds. Defaults to 0.
+            error_rate (float, optional): Probability of an HTTP 500 error. Defaults to 0.
+            seed (Optional[int], optional): Seed of the shuffles and errors. Defaults to None.
+        """
+        super().__init__(address, FakeDeckAPIHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.decks: Dict[str, List[str]] = {}
+        self.requests_count = 0
+        self.connections_count = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        """
+        # Getter for the URL of the API, to give to RemoteDeckBackend.
+
+        Returns:
+        --------
+            str: The URL of the API.
+        """
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/api/deck"
+
+    def new_deck(self) -> str:
+        """
+        # Create a new shuffled deck.
+
+        Returns:
+        --------
+            str: The ID of the deck.
+        """
+        deck_id = secrets.token_hex(6)
+        self.decks[deck_id] = []
+        self.shuffle(deck_id)
+        return deck_id
+
+    def shuffle(self, deck_id: str):
+        """
+        # Put all the cards back in a deck and shuffle it.
+
+        Args:
+        -----
+            deck_id (str): The ID of the deck.
+        """
+        codes = [card.code for card in CARDS]
+        self.random.shuffle(codes)
+        self.decks[deck_id] = codes
+
+    def start_in_thread(self) -> threading.Thread:
+        """
+        # Serve the requests in a background thread (call shutdown() to stop).
+
+        Returns:
+        --------
+            threading.Thread: The thread of the server.
+        """
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+class FakeDeckAPIHandler(BaseHTTPRequestHandler):
+    """
+    Handles the requests of the FakeDeckAPIServer.
+    """
+
+    # Keep-alive connections, as the real API
+    protocol_version = "HTTP/1.1"
+    server: FakeDeckAPIServer
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections_count += 1
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        # Silence the log of every request
+        pass
+
+    def send_json(self, status: int, data: dict):
+        """
+        # Send a JSON response.
+
+        Args:
+        -----
+            status (int): The HTTP status.
+            data (dict): The content of the response.
+        """
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """
+        # Answer a request to the API.
+        """
+        server = self.server
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        with server.lock:
+            server.requests_count += 1
+            fail = server.random.random() < server.error_rate
+        if server.latency > 0:
+            time.sleep(server.latency)
+        if fail:
+            self.send_json(500, {"success": False, "error": "Injected error"})
+            return
+        if parts[:2] != ["api", "deck"] or len(parts) < 4:
+            self.send_json(404, {"success": False, "error": "Not found"})
+            return
+
+        deck_id, action = parts[2], parts[3]
+        with server.lock:
+            if deck_id == "new" and action == "shuffle":
+                deck_id = server.new_deck()
+            elif deck_id not in server.decks:
+                # Unknown IDs are created, so a fixed ID works after a restart
+                server.decks[deck_id] = []
+                server.shuffle(deck_id)
+            remaining = server.decks[deck_id]
+            if action == "shuffle":
+                server.shuffle(deck_id)
+                remaining = server.decks[deck_id]
+                data = {"success": True, "deck_id": deck_id, "shuffled": True}
+            elif action == "draw":
+                count = int(parse_qs(url.query).get("count", ["1"])[0])
+                if count > len(remaining):
+                    data = {
+                        "success": False,
+                        "deck_id": deck_id,
+                        "error": f"Not enough cards remaining to draw {count} additional",
+                    }
+                else:
+                    drawn = remaining[:count]
+                    del remaining[:count]
+                    data = {
+                        "success": True,
+                        "deck_id": deck_id,
+                        "cards": [card_json(code) for code in drawn],
+                    }
+            else:
+                self.send_json(404, {"success": False, "error": "Not found"})
+                return
+            data["remaining"] = len(remaining)
+        self.send_json(200, data)
+
+
+def card_json(code: str) -> dict:
+    """
+    # Get the JSON representation of a card, as given by the Deck of Cards API.
+
+    Args:
+    -----
+        code (str): The code of the card.
+
+    Returns:
+    --------
+        dict: The code, image, value and suit of the card.
+    """
+    card = Card.from_code(code)
+    return {
+        "code": card.code,
+        "image": card.image,
+        "value": card.value,
+        "suit": card.suit,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Local stand-in for deckofcardsapi.com"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.0, help="in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="between 0 and 1")
+    args = parser.parse_args()
+    fake_api = FakeDeckAPIServer(
+        (args.host, args.port), latency=args.latency, error_rate=args.error_rate
+    )
+    print(f"Serving the Deck of Cards API on {fake_api.base_url}")
+    fake_api.serve_forever()
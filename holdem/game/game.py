@@ -5,29 +5,62 @@
 """
 This module contains the implementation of a Texas Hold'em game.
 
-It includes functions for preparing a round, placing bets,
-moving to the next player's turn, moving to the next stage of the round,
-filtering players based on their last action, checking the validity of an action,
-and resolving the round to determine the winners and distribute the pot.
+The rules of the game are in holdem.game.engine, and work on a TableState object.
+This module loads the state of a Round and its players from the database (load_state)
+and saves back what changed (save_state), so an action costs a handful of queries:
+one to load the players, one to save those who changed, one to record the chips
+they put in the pot (see holdem.models.Contribution) and one to save the round,
+all in one transaction (a single commit).
+The version of the round is checked and incremented when it is saved, so two requests
+acting on the same round at the same time can't overwrite each other: the second one
+gets a ConflictError, and its transaction can be rolled back and played again.
+The events of the transitions are appended to the hand history of the round
+(see holdem.models.HandEvent and holdem.game.history) in the same transaction,
+and rebuild_state gives back the state of the round at any of its events.
+
+It also includes wrappers applying a transition of the engine to a Round
+(load, apply, save), to prepare a round, place the blinds, move to the next player
+or the next stage, perform an action and resolve the round.
 
 The module also defines an enumeration 'Stage'
-representing the different stages of a round in Texas Hold'em.
+representing the different stages of a round in Texas Hold'em (from holdem.game.engine).
 
 Classes:
 - Stage: Enumeration representing different stages of a round in Texas Hold'em.
+- ConflictError: Raised when a round was changed by another request since it was loaded.
 
 Functions:
+- load_state: Load the state of a round and its players.
+- save_state: Save the state of a round and its players.
+- rebuild_state: Rebuild the state of a round from its hand history.
+- take_deck: Get a shuffled deck for a round.
 - deal_cards: Deal cards to players and community cards for a round.
 - prepare_round: Prepare a new round of Texas Hold'em.
-- bet: Place a bet in the current round.
+- pay_blind: Place a blind in the current round.
 - next_player: Move to the next player's turn in the round.
 - next_stage: Move to the next stage of the round.
+- next_stage_check: Move to the next stage if the betting round is over.
 - filter_players: Filter the active players and the players that can bet.
 - check_action: Check the validity of an action.
+- do_action: Perform the action of a player.
+- live_hand: Get the hand of a player with the community cards revealed so far.
+- discard_live_hands: Forget the live hands of a round.
+- current_round: Get the current round of a table.
+- is_current_round: Check that a locked round is still the current round of its table.
+- new_round: Start a new round at a table.
+- eject_player: Remove a player from a round.
+- leave_other_tables: Remove a player from the rounds of the other tables.
+- showdown: Determine the winners of a loaded round and distribute the pot.
 - resolve_round: Determine the winners of the round and distribute the pot.
 
 Constants:
-- DECK_ID: The ID of the deck used for dealing cards.
+- DECK_BACKEND: The source of the cards ("local" or "remote", see holdem.game.deck).
+- DECK_SEED: The seed of reproducible deals (None for random deals).
+- DECK_POOL: The shuffled decks ready to deal.
+- REVEALED_CARDS: The number of community cards revealed at each stage.
+- SEAT_FIELDS: The fields of a User saved from a Seat.
+- ROUND_FIELDS: The fields of a Round saved from a TableState.
+- LIVE_HANDS_SIZE: The maximum number of live hands kept by the process.
 
 ```mermaid
 ---
@@ -36,6 +69,7 @@ title: Texas Hold'em
 classDiagram
 direction LR
 User "2..10" <-- "*" Round : is played by
+Table "1" <-- "*" Round : is played at
 class User{
     int id
     str name
@@ -48,8 +82,16 @@ class User{
     date last_action
     int order
 }
+class Table{
+    int id
+    str name
+    int blind
+    int max_seats
+}
 class Round{
     int id
+    int version
+    Table table
     str community_cards
     List[User] players
     int player_to_play
@@ -63,61 +105,359 @@ class Round{
 ```
 """
 
-from enum import Enum
-from typing import List, Dict, Set, Tuple
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
 from datetime import datetime
+from django.db import transaction
+from django.db.models import F, Max, OuterRef, Subquery
 from authentication.models import User
-from holdem.game.deck import Deck, DeckError
+from holdem.game import engine, history
+from holdem.game.deck import DealStream, Deck, DeckError, DeckPool, LocalDeckBackend
 from holdem.game.card import Card
-from holdem.game.hand import Hand, FinalHand
+from holdem.game.engine import Seat, Stage, TableState
+from holdem.game.hand import Hand, FinalHand, IncrementalHand
+from holdem.models import Contribution, HandEvent, Round
+
+DECK_BACKEND = "local"
+# Seed of reproducible deals (for load tests, bug replays and benchmarks), None for random deals
+DECK_SEED: Optional[int] = None
+DECK_POOL = DeckPool(lambda: Deck(backend=DECK_BACKEND), size=8)
+
+REVEALED_CARDS = {
+    Stage.WAITING: 0,
+    Stage.PRE_FLOP: 0,
+    Stage.FLOP: 3,
+    Stage.TURN: 4,
+    Stage.RIVER: 5,
+    Stage.SHOWDOWN: 5,
+    Stage.FINISHED_EARLY: 5,
+}
+
+SEAT_FIELDS = ["chips", "bet", "total_bet", "hand", "action", "order"]
+ROUND_FIELDS = [
+    "community_cards",
+    "player_to_play",
+    "stage",
+    "pot",
+    "blind",
+    "min_raise",
+    "winners_name",
+    "winner_hand",
+]
 
-# from authentication.models import User
+# Hands of the players of the rounds played by this process, by (round id, user id),
+# with the hole cards they were built from, the least recently used first
+# (the rounds resolved by another process are never discarded by this one)
+LIVE_HANDS_SIZE = 4096
+_LIVE_HANDS: "OrderedDict[Tuple[int, int], Tuple[str, IncrementalHand]]" = OrderedDict()
 
-DECK_ID = "o9fy1ih84kvx"
 
+class ConflictError(Exception):
+    """Raised when a round was changed by another request since it was loaded."""
 
-class Stage(Enum):
+
+def _seat(user) -> Seat:
     """
-    # Enumeration representing different stages of a round in Texas Hold'em.
+    # Get the seat of a user.
     """
+    return Seat(
+        user.id,
+        user.username,
+        user.chips,
+        user.bet,
+        user.total_bet,
+        user.hand,
+        user.action,
+        user.order,
+    )
 
-    WAITING = 0
-    PRE_FLOP = 1
-    FLOP = 2
-    TURN = 3
-    RIVER = 4
-    SHOWDOWN = 5
-    FINISHED_EARLY = 6
 
+def load_state(round, *known_users) -> Tuple[TableState, Dict[int, User]]:
+    """
+    # Load the state of a round and its players (in one query for the players).
 
-def deal_cards(round, test=False):
+    Args:
+    -----
+        - round (Round): The round to load.
+        - *known_users (User): Instances of players already loaded (e.g. the user
+            of the request), used instead of new ones so they stay up to date.
+
+    Returns:
+    --------
+    Tuple[TableState, Dict[int, User]]:
+        - TableState: The state of the round.
+        - Dict[int, User]: The players of the round, by ID (to give back to save_state).
     """
-    # Deal cards to players and community cards for a round.
+    known = {user.id: user for user in known_users}
+    users = {user.id: known.get(user.id, user) for user in round.players.order_by("id")}
+    state = TableState(
+        round_id=round.id,
+        seats=[_seat(user) for user in users.values()],
+        stage=round.stage,
+        pot=round.pot,
+        blind=round.blind,
+        min_raise=round.min_raise,
+        player_to_play=round.player_to_play,
+        board=round.community_cards,
+        winners_name=round.winners_name,
+        winner_hand=round.winner_hand,
+    )
+    return state, users
+
+
+def save_state(round, state: TableState, users: Dict[int, User]):
+    """
+    # Save the changes of a round and its players since they were loaded.
+
+    Only the players whose seat changed are written, in one bulk_update on the changed fields,
+    and the round is saved once, on its changed fields.
+    The events of the state are appended to the hand history of the round (in one bulk_create),
+    with a snapshot of the state when they reach a multiple of SNAPSHOT_INTERVAL events.
+    The round is only saved if its version is still the one loaded (compare-and-swap),
+    so the changes of a concurrent request are never overwritten.
+    The given instances are updated, so they can be saved again after other transitions.
 
     Args:
     -----
-        - round (Round): The round object representing the current round.
-        - test (bool, optional): A flag indicating whether to use a test deck. Defaults to False.
+        - round (Round): The round loaded by load_state.
+        - state (TableState): The state of the round.
+        - users (Dict[int, User]): The players returned by load_state.
+
+    Raises:
+    -------
+        ConflictError: If the round was changed by another request since it was loaded
+            (nothing is saved, and the transaction should be rolled back and retried).
+    """
+    # The instances hold the values in the database: compare the seats with them
+    # (the departed players left with their chips in the pot, and are no longer saved)
+    changed_players = []
+    contributions = []
+    for seat in state.seats:
+        user = users[seat.user_id]
+        if seat.total_bet > user.total_bet:
+            # Chips put in the pot: record them in the ledger of the round
+            contributions.append(
+                Contribution(round=round, user_id=seat.user_id, amount=seat.total_bet)
+            )
+        changed = [
+            field
+            for field in SEAT_FIELDS
+            if getattr(user, field) != getattr(seat, field)
+        ]
+        if changed:
+            changed_players.append((user, seat, changed))
+
+    values = {
+        "community_cards": state.board,
+        "player_to_play": state.player_to_play,
+        "stage": state.stage,
+        "pot": state.pot,
+        "blind": state.blind,
+        "min_raise": state.min_raise,
+        "winners_name": state.winners_name,
+        "winner_hand": state.winner_hand,
+    }
+    changed_fields = [
+        field for field in ROUND_FIELDS if getattr(round, field) != values[field]
+    ]
+    if not changed_players and not changed_fields and not state.events:
+        return
+
+    # Compare-and-swap on the version of the round, before writing anything else
+    updated = Round.objects.filter(id=round.id, version=round.version).update(
+        version=F("version") + 1, **{field: values[field] for field in changed_fields}
+    )
+    if updated == 0:
+        raise ConflictError(f"Round {round.id} was changed by another request")
+    round.version += 1
+    for field in changed_fields:
+        setattr(round, field, values[field])
+
+    if changed_players:
+        fields = set()
+        for user, seat, changed in changed_players:
+            for field in changed:
+                setattr(user, field, getattr(seat, field))
+            fields.update(changed)
+        User.objects.bulk_update(
+            [user for user, _, _ in changed_players],
+            [field for field in SEAT_FIELDS if field in fields],
+        )
+    if contributions:
+        Contribution.objects.bulk_create(
+            contributions,
+            update_conflicts=True,
+            unique_fields=["round", "user"],
+            update_fields=["amount"],
+        )
+    if state.events:
+        last = round.events.aggregate(seq=Max("seq"))["seq"] or 0
+        events = [
+            HandEvent(round=round, seq=last + i, data=history.encode(event))
+            for i, event in enumerate(state.events, 1)
+        ]
+        if (last + len(events)) // history.SNAPSHOT_INTERVAL > (
+            last // history.SNAPSHOT_INTERVAL
+        ):
+            events[-1].snapshot = history.encode(state.snapshot())
+        HandEvent.objects.bulk_create(events)
+        state.events.clear()
+
+
+def rebuild_state(round, seq: Optional[int] = None) -> TableState:
     """
-    if not test:
+    # Rebuild the state of a round from its hand history:
+    the closest snapshot is loaded, and the events after it are applied again.
+
+    Args:
+    -----
+        - round (Round): The round.
+        - seq (Optional[int], optional):
+            The number of the event after which the state is rebuilt.
+            Defaults to None (after the last event).
+
+    Returns:
+    --------
+        TableState: The state of the round after the event.
+    """
+    events = round.events.all()
+    if seq is not None:
+        events = events.filter(seq__lte=seq)
+    base = events.exclude(snapshot="").order_by("-seq").first()
+    if base is None:
+        state = TableState(round_id=round.id, blind=round.blind, min_raise=round.blind)
+        events = events.order_by("seq")
+    else:
+        state = TableState.from_snapshot(history.decode(base.snapshot))
+        events = events.filter(seq__gt=base.seq).order_by("seq")
+    return history.replay(
+        state, (history.decode(data) for data in events.values_list("data", flat=True))
+    )
+
+
+def _apply(round, transition: Callable, *args):
+    """
+    # Load a round, apply a transition of the engine to it and save it (in one transaction).
+    """
+    with transaction.atomic():
+        state, users = load_state(round)
+        result = transition(state, *args)
+        save_state(round, state, users)
+    return result
+
+
+class _FallbackDeck(Deck):
+    """
+    # A deck drawing from a new local deck when its backend fails
+    (e.g. the API of the remote backend, before its circuit breaker opens).
+    """
+
+    def __init__(self, deck: Deck):
+        super().__init__(backend=deck.backend)
+
+    def draw(self, count: int) -> List[Card]:
         try:
-            deck = Deck(deck_id=DECK_ID)
-            deck.shuffle()
+            return super().draw(count)
         except DeckError:
-            print("Using a new deck")
-            deck = Deck()
-        round.community_cards = "".join([card.code for card in deck.draw(5)])
-        for player in list(round.players.all()):
-            player.action = ""
-            player.hand = "".join([card.code for card in deck.draw(2)])
-            player.save()
-    else:
-        round.community_cards = "3H4H5H6H7H"
-        for player in list(round.players.all()):
-            player.action = ""
-            player.hand = "2D2S"
-            player.save()
-    round.save()
+            print("Using a local deck")
+            self.backend = LocalDeckBackend()
+            return super().draw(count)
+
+
+def take_deck(round, seed: Optional[int] = None) -> Deck:
+    """
+    # Get a shuffled deck for a round.
+
+    Args:
+    -----
+        - round (Round): The round object representing the current round.
+        - seed (Optional[int], optional):
+            The seed of a reproducible deal: the deck of the round is then derived
+            from the seed and the ID of the round (see holdem.game.deck.DealStream).
+            Defaults to None (DECK_SEED).
+
+    Returns:
+    --------
+        Deck: The deck of the round.
+    """
+    if seed is None:
+        seed = DECK_SEED
+    if seed is not None:
+        return DealStream(seed).deck(round.id)
+    try:
+        return _FallbackDeck(DECK_POOL.take())
+    except DeckError:
+        print("Using a local deck")
+        return Deck(backend="local")
+
+
+def deal_cards(round, seed: Optional[int] = None):
+    """
+    # Deal cards to players and community cards for a round.
+
+    Args:
+    -----
+        - round (Round): The round object representing the current round.
+        - seed (Optional[int], optional):
+            The seed of a reproducible deal (see take_deck). Defaults to None (DECK_SEED).
+    """
+    _apply(round, engine.deal, take_deck(round, seed))
+
+
+def live_hand(round, player) -> Optional[IncrementalHand]:
+    """
+    # Get the hand of a player completed with the community cards revealed so far.
+    The hands are kept between the requests handled by the process,
+    and only the cards revealed since the last call are added.
+
+    Args:
+    -----
+        - round (Round): The current round of the game.
+        - player (User): The player.
+
+    Returns:
+    --------
+        Optional[IncrementalHand]: The hand of the player, None if he has no cards.
+    """
+    return _live_hand(
+        round.id, round.stage, round.community_cards, player.id, player.hand
+    )
+
+
+def _live_hand(
+    round_id: int, stage: int, board: str, player_id: int, hole: str
+) -> Optional[IncrementalHand]:
+    """
+    # Get the live hand of a player from the fields of the round and of the player.
+    """
+    if hole == "":
+        return None
+    key = (round_id, player_id)
+    revealed = REVEALED_CARDS[Stage(stage)]
+    cached = _LIVE_HANDS.get(key)
+    if cached is None or cached[0] != hole or len(cached[1]) - 2 > revealed:
+        # New hole cards (or a stage going backwards): start again from the hole cards
+        cached = (hole, IncrementalHand(Card.from_code_string(hole)))
+        _LIVE_HANDS[key] = cached
+        if len(_LIVE_HANDS) > LIVE_HANDS_SIZE:
+            _LIVE_HANDS.popitem(last=False)
+    _LIVE_HANDS.move_to_end(key)
+    hand = cached[1]
+    hand.extend(Card.from_code_string(board[2 * (len(hand) - 2) : 2 * revealed]))
+    return hand
+
+
+def discard_live_hands(round):
+    """
+    # Forget the live hands of a round
+    (the IDs of the rounds are shared by the tables, whose rounds are played at the same time).
+
+    Args:
+    -----
+        round (Round): The round that is finished.
+    """
+    for key in [key for key in _LIVE_HANDS if key[0] == round.id]:
+        del _LIVE_HANDS[key]
 
 
 def prepare_round(round):
@@ -133,89 +473,27 @@ def prepare_round(round):
     -----
         round (Round): The round object to prepare.
     """
-    round.stage = Stage.PRE_FLOP.value
-    round.save()
-
-    players = list(round.players.filter(order__gte=0).order_by("order")) + list(
-        round.players.filter(order__lt=0)
-    )
-    for i, player in enumerate(players):
-        player.order = (i + 1) % len(players)
-        player.save()
-
-    # Deal the cards
-    deal_cards(round, test=False)
-
-    # Set the blinds
-    round_players = list(round.players.order_by("order"))
-    if round.players.count() == 2:
-        # In a two player game, the dealer is the small blind and the other player is the big blind
-        # The dealer is the one who starts in the pre-flop
-        sb = round_players[0]
-        bb = round_players[1]
-        if sb.bet == 0:
-            pay_blind(round, player=sb, blind=round.blind, action="small blind")
-        if bb.bet == 0:
-            pay_blind(round, player=bb, blind=round.blind * 2, action="big blind")
-        if sb.chips > 0:
-            round.player_to_play = sb.id
-        else:
-            if bb.chips > 0:
-                round.player_to_play = bb.id
-            else:
-                # Rare case where the players are all-in by the blinds
-                round.stage = Stage.SHOWDOWN.value
-                return
-        round.save()
-    else:
-        sb = round_players[1]
-        bb = round_players[2]
-        if sb.bet == 0:
-            pay_blind(round, player=sb, blind=round.blind, action="small blind")
-        if bb.bet == 0:
-            pay_blind(round, player=bb, blind=round.blind * 2, action="big blind")
-
-        for i in [0] + list(range(3, round.players.count())):
-            player = list(round.players.order_by("order"))[i]
-            player.action = ""
-            player.save()
-
-        first = list(round.players.order_by("order"))[3 % round.players.count()]
-        round.player_to_play = first.id
-    round.save()
+    _apply(round, engine.prepare_round, take_deck(round))
 
 
 def pay_blind(round, player, blind: int, action: str):
     """
     # Place a blind in the current round.
 
-    - Updates player's action, bet, and chips.
-    - Updates the round's pot.
-
     Args:
     -----
         - round (Round): The current round object.
         - player (Player): The player placing the blind.
         - blind (int): The amount of chips bet by the player due to the blind.
-        - action (str): The action taken by the player, "call" or "x", where x is the raise value.
+        - action (str): The name of the blind ("small blind" or "big blind").
     Raises:
     -------
         TypeError: If action/bet is the not the expected type.
     """
-    # Checks
-    if not isinstance(blind, int):
-        raise TypeError("blind must be an int")
-    if not isinstance(action, str):
-        raise TypeError("action must be a string")
-    # Return
-    player.action = action
-    blind = min(blind, player.chips)
-    player.bet += blind
-    player.total_bet += blind
-    player.chips -= blind
-    player.save()
-    round.pot += blind
-    round.save()
+    with transaction.atomic():
+        state, users = load_state(round, player)
+        engine.pay_blind(state, state.seat(player.id), blind, action)
+        save_state(round, state, users)
 
 
 def next_player(round):
@@ -226,30 +504,7 @@ def next_player(round):
     -----
         round (Round): The current round of the game.
     """
-    n = round.players.filter(order__gte=0).count()
-    ordered_players = list(round.players.filter(order__gte=0).order_by("order"))
-    for i, player in enumerate(ordered_players):
-        if player.id == round.player_to_play:
-            next_p = ordered_players[(i + 1) % n]
-            for j in range(2, round.players.count()):
-                if next_p.action in ["fold", "spectator"] or next_p.chips == 0:
-                    next_p = ordered_players[(i + j) % n]
-                else:
-                    break
-            print(
-                "player_to_play BEFORE next_player():",
-                round.players.get(id=round.player_to_play).username,
-            )
-            round.player_to_play = next_p.id
-            round.save()
-            print(
-                "player_to_play AFTER next_player():",
-                round.players.get(id=round.player_to_play).username,
-            )
-            return
-    # Should never happen : if the user that is the player_to_play is removed,
-    #   player_to_play should have been updated before
-    raise ValueError("Player to play not found in the round's players")
+    _apply(round, engine.next_player)
 
 
 def next_stage(round):
@@ -260,19 +515,7 @@ def next_stage(round):
     -----
         round (Round): The current round of the game.
     """
-    round.stage += 1
-    for player in list(round.players.all()):
-        player.bet = 0
-        player.save()
-    betting_players = filter_players(round)[1]
-    for player in betting_players:
-        player.action = ""
-        player.save()
-    if round.stage < Stage.SHOWDOWN.value:
-        round.player_to_play = list(round.players.order_by("order"))[0].id
-    round.min_raise = round.blind
-    round.save()
-    next_player(round)
+    _apply(round, engine.next_stage)
 
 
 def next_stage_check(round):
@@ -283,32 +526,7 @@ def next_stage_check(round):
     -----
         round (Round): The current round of the game.
     """
-    active_players, betting_players = filter_players(round)
-    if len(betting_players) < 2:
-        # If there are <2 players able to bet, the round is finished
-        if len(active_players) <= 1:
-            # If there is only 1 active player (or less), the round is finished early
-            round.stage = Stage.FINISHED_EARLY.value
-        else:
-            # Else a showdown is necessary
-            round.stage = Stage.SHOWDOWN.value
-        round.save()
-    else:
-        # If all players have same bet, go to next stage
-        bets = set(player.bet for player in betting_players)
-        if len(bets) == 1:
-            actions = {player.action for player in betting_players}
-            if bets.pop() == 0:
-                # Need to check if all bets are 0 because everyone checked,
-                # not because of the reset due to moving to the stage
-                if "" not in actions:
-                    print("actions", actions, "=> next stage")
-                    next_stage(round)
-            else:
-                # Big blind plays again even if everyone called
-                if "big blind" not in actions:
-                    print("actions", actions, "=> next stage")
-                    next_stage(round)
+    _apply(round, engine.next_stage_check)
 
 
 def filter_players(round):
@@ -325,7 +543,7 @@ def filter_players(round):
         - QuerySet: The active players (players who have not folded or become spectators).
         - QuerySet: The betting players (active players who have chips greater than 0).
     """
-    active_players = round.players.exclude(action__in=["fold", "spectator"])
+    active_players = round.players.exclude(action__in=engine.INACTIVE_ACTIONS)
     betting_players = active_players.filter(chips__gt=0)
     return active_players, betting_players
 
@@ -349,39 +567,8 @@ def check_action(round, user, action: str) -> Tuple[bool, str]:
     -------
         TypeError: If action is not a string
     """
-    # Checks
-    if not isinstance(action, str):
-        raise TypeError("action must be an integer or a string")
-
-    # Initialize return values
-    check = True
-    message = ""
-
-    # If the action is an integer, it represents a raise amount
-    if action.isdigit():
-        # Convert the action to an integer
-        raise_amount = int(action)
-        call_value = max(player.bet for player in round.players.all())
-        user_cost = call_value + raise_amount - user.bet
-
-        # Verify that the raise amount is at least the minimum raise
-        # except if the raise makes the player all-in
-        if raise_amount < round.min_raise and user_cost != user.chips:
-            check = False
-            message = "Raise must be at least " + str(round.min_raise)
-
-        # Verify that the player has enough chips to make the raise
-        if user_cost > user.chips:
-            check = False
-            message = "You don't have enough chips"
-
-    # If the action is not valid, set check to False and generate an error message
-    # else:
-    # check = False
-    # message = "Invalid action"
-
-    # Return the results of the check
-    return check, message
+    state, _ = load_state(round, user)
+    return engine.check_action(state, state.seat(user.id), action)
 
 
 def do_action(round, user, action: str):
@@ -394,242 +581,167 @@ def do_action(round, user, action: str):
         - user (User): The user performing the action.
         - action (str): The action to be performed.
             If it's digits, it represents the amount to raise.
-
-    Raises:
-    -------
-        TypeError: If action is not a string
     """
-    user.action = action
-    user.last_action = datetime.now()
-    user.save()
-    print("user.total_bet BEFORE:", user.total_bet)
-    if action == "call":
-        max_bet = max(players.bet for players in round.players.all())
-        amount_to_call = min(max_bet - user.bet, user.chips)
-        print("call: amount_to_call", amount_to_call)
-        user.bet += amount_to_call
-        user.total_bet += amount_to_call
-        user.chips -= amount_to_call
-        round.pot += amount_to_call
-
-    # raise case
-    if action.isdigit():
-        print("raise")
-        max_bet = max(players.bet for players in round.players.all())
-        amount_to_call = max_bet - user.bet
-        delta = amount_to_call + int(action)
-        user.bet += delta
-        user.total_bet += delta
-        user.chips -= delta
-        round.pot += delta
-        round.min_raise = int(action)
-    print("user.total_bet AFTER:", user.total_bet)
-    round.save()
-    user.save()
+    with transaction.atomic():
+        user.last_action = datetime.now()
+        user.save(update_fields=["last_action"])
+        state, users = load_state(round, user)
+        engine.do_action(state, state.seat(user.id), action)
+        save_state(round, state, users)
 
 
-def calculate_pots(round) -> Tuple[Dict[int, List[int]], int, int]:
+def current_round(table, lock: bool = False):
     """
-    # Calculate the pots and the number of active players.
+    # Get the current round of a table (its latest one), or start the first one.
 
     Args:
     -----
-        round (Round): The current round of the game.
+        - table (Table): The table.
+        - lock (bool, optional): Lock the row of the round until the end of the transaction
+            (SELECT ... FOR UPDATE, on the databases supporting it). Defaults to False.
 
     Returns:
     --------
-    Tuple[Dict[int, List[int]], int, int]:
-        - final_bets (Dict[int, List[int]]):
-            A dictionary where the keys are the total_bets made by players and
-            the values are sets of indices of players who participated in that bet.
-        - n_active_players (int): The number of active players in the round.
-        - last_active_index (int): The index of the last active player in the round.
-    """
-    final_bets: dict = {}
-    n_active_players: int = 0
-
-    players = list(round.players.all())
-    for index, player in enumerate(players):
-        if player.action not in ["fold", "spectator"]:
-            # => player is active
-            n_active_players += 1
-            last_active_index = index  # useful for edge case
-            print(
-                "player.username:",
-                player.username,
-                "player.total_bet:",
-                player.total_bet,
-                "player.bet:",
-                player.bet,
-            )
-            if player.total_bet not in final_bets:
-                final_bets[player.total_bet] = {index}
-            else:
-                final_bets[player.total_bet].add(index)
-
-    enum_players = list(enumerate(players))
-    for p in list(User.objects.filter(total_bet__gt=0).all()):
-        if p.id not in [player.id for player in players]:
-            enum_players.append((-p.total_bet, p))
-
-    for value, indices in final_bets.items():
-        for index, player in enum_players:
-            if player.total_bet >= value:
-                indices.add(index)
-    for index, player in enum_players:
-        if index < 0:
-            player.total_bet = 0
-            player.save()
-    print(
-        "final_bets with usernames",
-        {k: {players[index].username for index in v} for k, v in final_bets.items()},
-        "n_active_players",
-        n_active_players,
-    )
-    return final_bets, n_active_players, last_active_index
+        Round: The current round of the table.
+    """
+    rounds = table.rounds.order_by("-id")
+    if lock:
+        rounds = rounds.select_for_update()
+    round = rounds.first()
+    if round is None:
+        round = new_round(table)
+    return round
 
 
-def distribute_chips(
-    round,
-    distributed_chips,
-    pot,
-    indices,
-    player_final_hands,
-):
+def is_current_round(round) -> bool:
     """
-    # Distributes chips to the winning players based on their final hands.
+    # Check that a round is still the current round of its table, and isn't resolved.
+    A request waiting for the lock of a round gets the row it selected once the lock
+    is released (the latest round is not selected again): the other request may have
+    resolved it and started the next round in the meantime.
 
     Args:
     -----
-        - round (Round): The current round of the game.
-        - distributed_chips (int): The total number of chips already distributed.
-        - pot (int): The total number of chips to distribute.
-        - indices (list): The indices of the players participating in the round.
-        - player_final_hands (list): The final hands of the players.
+        round (Round): The round, locked by current_round.
 
     Returns:
     --------
-    Tuple[int, Set[int]]:
-        - distributed_chips (int): The updated total number of distributed chips.
-        - winners (set): The indices of the winning players.
+        bool: If the round can still be played.
     """
+    if round.winners_name != "":
+        return False
+    return not Round.objects.filter(table_id=round.table_id, id__gt=round.id).exists()
 
-    winners = set()
-    best_final_hand = max(
-        player_final_hands[index]
-        for index in indices
-        if index >= 0 and list(round.players.all())[index].action != "fold"
-    )
-    winning_indices = [
-        index
-        for index in indices
-        if (
-            index >= 0
-            and list(round.players.all())[index].action != "fold"
-            and player_final_hands[index] == best_final_hand
-        )
-    ]
-    for win_index in winning_indices:
-        win_player = list(round.players.all())[win_index]
-        chips_won = pot // len(winning_indices)
-        print(win_player.username, "won", chips_won, "chips")
-        win_player.chips += chips_won
-        distributed_chips += chips_won
-        winners.add(win_index)
-        win_player.save()
-    round.winner_hand = best_final_hand.name
+
+def new_round(table, players=()):
+    """
+    # Start a new round at a table, with the blinds of the table.
+
+    Args:
+    -----
+        - table (Table): The table.
+        - players (Iterable[User], optional): The players of the round. Defaults to none.
+
+    Returns:
+    --------
+        Round: The new round.
+    """
+    round = Round(table=table, blind=table.blind, min_raise=table.blind)
     round.save()
-    return distributed_chips, winners
+    if players:
+        round.players.set(players)
+    return round
 
 
-def distribute_pots(
-    round,
-    player_final_hands: List[FinalHand],
-    final_bets: Dict[int, List[int]],
-    n_active_players: int,
-    last_active_index: int,
-) -> Set[int]:
+def eject_player(round, player):
     """
-    # Distributes pots to the winners based on the final bets and player hands.
+    # Remove a player from a round: he folds, and his chips stay in the pot
+    (they are recorded in the contributions of the round).
 
     Args:
     -----
         - round (Round): The current round of the game.
-        - player_final_hands (List[FinalHand]): The final hands of all players.
-        - final_bets (Dict[int, List[int]]):
-            The dictionary where the keys are the total_bets made by players and
-            the values are sets of indices of players who participated in that bet.
-        - n_active_players (int): The number of active players in the round.
-        - last_active_index (int):
-            The index of the last active player.
-            Used to avoid doing another for when n_active_players==1.
+        - player (User): The player leaving the round.
+    """
+    with transaction.atomic():
+        state, users = load_state(round, player)
+        engine.leave(state, player.id)
+        save_state(round, state, users)
+    round.players.remove(player)
+    player.action = "fold"
+    player.order = -1
+    player.bet = 0
+    player.total_bet = 0
+    player.hand = ""
+    player.save(update_fields=["action", "order", "bet", "total_bet", "hand"])
+
+
+def leave_other_tables(player, table):
+    """
+    # Remove a player from the current rounds of the tables other than the given one
+    (a player can only sit at one table).
 
-    Returns:
-    --------
-        Set[int]: The indices of the winners.
-    """
-    winners = set()
-    if n_active_players > 1:
-        # Multiple active players: determine the winners
-        distributed_chips = 0
-        if len(final_bets) > 1:
-            # Multiple pots: need to distribute the chips in the right order
-            final_bets = sorted(final_bets.items(), key=lambda item: item[0])
-            previous_pot_value = 0
-            for value, indices in final_bets:
-                current_pot_value: int = 0
-                for index in indices:
-                    if index >= 0:
-                        current_pot_value += max(
-                            min(list(round.players.all())[index].total_bet, value)
-                            - previous_pot_value,
-                            0,
-                        )
-                    else:
-                        current_pot_value += max(-index - previous_pot_value, 0)
-                print("current_pot_value", current_pot_value)
-                distributed_chips, new_winners = distribute_chips(
-                    round,
-                    distributed_chips,
-                    current_pot_value,
-                    indices,
-                    player_final_hands,
-                )
-                winners = winners.union(new_winners)
-                previous_pot_value = value
+    Args:
+    -----
+        - player (User): The player joining a table.
+        - table (Table): The table he joins.
+    """
+    latest = Round.objects.filter(table=OuterRef("table")).order_by("-id")
+    rounds = (
+        Round.objects.filter(players=player)
+        .exclude(table=table)
+        .annotate(latest_id=Subquery(latest.values("id")[:1]))
+        .filter(id=F("latest_id"))
+    )
+    for round in rounds:
+        eject_player(round, player)
+
+
+def _departed_seats(round, state: TableState) -> List[Seat]:
+    """
+    # Get the seats of the players who left the round with chips in the pot,
+    from the contributions of the round.
+    They only build the pots: the players may be playing at another table by now,
+    so their seats are never saved.
+    A player who came back to the round keeps the chips he put in the pot before leaving.
+    """
+    seats = {seat.user_id: seat for seat in state.seats}
+    departed = []
+    contributions = round.contributions.filter(amount__gt=0).values_list(
+        "user_id", "user__username", "amount"
+    )
+    for user_id, name, amount in contributions:
+        if user_id in seats:
+            seats[user_id].total_bet = max(seats[user_id].total_bet, amount)
         else:
-            # Only 1 pot: distribute the chips
-            indices = list(final_bets.values())[0]
-            distributed_chips, winners = distribute_chips(
-                round,
-                distributed_chips,
-                round.pot,
-                indices,
-                player_final_hands,
-            )
+            departed.append(Seat(user_id, name, 0, total_bet=amount, action="fold"))
+    return departed
 
-        # If there are remaining chips, give them to the winners
-        while distributed_chips < round.pot:
-            for index in winners:
-                player = list(round.players.all())[index]
-                player.chips += 1
-                player.save()
-                distributed_chips += 1
-                print(player.username, "won", 1, "additional chip due to rounding")
-                if distributed_chips == round.pot:
-                    break
-    else:
-        if n_active_players == 1:
-            # Only 1 active player: the winner
-            winner = list(round.players.all())[last_active_index]
-            winner.chips += round.pot
-            print(winner.username, "won", round.pot, "chips (by default)")
-            winners.add(last_active_index)
-            winner.save()
-        # else:
-        #    #! No active players ???
-        #    pass
-    return winners
+
+def showdown(round, state: TableState):
+    """
+    # Determine the winners of a round loaded by load_state & distribute the pot
+    (see holdem.game.engine.resolve_round). The state is not saved.
+
+    Args:
+    -----
+        - round (Round): The current round of the game.
+        - state (TableState): The state of the round.
+    """
+    # Determine the final hands with the live hands of the players
+    community_cards: List[Card] = Card.from_code_string(state.board)
+    final_hands: List[FinalHand] = []
+    for seat in state.seats:
+        hand = _live_hand(
+            state.round_id, state.stage, state.board, seat.user_id, seat.hand
+        )
+        if hand is None:
+            hand = Hand(community_cards)
+        final_hands.append(hand.final_hand)
+    discard_live_hands(round)
+
+    state.departed = _departed_seats(round, state)
+    engine.resolve_round(state, final_hands)
 
 
 def resolve_round(round):
@@ -646,31 +758,7 @@ def resolve_round(round):
     -----
         round (Round): The current round of the game.
     """
-    # Determine the final hands
-    community_cards: List[Card] = Card.from_code_string(round.community_cards)
-    player_final_hands: List[FinalHand] = []
-    for player in list(round.players.all()):
-        hand = Hand(Card.from_code_string(player.hand) + community_cards)
-        player_final_hands.append(hand.final_hand)
-
-    # Separate the different pots
-    final_bets, n_active_players, last_active_index = calculate_pots(round)
-
-    # Distribute the chips
-    winners = distribute_pots(
-        round, player_final_hands, final_bets, n_active_players, last_active_index
-    )
-
-    # Reset the players' bets
-    for player in list(round.players.all()):
-        player.bet = 0
-        player.total_bet = 0
-        player.save()
-
-    # Set the winners and the best hand
-    winners_name_list = []
-    for index, player in enumerate(list(round.players.all())):
-        if index in winners:
-            winners_name_list.append(player.username)
-    round.winners_name = ", ".join(winners_name_list)
-    round.save()
+    with transaction.atomic():
+        state, users = load_state(round)
+        showdown(round, state)
+        save_state(round, state, users)
@@ -5,13 +5,22 @@ Classes:
 - FinalHandPower: Enumeration representing the power of a final hand in poker.
 - FinalHand: Represents the final hand in a poker game.
 - Hand: Represents a hand in a poker game.
+- IncrementalHand: A hand that grows card by card (e.g. street by street).
+
+Functions:
+- straight_top: Find the highest straight of a 13-bit rank mask.
+- final_hand_from_masks: Detect the final hand of a set of cards from its bitmasks.
+- evaluate_batch: Evaluate an array of hands at once (requires numpy).
 
 """
 
-from typing import List, Optional
+from functools import cached_property
+from operator import attrgetter
+from typing import Any, List, Optional, Sequence, Tuple
 from enum import Enum
 
-from holdem.game.card import Card
+from holdem.game.card import Card, CARDS, SUITS, VALUES
+from holdem.game import evaluator
 
 
 class FinalHandPower(Enum):
@@ -44,8 +53,13 @@ class FinalHand:
             Ordered from highest to lowest card value.
         suit (Optional[str]): String representing the suit of the hand (None if not relevant)
         name (str): Name of the hand (based on its power and value)
+        key (int):
+            Packed power and values of the 5 first cards, computed once.
+            Used for every comparison and for hashing.
     """
 
+    __slots__ = ("cards", "power", "value", "suit", "_key")
+
     def __init__(self, cards: List[Card], hand_power: FinalHandPower, suit: str = None):
         """
         Args:
@@ -72,6 +86,59 @@ class FinalHand:
         self.power = hand_power.value
         self.value = [card.value for card in cards]
         self.suit = suit
+        self._key = self.pack_key(self.power, [card.rank for card in cards])
+
+    @staticmethod
+    def pack_key(power: int, ranks: Sequence[int]) -> int:
+        """
+        # Pack the power and the values of a hand into one comparable integer.
+        4 bits per value (2 to 14, 0 if missing) for the 5 first cards, under the power.
+
+        Args:
+        -----
+            power (int): Power of the hand (value of FinalHandPower).
+            ranks (Sequence[int]): Ranks of the cards (Card.rank), in FinalHand.value order.
+
+        Returns:
+        --------
+            int: The key of the hand.
+        """
+        key = power
+        for i in range(5):
+            key = key << 4 | (ranks[i] + 2 if i < len(ranks) else 0)
+        return key
+
+    @property
+    def key(self) -> int:
+        """
+        # Getter for the comparison key of the hand.
+
+        Returns:
+        --------
+            int: The key of the hand (a stronger hand has a greater key).
+        """
+        return self._key
+
+    @staticmethod
+    def from_rank(rank: int, suit: Optional[str] = None) -> "FinalHand":
+        """
+        # Create a FinalHand object from the strength given by the evaluator.
+        The hand has no cards, only its power and values (enough to display it).
+
+        Args:
+        -----
+            rank (int): Strength of the hand (see holdem.game.evaluator).
+            suit (str, optional): Suit of the hand for flush or straight flush. Defaults to None.
+
+        Returns:
+        --------
+            FinalHand: Final hand of the given strength.
+        """
+        hand_power, ranks = evaluator.decode_rank(rank)
+        final_hand = FinalHand([], FinalHandPower(hand_power), suit)
+        final_hand.value = [VALUES[value_rank] for value_rank in ranks]
+        final_hand._key = FinalHand.pack_key(hand_power, ranks)
+        return final_hand
 
     @property
     def name(self) -> str:
@@ -117,6 +184,9 @@ class FinalHand:
         -----
             other (FinalHand): Other hand to compare with.
 
+        Only the 5 first cards are compared: two full houses
+        listing 5 and 6 cards with the same values are equal.
+
         Returns:
         --------
             int: 1 if this hand is stronger, -1 if other hand is stronger, 0 if equal.
@@ -129,78 +199,234 @@ class FinalHand:
         if not isinstance(other, FinalHand):
             raise TypeError("Other must be a FinalHand")
         # Return
-        if self.power > other.power:
-            return 1
-        if self.power < other.power:
-            return -1
-        num_values = {
-            "2": 2,
-            "3": 3,
-            "4": 4,
-            "5": 5,
-            "6": 6,
-            "7": 7,
-            "8": 8,
-            "9": 9,
-            "10": 10,
-            "JACK": 11,
-            "QUEEN": 12,
-            "KING": 13,
-            "ACE": 14,
-        }
-        for i in range(min(len(self.value), len(other.value))):
-            if num_values[self.value[i]] > num_values[other.value[i]]:
-                return 1
-            if num_values[self.value[i]] < num_values[other.value[i]]:
-                return -1
-        return 0
+        return (self._key > other._key) - (self._key < other._key)
 
     def __ge__(self, other) -> bool:
         # Check
         if not isinstance(other, FinalHand):
             raise TypeError("Other must be a FinalHand")
         # Return
-        return self.compare(other) >= 0
+        return self._key >= other._key
 
     def __gt__(self, other) -> bool:
         # Check
         if not isinstance(other, FinalHand):
             raise TypeError("Other must be a FinalHand")
         # Return
-        return self.compare(other) > 0
+        return self._key > other._key
 
     def __le__(self, other) -> bool:
         # Check
         if not isinstance(other, FinalHand):
             raise TypeError("Other must be a FinalHand")
         # Return
-        return self.compare(other) <= 0
+        return self._key <= other._key
 
     def __lt__(self, other) -> bool:
         # Check
         if not isinstance(other, FinalHand):
             raise TypeError("Other must be a FinalHand")
         # Return
-        return self.compare(other) < 0
+        return self._key < other._key
 
     def __eq__(self, other) -> bool:
         # Check
         if not isinstance(other, FinalHand):
             return False
         # Return
-        return self.compare(other) == 0
+        return self._key == other._key
 
     def __ne__(self, other) -> bool:
         # Check
         if not isinstance(other, FinalHand):
             return True
         # Return
-        return self.compare(other) != 0
+        return self._key != other._key
+
+    def __hash__(self) -> int:
+        return hash(self._key)
 
     def __str__(self) -> str:
         return self.name
 
 
+# Number of cards of a rank, indexed by the 4-bit mask of its suits
+_SUIT_COUNT: Tuple[int, ...] = tuple(bin(mask).count("1") for mask in range(16))
+# Cards of a rank, indexed by rank * 16 + the 4-bit mask of its suits (highest suit first)
+_RANK_CARDS: Tuple[Tuple[Card, ...], ...] = tuple(
+    tuple(CARDS[rank * 4 + suit] for suit in (3, 2, 1, 0) if suits >> suit & 1)
+    for rank in range(13)
+    for suits in range(16)
+)
+
+
+def straight_top(rank_mask: int) -> int:
+    """
+    # Find the highest straight of a 13-bit rank mask.
+    The ace is copied below the "2" so that the wheel (5 to ACE) is found too.
+
+    Args:
+    -----
+        rank_mask (int): Bit r is set if there is a card of rank r (0 for "2" to 12 for "ACE").
+
+    Returns:
+    --------
+        int: Rank of the highest card of the best straight (3 for the wheel), -1 if none.
+    """
+    extended = (rank_mask << 1) | (rank_mask >> 12)
+    runs = (
+        extended & (extended >> 1) & (extended >> 2) & (extended >> 3) & (extended >> 4)
+    )
+    return runs.bit_length() + 2 if runs else -1
+
+
+def _rank_cards(rank_suits: Sequence[int], rank: int) -> List[Card]:
+    """
+    # Get the cards of a rank, ordered like Hand.cards (highest suit first).
+
+    Args:
+    -----
+        rank_suits (Sequence[int]): 4-bit mask of the suits of each rank.
+        rank (int): The rank of the cards.
+
+    Returns:
+    --------
+        List[Card]: The cards of this rank.
+    """
+    return list(_RANK_CARDS[rank * 16 + rank_suits[rank]])
+
+
+def _ordered_cards(
+    rank_suits: Sequence[int], excluded_ranks: Tuple[int, ...], count: int
+) -> List[Card]:
+    """
+    # Get the highest cards, ordered like Hand.cards, skipping some ranks.
+
+    Args:
+    -----
+        rank_suits (Sequence[int]): 4-bit mask of the suits of each rank.
+        excluded_ranks (Tuple[int, ...]): The ranks to skip.
+        count (int): The maximum number of cards to return.
+
+    Returns:
+    --------
+        List[Card]: The cards (at most count).
+    """
+    cards: List[Card] = []
+    if count <= 0:
+        return cards
+    for rank in range(12, -1, -1):
+        suits = rank_suits[rank]
+        if suits and rank not in excluded_ranks:
+            for suit in (3, 2, 1, 0):
+                if suits >> suit & 1:
+                    cards.append(CARDS[rank * 4 + suit])
+                    if len(cards) == count:
+                        return cards
+    return cards
+
+
+def final_hand_from_masks(
+    rank_suits: Sequence[int], suit_masks: Sequence[int]
+) -> FinalHand:
+    """
+    # Detect the final hand of a set of cards (7 at most) from its bitmasks.
+    The hand is classified in one pass over the rank histogram, and the result
+    has the same cards and kickers as the detect_ methods of Hand.
+
+    Args:
+    -----
+        rank_suits (Sequence[int]): 4-bit mask of the suits of each rank (13 values).
+        suit_masks (Sequence[int]): 13-bit mask of the ranks of each suit (4 values).
+
+    Returns:
+    --------
+        FinalHand: Final hand detected from the masks.
+    """
+    # Straight flushes (7 cards can't make a flush in two suits)
+    flush_suit = -1
+    for suit in range(4):
+        if suit_masks[suit].bit_count() >= 5:
+            flush_suit = suit
+            break
+    if flush_suit >= 0:
+        top = straight_top(suit_masks[flush_suit])
+        if top >= 0:
+            return FinalHand(
+                [CARDS[(top - i) % 13 * 4 + flush_suit] for i in range(5)],
+                (
+                    FinalHandPower.ROYAL_FLUSH
+                    if top == 12
+                    else FinalHandPower.STRAIGHT_FLUSH
+                ),
+                SUITS[flush_suit],
+            )
+
+    # Ranks grouped by number of cards, from the highest rank
+    groups: Tuple[List[int], ...] = ([], [], [], [], [])
+    n_cards = 0
+    for rank in range(12, -1, -1):
+        suits = rank_suits[rank]
+        if suits:
+            count = _SUIT_COUNT[suits]
+            groups[count].append(rank)
+            n_cards += count
+    _, _, pairs, trips, quads = groups
+
+    if quads:
+        kicker = (
+            _ordered_cards(rank_suits, (quads[0],), 1)
+            or _rank_cards(rank_suits, quads[0])[:1]
+        )
+        return FinalHand(
+            _rank_cards(rank_suits, quads[0]) + kicker, FinalHandPower.FOUR_OF_A_KIND
+        )
+    if trips and (len(trips) > 1 or pairs):
+        full = max(trips[1:] + pairs)
+        return FinalHand(
+            _rank_cards(rank_suits, trips[0]) + _rank_cards(rank_suits, full),
+            FinalHandPower.FULL_HOUSE,
+        )
+    if flush_suit >= 0:
+        mask = suit_masks[flush_suit]
+        return FinalHand(
+            [
+                CARDS[rank * 4 + flush_suit]
+                for rank in range(12, -1, -1)
+                if mask >> rank & 1
+            ][:5],
+            FinalHandPower.FLUSH,
+            SUITS[flush_suit],
+        )
+    top = straight_top(suit_masks[0] | suit_masks[1] | suit_masks[2] | suit_masks[3])
+    if top >= 0:
+        ranks = [(top - i) % 13 for i in range(5)]
+        return FinalHand(
+            [CARDS[rank * 4 + rank_suits[rank].bit_length() - 1] for rank in ranks],
+            FinalHandPower.STRAIGHT,
+        )
+    if trips:
+        return FinalHand(
+            _rank_cards(rank_suits, trips[0])
+            + _ordered_cards(rank_suits, (trips[0],), min(2, n_cards - 3)),
+            FinalHandPower.THREE_OF_A_KIND,
+        )
+    if len(pairs) >= 2:
+        return FinalHand(
+            _rank_cards(rank_suits, pairs[0])
+            + _rank_cards(rank_suits, pairs[1])
+            + _ordered_cards(rank_suits, (pairs[0], pairs[1]), 1),
+            FinalHandPower.TWO_PAIRS,
+        )
+    if pairs:
+        return FinalHand(
+            _rank_cards(rank_suits, pairs[0])
+            + _ordered_cards(rank_suits, (pairs[0],), min(5, n_cards) - 2),
+            FinalHandPower.ONE_PAIR,
+        )
+    return FinalHand(_ordered_cards(rank_suits, (), 5), FinalHandPower.HIGH_CARD)
+
+
 class Hand:
     """
     # Represents a hand in a poker game.
@@ -208,9 +434,12 @@ class Hand:
     Attributes:
     -----------
         cards (List[Card]): List of Card objects forming the hand.
+        rank_suits (List[int]): 4-bit mask of the suits of each rank (13 values).
+        suit_masks (List[int]): 13-bit mask of the ranks of each suit (4 values).
         sep_suits (dict): Dictionary with suits as keys and lists of cards as values.
         sep_values (dict): Dictionary with values as keys and lists of cards as values.
         final_hand (FinalHand): Final hand detected from the given cards.
+        rank (int): Strength of the hand given by the evaluator (only for 5 to 7 cards).
     """
 
     SUITS = {"CLUBS": 0, "DIAMONDS": 1, "HEARTS": 2, "SPADES": 3}
@@ -240,25 +469,65 @@ class Hand:
         Raises:
         -------
             TypeError: If input types are incorrect.
-            ValueError: If the number of cards is invalid.
+            ValueError: If the number of cards is invalid or if a card is repeated.
         """
         # Checks
         if not isinstance(cards, list):
             raise TypeError("Cards must be a list")
         if not all(isinstance(card, Card) for card in cards):
             raise TypeError("All cards must be Card objects")
-        if 0 > len(cards) > 7:
-            raise ValueError("A hand can't have more than 7 cards or less than 1.")
+        if len(cards) > 7:
+            raise ValueError("A hand can't have more than 7 cards.")
         # Init
-        self.cards = sorted(
-            cards,
-            key=lambda card: self.NUM_VALUES[card.value] + self.SUITS[card.suit] / 4,
-            reverse=True,
-        )
-        self.sep_suits = self.separate_by_suits()
-        self.sep_values = self.separate_values()
+        self.rank_suits = [0] * 13
+        self.suit_masks = [0] * 4
+        for card in cards:
+            if self.rank_suits[card.rank] & card.suit_bit:
+                raise ValueError(f"The {card} is in the hand twice")
+            self.rank_suits[card.rank] |= card.suit_bit
+            self.suit_masks[card.suit_index] |= card.rank_bit
+        # Sorted by value then suit, from the highest (card.id is rank * 4 + suit)
+        self.cards = sorted(cards, key=attrgetter("id"), reverse=True)
         self.final_hand = self.detect_final_hand()
 
+    @cached_property
+    def sep_suits(self) -> dict:
+        """
+        # Getter for the cards separated by suits (see separate_by_suits).
+
+        Returns:
+        --------
+            dict: Dictionary with suits as keys and lists of cards as values.
+        """
+        return self.separate_by_suits()
+
+    @cached_property
+    def sep_values(self) -> dict:
+        """
+        # Getter for the cards separated by values (see separate_values).
+
+        Returns:
+        --------
+            dict: Dictionary with values as keys and lists of cards as values.
+        """
+        return self.separate_values()
+
+    @cached_property
+    def rank(self) -> int:
+        """
+        # Getter for the strength of the hand, computed by the lookup table evaluator.
+        Comparing the ranks of two hands is equivalent to comparing their final hands.
+
+        Returns:
+        --------
+            int: Strength of the hand (higher is better).
+
+        Raises:
+        -------
+            ValueError: If the hand does not have 5 to 7 cards.
+        """
+        return evaluator.evaluate(self.cards)
+
     def separate_by_suits(self) -> dict:
         """
         # Separate the cards in the hand by suits.
@@ -540,8 +809,19 @@ class Hand:
         return FinalHand(self.cards[:length], FinalHandPower.HIGH_CARD)
 
     def detect_final_hand(self) -> FinalHand:
+        """
+        # Detect the final hand from the given hand, in a single pass over its bitmasks.
+
+        Returns:
+        --------
+            FinalHand: Final hand detected from the hand.
+        """
+        return final_hand_from_masks(self.rank_suits, self.suit_masks)
+
+    def detect_final_hand_by_scans(self) -> FinalHand:
         """
         # Detect the final hand from the given hand, using all detect_ methods.
+        Slower than detect_final_hand, kept as a reference implementation.
 
         Returns:
         --------
@@ -571,3 +851,204 @@ class Hand:
             ", ".join([str(card) for card in self.cards])
             + f"\nFinal hand: {self.final_hand}"
         )
+
+
+class IncrementalHand:
+    """
+    # Represents a hand that grows card by card, e.g. the hole cards of a player
+    to which the community cards are added street by street.
+
+    Adding a card only updates the rank histogram and the bitmasks,
+    and the final hand is detected again (in one pass over the 13 ranks) on the next access,
+    so each street costs a constant amount of work instead of a new Hand.
+
+    Attributes:
+    -----------
+        cards (List[Card]): The cards of the hand, in the order they were added.
+        counts (List[int]): Number of cards of each rank (13 values).
+        rank_suits (List[int]): 4-bit mask of the suits of each rank (13 values).
+        suit_masks (List[int]): 13-bit mask of the ranks of each suit (4 values).
+        final_hand (FinalHand): Final hand of the current cards.
+        rank (int): Strength of the current cards given by the evaluator (5 to 7 cards).
+    """
+
+    __slots__ = ("cards", "counts", "rank_suits", "suit_masks", "_final_hand")
+
+    def __init__(self, cards: Sequence[Card] = ()):
+        """
+        Args:
+        -----
+            cards (Sequence[Card], optional): The first cards of the hand. Defaults to none.
+
+        Raises:
+        -------
+            TypeError: If a card is not a Card object.
+            ValueError: If the hand would have more than 7 cards or if a card is repeated.
+        """
+        self.cards: List[Card] = []
+        self.counts = [0] * 13
+        self.rank_suits = [0] * 13
+        self.suit_masks = [0] * 4
+        self._final_hand: Optional[FinalHand] = None
+        self.extend(cards)
+
+    def add(self, card: Card) -> "IncrementalHand":
+        """
+        # Add a card to the hand.
+
+        Args:
+        -----
+            card (Card): The card to add.
+
+        Returns:
+        --------
+            IncrementalHand: The hand itself, to chain the calls.
+
+        Raises:
+        -------
+            TypeError: If card is not a Card object.
+            ValueError: If the hand already has 7 cards or already contains the card.
+        """
+        # Checks
+        if not isinstance(card, Card):
+            raise TypeError("All cards must be Card objects")
+        if len(self.cards) == 7:
+            raise ValueError("A hand can't have more than 7 cards.")
+        if self.rank_suits[card.rank] & card.suit_bit:
+            raise ValueError(f"The {card} is in the hand twice")
+        # Update
+        self.cards.append(card)
+        self.counts[card.rank] += 1
+        self.rank_suits[card.rank] |= card.suit_bit
+        self.suit_masks[card.suit_index] |= card.rank_bit
+        self._final_hand = None
+        return self
+
+    def extend(self, cards: Sequence[Card]) -> "IncrementalHand":
+        """
+        # Add several cards to the hand (see add).
+
+        Args:
+        -----
+            cards (Sequence[Card]): The cards to add.
+
+        Returns:
+        --------
+            IncrementalHand: The hand itself, to chain the calls.
+        """
+        for card in cards:
+            self.add(card)
+        return self
+
+    @property
+    def final_hand(self) -> FinalHand:
+        """
+        # Getter for the final hand of the current cards (same result as Hand.final_hand).
+
+        Returns:
+        --------
+            FinalHand: Final hand detected from the current cards.
+        """
+        if self._final_hand is None:
+            self._final_hand = final_hand_from_masks(self.rank_suits, self.suit_masks)
+        return self._final_hand
+
+    @property
+    def rank(self) -> int:
+        """
+        # Getter for the strength of the current cards, computed by the evaluator.
+
+        Returns:
+        --------
+            int: Strength of the hand (higher is better).
+
+        Raises:
+        -------
+            ValueError: If the hand does not have 5 to 7 cards.
+        """
+        if not evaluator.MIN_CARDS <= len(self.cards) <= evaluator.MAX_CARDS:
+            raise ValueError("Only hands of 5 to 7 cards can be evaluated")
+        return evaluator.evaluate_counts(self.counts, self.suit_masks, len(self.cards))
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    def __str__(self) -> str:
+        return (
+            ", ".join([str(card) for card in self.cards])
+            + f"\nFinal hand: {self.final_hand}"
+        )
+
+
+def evaluate_batch(card_ids: Any, powers: bool = False, chunk_size: int = 1 << 16):
+    """
+    # Evaluate an array of hands at once with numpy, using the lookup tables of the evaluator.
+    The hands are processed by chunks, so the memory used does not depend on N.
+
+    Args:
+    -----
+        card_ids (array-like): (N, 5), (N, 6) or (N, 7) array of distinct card ids (Card.id).
+        powers (bool, optional): Also return the power of each hand. Defaults to False.
+        chunk_size (int, optional): Number of hands processed at once. Defaults to 65536.
+
+    Returns:
+    --------
+        numpy.ndarray | Tuple[numpy.ndarray, numpy.ndarray]:
+            - (N,) uint16 array of the strengths of the hands (see holdem.game.evaluator).
+            - (N,) uint8 array of the powers of the hands (FinalHandPower values),
+              only if powers is True.
+
+    Raises:
+    -------
+        ImportError: If numpy is not installed.
+        TypeError: If chunk_size is not an int.
+        ValueError: If the array does not have the right shape or contains invalid ids.
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    # Checks
+    ids = np.asarray(card_ids)
+    if ids.ndim != 2 or not 5 <= ids.shape[1] <= 7:
+        raise ValueError("card_ids must be an array of shape (N, 5), (N, 6) or (N, 7)")
+    if ids.size and (ids.min() < 0 or ids.max() > 51):
+        raise ValueError("card_ids must be between 0 and 51")
+    if not isinstance(chunk_size, int):
+        raise TypeError("chunk_size must be an int")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+    # Init
+    n_hands, n_cards = ids.shape
+    flush_table = np.frombuffer(evaluator.FLUSH_TABLE, dtype=np.uint16)
+    noflush_table = np.frombuffer(evaluator.NOFLUSH_TABLE, dtype=np.uint16)
+    noflush_table = noflush_table[evaluator.NOFLUSH_OFFSETS[n_cards] :]
+    hash_step = np.array(evaluator.HASH_STEP, dtype=np.intp)
+    rank_offsets = np.arange(13) * 40
+    strengths = np.empty(n_hands, dtype=np.uint16)
+    # Evaluation
+    for start in range(0, n_hands, chunk_size):
+        chunk = ids[start : start + chunk_size].astype(np.intp)
+        size = len(chunk)
+        ranks, suits = chunk >> 2, chunk & 3
+        rows = np.arange(size)[:, None]
+        # Others: perfect hash of the rank histogram
+        counts = np.bincount((rows * 13 + ranks).ravel(), minlength=size * 13)
+        counts = counts.reshape(size, 13)
+        remaining = n_cards - np.cumsum(counts, axis=1) + counts
+        hashes = hash_step[rank_offsets + counts * 8 + remaining].sum(axis=1)
+        chunk_strengths = noflush_table[hashes]
+        # Flushes: rank mask of the suit having 5 cards or more
+        suit_counts = np.bincount((rows * 4 + suits).ravel(), minlength=size * 4)
+        suit_counts = suit_counts.reshape(size, 4)
+        flushes = np.flatnonzero(suit_counts.max(axis=1) >= 5)
+        if len(flushes):
+            flush_suit = suit_counts[flushes].argmax(axis=1)
+            flush_masks = np.where(
+                suits[flushes] == flush_suit[:, None], 1 << ranks[flushes], 0
+            ).sum(axis=1)
+            chunk_strengths[flushes] = flush_table[flush_masks]
+        strengths[start : start + size] = chunk_strengths
+    if powers:
+        floors = np.array(evaluator.POWER_FLOORS)
+        hand_powers = np.searchsorted(floors, strengths, side="right") - 1
+        return strengths, hand_powers.astype(np.uint8)
+    return strengths
@@ -0,0 +1,157 @@
+"""
+This module rebuilds the state of a table from the events of its hand history.
+
+The transitions of holdem.game.engine append an event to the state for each change
+they make, as a compact list starting with the kind of the event:
+- ["hand", snapshot]: A hand begins, from the table of the snapshot (see TableState.snapshot).
+- ["sit", seat]: A player sits at the table (the fields of his Seat).
+- ["leave", user_id]: A player leaves the table (his chips stay in the pot).
+- ["stage", stage]: The round goes to a stage (pre-flop, showdown or finished early).
+- ["deal", board, [[user_id, order, hand], ...]]: The cards are dealt to the seated players.
+- ["blind", user_id, name, amount]: A player places a blind.
+- ["turn", user_id]: It's the turn of a player.
+- ["act", user_id, action, amount]: A player acts, putting the amount in the pot.
+- ["street", stage]: The round goes to the next street (the bets are reset).
+- ["win", winners_name, winner_hand, [[user_id, chips], ...]]: The pots are paid out.
+
+holdem.game.game saves the events in the same transaction as the state
+(see holdem.models.HandEvent), with a snapshot of the state every SNAPSHOT_INTERVAL events,
+so any point of a round can be rebuilt from the closest snapshot before it.
+
+Functions:
+- encode: Encode an event or a snapshot as compact JSON.
+- decode: Decode an event or a snapshot.
+- apply_event: Apply an event to a state.
+- replay: Apply events to a state.
+
+Constants:
+- SNAPSHOT_INTERVAL: The number of events between two snapshots of the state.
+"""
+
+import json
+from typing import Iterable
+
+from holdem.game.engine import INACTIVE_ACTIONS, Seat, TableState
+
+SNAPSHOT_INTERVAL = 32
+
+
+def encode(data: list) -> str:
+    """
+    # Encode an event or a snapshot as compact JSON (without spaces).
+
+    Args:
+    -----
+        data (list): The event or the snapshot.
+
+    Returns:
+    --------
+        str: The JSON text.
+    """
+    return json.dumps(data, separators=(",", ":"))
+
+
+def decode(text: str) -> list:
+    """
+    # Decode an event or a snapshot encoded by encode.
+
+    Args:
+    -----
+        text (str): The JSON text.
+
+    Returns:
+    --------
+        list: The event or the snapshot.
+    """
+    return json.loads(text)
+
+
+def _move_chips(state: TableState, seat: Seat, amount: int):
+    """
+    # Move chips from a player to the pot.
+    """
+    seat.bet += amount
+    seat.total_bet += amount
+    seat.chips -= amount
+    state.pot += amount
+
+
+def apply_event(state: TableState, event: list):
+    """
+    # Apply an event to a state, making the same changes as the transition that logged it.
+
+    Args:
+    -----
+        - state (TableState): The state of the table.
+        - event (list): The event.
+
+    Raises:
+    -------
+        ValueError: If the kind of the event is unknown.
+    """
+    kind = event[0]
+    if kind == "hand":
+        restored = TableState.from_snapshot(event[1])
+        restored.events = state.events
+        for name in TableState.__slots__:
+            setattr(state, name, getattr(restored, name))
+    elif kind == "sit":
+        state.seats.append(Seat(*event[1]))
+    elif kind == "leave":
+        seat = state.seat(event[1])
+        state.seats.remove(seat)
+        if seat.total_bet > 0:
+            state.departed.append(seat)
+    elif kind == "stage":
+        state.stage = event[1]
+    elif kind == "deal":
+        state.board = event[1]
+        for user_id, order, hand in event[2]:
+            seat = state.seat(user_id)
+            seat.order, seat.hand, seat.action = order, hand, ""
+    elif kind == "blind":
+        seat = state.seat(event[1])
+        seat.action = event[2]
+        _move_chips(state, seat, event[3])
+    elif kind == "turn":
+        state.player_to_play = event[1]
+    elif kind == "act":
+        seat = state.seat(event[1])
+        seat.action = event[2]
+        if event[2].isdigit():
+            state.min_raise = int(event[2])
+        _move_chips(state, seat, event[3])
+    elif kind == "street":
+        state.stage = event[1]
+        for seat in state.seats:
+            seat.bet = 0
+            if seat.action not in INACTIVE_ACTIONS and seat.chips > 0:
+                seat.action = ""
+        state.min_raise = state.blind
+    elif kind == "win":
+        state.winners_name, state.winner_hand = event[1], event[2]
+        for user_id, chips in event[3]:
+            state.seat(user_id).chips += chips
+        for seat in state.seats + state.departed:
+            seat.bet = 0
+            seat.total_bet = 0
+    else:
+        raise ValueError(f"Unknown event: {kind}")
+
+
+def replay(state: TableState, events: Iterable[list]) -> TableState:
+    """
+    # Apply events to a state, in order.
+
+    Args:
+    -----
+        - state (TableState): The state of the table before the events.
+        - events (Iterable[list]): The events.
+
+    Returns:
+    --------
+        TableState: The same state, after the events.
+    """
+    for event in events:
+        apply_event(state, event)
+    return state
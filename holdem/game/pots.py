@@ -0,0 +1,174 @@
+"""
+This module splits the chips of a Texas Hold'em round into a main pot and side pots.
+
+Each player can only win, from each other player, as many chips as he put in the pot himself.
+The contributions are sorted once, and swept from the highest to the lowest:
+every distinct contribution closes a layer of the pot, whose eligible players
+are the players who did not fold and put at least that much in the pot.
+The best hands of the eligible players are kept up to date during the sweep,
+so each layer knows its winners without going through the players again.
+
+The layers with the same eligible players are merged into one pot,
+and the chips of a layer nobody can win (only put in by players who folded or left)
+go to the pot below it.
+When a pot is split, the odd chips go to the first winners, in the order of the stakes
+(give the stakes from the first player after the dealer to get the usual rule).
+
+Classes:
+- Stake: The chips put in the pot by a player, and his hand.
+- Pot: A pot, its eligible players and its winners.
+
+Functions:
+- side_pots: Split the chips into pots and compute the payouts of the players.
+
+Example usage:
+--------------
+    pots, payouts = side_pots(
+        [Stake("A", 100, rank=7000), Stake("B", 300, rank=5000), Stake("C", 300, rank=1000)]
+    )
+    # pots: 300 chips won by A, then 400 chips won by B
+    # payouts: {"A": 300, "B": 400}
+"""
+
+from typing import Any, Dict, Hashable, List, NamedTuple, Tuple
+
+
+class Stake(NamedTuple):
+    """
+    # The chips put in the pot by a player during the round, and his hand.
+
+    Attributes:
+    -----------
+        seat (Hashable): The identifier of the player.
+        contribution (int): The chips he put in the pot.
+        folded (bool): If he can't win (folded, spectator or left the table).
+        rank (Any): The value of his hand (any comparable value, the highest wins).
+            Ignored if he folded.
+    """
+
+    seat: Hashable
+    contribution: int
+    folded: bool = False
+    rank: Any = None
+
+
+class Pot(NamedTuple):
+    """
+    # A pot of the round.
+
+    Attributes:
+    -----------
+        amount (int): The chips in the pot.
+        cap (int): The highest contribution taken by the pot (from each player).
+        eligible (Tuple[Hashable, ...]): The players who can win the pot.
+        winners (Tuple[Hashable, ...]): The players who win the pot (sharing it).
+        odd_chips (int): The chips left over by the split, given to the first winners.
+    """
+
+    amount: int
+    cap: int
+    eligible: Tuple[Hashable, ...]
+    winners: Tuple[Hashable, ...]
+    odd_chips: int
+
+
+def side_pots(stakes: List[Stake]) -> Tuple[List[Pot], Dict[Hashable, int]]:
+    """
+    # Split the chips put in the pot into a main pot and side pots,
+    and give each pot to the best hands among its eligible players.
+
+    Args:
+    -----
+        stakes (List[Stake]): The stakes of the players,
+            in the order the odd chips are given.
+
+    Returns:
+    --------
+    Tuple[List[Pot], Dict[Hashable, int]]:
+        - List[Pot]: The pots, from the main pot to the last side pot.
+        - Dict[Hashable, int]: The chips won by each player (winners only).
+            If every player folded, nobody wins: the pots have no winners.
+
+    Raises:
+    -------
+        ValueError: If a contribution is negative or a seat is given twice.
+    """
+    # Checks
+    if any(stake.contribution < 0 for stake in stakes):
+        raise ValueError("A contribution can't be negative")
+    if len({stake.seat for stake in stakes}) != len(stakes):
+        raise ValueError("Each seat can only have one stake")
+
+    # Sweep the contributions from the highest to the lowest:
+    # the players eligible for a layer are eligible for all the layers below it
+    order = sorted(range(len(stakes)), key=lambda i: stakes[i].contribution)
+    eligible: List[int] = []
+    winners: List[int] = []
+    best = None
+    layers: List[Tuple[int, int, int, List[int], int]] = []
+    i = len(order) - 1
+    while i >= 0 and stakes[order[i]].contribution > 0:
+        level = stakes[order[i]].contribution
+        while i >= 0 and stakes[order[i]].contribution == level:
+            stake = stakes[order[i]]
+            if not stake.folded:
+                eligible.append(order[i])
+                if best is None or stake.rank > best:
+                    # A new list, as the layers above keep the previous one
+                    best, winners = stake.rank, [order[i]]
+                elif stake.rank == best:
+                    winners.append(order[i])
+            i -= 1
+        lower = stakes[order[i]].contribution if i >= 0 else 0
+        contributors = len(order) - 1 - i
+        # The eligible players and the winners of the layer are the first ones of the lists
+        layers.append(
+            (
+                (level - lower) * contributors,
+                level,
+                len(eligible),
+                winners,
+                len(winners),
+            )
+        )
+
+    # Merge the layers from the main pot, and give the dead layers to the pot below
+    merged: List[List] = []
+    carried = 0
+    for amount, level, n_eligible, layer_winners, n_winners in reversed(layers):
+        if n_eligible == 0:
+            if merged:
+                merged[-1][0] += amount
+            else:
+                carried += amount
+        elif merged and merged[-1][2] == n_eligible:
+            merged[-1][0] += amount
+            merged[-1][1] = level
+        else:
+            merged.append(
+                [amount + carried, level, n_eligible, layer_winners[:n_winners]]
+            )
+            carried = 0
+    if carried:
+        # Every player folded: nobody wins the chips
+        merged.append([carried, layers[0][1], 0, []])
+
+    # Split the pots between their winners
+    pots: List[Pot] = []
+    payouts: Dict[Hashable, int] = {}
+    for amount, cap, n_eligible, pot_winners in merged:
+        pot_winners = sorted(pot_winners)
+        odd_chips = amount % len(pot_winners) if pot_winners else 0
+        for k, index in enumerate(pot_winners):
+            share = amount // len(pot_winners) + (1 if k < odd_chips else 0)
+            payouts[stakes[index].seat] = payouts.get(stakes[index].seat, 0) + share
+        pots.append(
+            Pot(
+                amount,
+                cap,
+                tuple(stakes[index].seat for index in sorted(eligible[:n_eligible])),
+                tuple(stakes[index].seat for index in pot_winners),
+                odd_chips,
+            )
+        )
+    return pots, payouts
@@ -5,7 +5,7 @@ It contains the PrintGame class which represents a poker game
 and provides methods to watch a round unfold in the terminal.
 """
 
-from holdem.game.hand import Hand
+from holdem.game.hand import IncrementalHand
 from holdem.game.deck import Deck
 
 
@@ -18,6 +18,8 @@ class PrintGame:
         players (int): The number of players in the game.
         deck (Deck): The deck of cards used in the game.
         players_cards (List[List[Card]]): The cards held by each player.
+        players_hands (List[IncrementalHand]):
+            The hand of each player, completed with the community cards street by street.
         community_cards (List[Card]): The community cards on the table.
     """
 
@@ -36,6 +38,7 @@ class PrintGame:
         if deck_id is not None:
             self.deck.shuffle()
         self.players_cards = []
+        self.players_hands = []
         self.community_cards = []
 
     def prepare_round(self):
@@ -43,6 +46,7 @@ class PrintGame:
         # Prepare for a new round of the game by dealing cards to players and community.
         """
         self.players_cards = [self.deck.draw(2) for _ in range(self.players)]
+        self.players_hands = [IncrementalHand(cards) for cards in self.players_cards]
         self.community_cards = self.deck.draw(5)
 
     def play_step(self, step_name, community_cards_drawn, active_players=None):
@@ -63,10 +67,10 @@ class PrintGame:
             ">> Community cards:",
             [card.unicode for card in self.community_cards][:community_cards_drawn],
         )
-        players_hands = [
-            Hand(cards + self.community_cards[:community_cards_drawn])
-            for cards in [self.players_cards[i] for i in active_players]
-        ]
+        # Only the community cards revealed since the last step are added
+        players_hands = [self.players_hands[i] for i in active_players]
+        for hand in players_hands:
+            hand.extend(self.community_cards[len(hand) - 2 : community_cards_drawn])
         sorted_indices = sorted(
             range(len(active_players)),
             key=lambda i: players_hands[i].final_hand,
@@ -0,0 +1,551 @@
+# pylint: disable=W0622, C0415
+# W0622: Redefining built-in 'round'
+#   => Irrelevant as round() will never be used here (there are no floats)
+# C0415: Import outside toplevel
+#   => The database modules can only be imported once Django is set up (database mode only)
+
+"""
+This module simulates Texas Hold'em tables played by bots, to measure the throughput
+of the game and to soak test its rules.
+
+Each table plays full hands (blinds, betting streets, showdown) with the rules of
+holdem.game.engine, its seats being played by bot policies. The tables are split
+between a pool of processes, and the report gives the hands and the actions per second,
+and the time spent in each phase of the hands.
+The total of the chips is checked after each hand (the busted players buy in again).
+
+Two modes are available:
+- engine: The hands are played on a TableState, without any database.
+- db: The hands are played like the view does, through holdem.game.game: each action
+    locks and loads the round, applies the rules and saves the round in a transaction.
+    Each process uses its own in-memory SQLite database.
+
+holdem.game.print_game.PrintGame only prints the hands of a deal, without any betting;
+the simulation plays the real rounds instead.
+
+Classes:
+- RandomBot: Plays random actions.
+- CallingStation: Always checks or calls.
+- EquityBot: Plays the hands whose preflop equity is above a threshold.
+- SimulationStats: The counters and the timings of a simulation.
+- TableConfig: The configuration of a simulated table.
+
+Functions:
+- play_hand: Play a hand on a table state, without any database.
+- run_table: Play the hands of a table.
+- setup_memory_database: Set up Django with an in-memory database.
+- simulate: Play the hands of many tables in a pool of processes.
+
+Constants:
+- BOTS: The bot policies, by name.
+- MODES: The simulation modes.
+- PHASES: The phases of a hand, in the order of the report.
+- MAX_ACTIONS: The maximum number of actions of a hand (to detect endless hands).
+
+Example usage:
+--------------
+    python -m holdem.game.simulation --tables 8 --hands 500 --players 6 --workers 4
+    python -m holdem.game.simulation --mode db --bots random,station,equity
+"""
+
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, NamedTuple, Optional, Sequence
+
+from holdem.game import engine
+from holdem.game.deck import DealStream, derive_seed
+from holdem.game.engine import Seat, Stage, TableState
+from holdem.game.preflop import MAX_PLAYERS, MIN_PLAYERS, preflop_equity
+
+MODES = ("engine", "db")
+PHASES = ("load", "deal", "decide", "rules", "showdown", "save")
+MAX_ACTIONS = 1000
+
+
+class RandomBot:
+    """
+    # A bot playing random actions: mostly calls, sometimes raises (up to all-in) or folds.
+    """
+
+    name = "random"
+
+    def __call__(self, state: TableState, seat: Seat, rng: random.Random) -> str:
+        """
+        # Choose the action of the bot.
+
+        Args:
+        -----
+            - state (TableState): The state of the table.
+            - seat (Seat): The seat of the bot.
+            - rng (random.Random): The random generator of the table.
+
+        Returns:
+        --------
+            str: The action ("call", "fold" or the amount of a raise).
+        """
+        to_call = state.current_bet - seat.bet
+        draw = rng.random()
+        if draw < 0.15 and to_call > 0:
+            return "fold"
+        if draw < 0.75:
+            return "call"
+        max_raise = seat.chips - to_call
+        if max_raise <= 0:
+            return "call"
+        if draw > 0.97 or max_raise <= state.min_raise:
+            return str(max_raise)
+        return str(rng.randint(state.min_raise, min(max_raise, 4 * state.min_raise)))
+
+
+class CallingStation:
+    """
+    # A bot that always checks or calls.
+    """
+
+    name = "station"
+
+    def __call__(self, state: TableState, seat: Seat, rng: random.Random) -> str:
+        """
+        # Choose the action of the bot (see RandomBot.__call__).
+        """
+        return "call"
+
+
+class EquityBot:
+    """
+    # A bot playing the hands whose preflop equity (against the players still in the hand)
+    is above a threshold: it raises the strong hands, calls the others, then calls down.
+    Below the threshold, it checks when it can and folds otherwise.
+
+    Attributes:
+    -----------
+        threshold (float): The lowest equity played.
+        raise_threshold (float): The lowest equity raised before the flop.
+    """
+
+    name = "equity"
+
+    def __init__(self, threshold: float = 0.5, raise_threshold: float = 0.65):
+        """
+        Args:
+        -----
+            - threshold (float, optional): The lowest equity played. Defaults to 0.5.
+            - raise_threshold (float, optional):
+                The lowest equity raised before the flop. Defaults to 0.65.
+        """
+        self.threshold = threshold
+        self.raise_threshold = raise_threshold
+
+    def __call__(self, state: TableState, seat: Seat, rng: random.Random) -> str:
+        """
+        # Choose the action of the bot (see RandomBot.__call__).
+        """
+        to_call = state.current_bet - seat.bet
+        if state.stage != Stage.PRE_FLOP.value:
+            # The hand was played before the flop: call it down
+            return "call"
+        players = sum(s.action not in engine.INACTIVE_ACTIONS for s in state.seats)
+        equity = preflop_equity(seat.hand, min(max(players, MIN_PLAYERS), MAX_PLAYERS))
+        if equity < self.threshold:
+            return "call" if to_call == 0 else "fold"
+        if equity >= self.raise_threshold and seat.chips - to_call > state.min_raise:
+            return str(state.min_raise)
+        return "call"
+
+
+BOTS = {bot.name: bot for bot in (RandomBot, CallingStation, EquityBot)}
+
+
+@dataclass
+class SimulationStats:
+    """
+    # The counters and the timings of a simulation.
+
+    Attributes:
+    -----------
+        tables (int): The number of tables.
+        hands (int): The number of hands played.
+        actions (int): The number of actions of the players.
+        events (int): The number of events logged by the rules (see holdem.game.history).
+        rebuys (int): The number of times a busted player bought in again.
+        phases (Dict[str, float]): The time spent in each phase, in seconds (summed
+            over the processes): loading and saving the round (db mode only),
+            dealing, choosing the actions, applying the rules and the showdown.
+        elapsed (float): The wall time of the simulation, in seconds.
+    """
+
+    tables: int = 0
+    hands: int = 0
+    actions: int = 0
+    events: int = 0
+    rebuys: int = 0
+    phases: Dict[str, float] = field(default_factory=lambda: dict.fromkeys(PHASES, 0.0))
+    elapsed: float = 0.0
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        # Add the time spent in the block to a phase.
+
+        Args:
+        -----
+            name (str): The name of the phase (one of PHASES).
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] += time.perf_counter() - start
+
+    def add(self, other: "SimulationStats"):
+        """
+        # Add the counters and the timings of another simulation (e.g. of another table).
+
+        Args:
+        -----
+            other (SimulationStats): The other simulation.
+        """
+        self.tables += other.tables
+        self.hands += other.hands
+        self.actions += other.actions
+        self.events += other.events
+        self.rebuys += other.rebuys
+        for name, seconds in other.phases.items():
+            self.phases[name] += seconds
+
+    def __str__(self) -> str:
+        elapsed = self.elapsed or 1e-9
+        hands = self.hands or 1
+        lines = [
+            f"{self.tables} tables, {self.hands} hands in {self.elapsed:.2f} s",
+            f"{'hands/s':>12} {self.hands / elapsed:12.1f}",
+            f"{'actions/s':>12} {self.actions / elapsed:12.1f}",
+            f"{'actions/hand':>12} {self.actions / hands:12.2f}",
+            f"{'events/hand':>12} {self.events / hands:12.2f}",
+            f"{'rebuys':>12} {self.rebuys:12d}",
+            f"{'phase':>12} {'total (s)':>12} {'ms/hand':>12} {'share':>8}",
+        ]
+        total = sum(self.phases.values()) or 1e-9
+        for name in PHASES:
+            seconds = self.phases[name]
+            if seconds == 0:
+                continue
+            lines.append(
+                f"{name:>12} {seconds:12.3f} {1000 * seconds / hands:12.3f}"
+                f" {seconds / total:8.1%}"
+            )
+        return "\n".join(lines)
+
+
+class TableConfig(NamedTuple):
+    """
+    # The configuration of a simulated table.
+
+    Attributes:
+    -----------
+        index (int): The index of the table (its deals and its bots are seeded with it).
+        hands (int): The number of hands to play.
+        bots (Sequence[str]): The names of the bots of the seats (see BOTS).
+        mode (str): "engine" or "db" (see MODES).
+        seed (int): The seed of the simulation.
+        stack (int): The chips of each player, and of each buy-in.
+        blind (int): The small blind.
+    """
+
+    index: int
+    hands: int
+    bots: Sequence[str]
+    mode: str = "engine"
+    seed: int = 0
+    stack: int = 1000
+    blind: int = 25
+
+
+def _bot_action(state: TableState, bots, rng: random.Random) -> tuple:
+    """
+    # Get the seat to play and its action, replaced by a call if the bot chose an invalid one.
+    """
+    seat = state.seat(state.player_to_play)
+    action = bots[seat.user_id](state, seat, rng)
+    if not engine.check_action(state, seat, action)[0]:
+        action = "call"
+    return seat, action
+
+
+def _rebuy(state: TableState, stack: int, stats: SimulationStats):
+    """
+    # Give a new stack to the busted players, and check the total of the chips.
+    """
+    for seat in state.seats:
+        if seat.chips == 0:
+            seat.chips = stack
+            stats.rebuys += 1
+    total = sum(seat.chips for seat in state.seats)
+    if total != stack * (len(state.seats) + stats.rebuys):
+        raise AssertionError(
+            f"Round {state.round_id}: {total} chips instead of "
+            f"{stack * (len(state.seats) + stats.rebuys)}"
+        )
+
+
+def play_hand(
+    state: TableState,
+    deck,
+    bots: Dict[int, object],
+    rng: random.Random,
+    stats: SimulationStats,
+):
+    """
+    # Play a hand on a table state, without any database (from the deal to the showdown).
+
+    Args:
+    -----
+        - state (TableState): The state of the table, waiting for a new round.
+        - deck (Deck): The shuffled deck.
+        - bots (Dict[int, object]): The bot of each seat, by user ID.
+        - rng (random.Random): The random generator of the bots.
+        - stats (SimulationStats): The statistics updated by the hand.
+
+    Raises:
+    -------
+        RuntimeError: If the hand doesn't end after MAX_ACTIONS actions.
+    """
+    with stats.phase("deal"):
+        engine.prepare_round(state, deck)
+    for _ in range(MAX_ACTIONS):
+        if state.stage >= Stage.SHOWDOWN.value:
+            break
+        with stats.phase("decide"):
+            seat, action = _bot_action(state, bots, rng)
+        with stats.phase("rules"):
+            engine.do_action(state, seat, action)
+            engine.next_player(state)
+            engine.next_stage_check(state)
+        stats.actions += 1
+    else:
+        raise RuntimeError(f"The hand {stats.hands} did not end")
+    with stats.phase("showdown"):
+        engine.resolve_round(state)
+    stats.hands += 1
+    stats.events += len(state.events)
+
+
+def _run_engine_table(config: TableConfig, bots, rng, stats: SimulationStats):
+    """
+    # Play the hands of a table on a TableState.
+    """
+    seats = [Seat(user_id, f"bot{user_id}", config.stack) for user_id in bots]
+    state = TableState(
+        round_id=1, seats=seats, blind=config.blind, min_raise=config.blind
+    )
+    deals = DealStream(config.seed, config.index)
+    for hand in range(config.hands):
+        play_hand(state, deals.deck(hand), bots, rng, stats)
+        _rebuy(state, config.stack, stats)
+        # A new round, as holdem.game.game.new_round does
+        state = TableState(
+            round_id=hand + 2,
+            seats=state.seats,
+            blind=config.blind,
+            min_raise=config.blind,
+        )
+
+
+def _run_db_table(config: TableConfig, bots, rng, stats: SimulationStats):
+    """
+    # Play the hands of a table through holdem.game.game, one transaction per action.
+    """
+    from django.db import transaction
+    from authentication.models import User
+    from holdem.game.game import (
+        current_round,
+        load_state,
+        new_round,
+        save_state,
+        showdown,
+    )
+    from holdem.models import Table
+
+    table = Table.objects.create(name=f"Simulation {config.index}", blind=config.blind)
+    users = User.objects.bulk_create(
+        User(username=f"bot-{table.id}-{i}", chips=config.stack)
+        for i in range(len(bots))
+    )
+    # The bots are given by user ID
+    bots = dict(zip((user.id for user in users), bots.values()))
+    new_round(table, users)
+    deals = DealStream(config.seed, config.index)
+    hand = 0
+    while hand < config.hands:
+        finished = False
+        with transaction.atomic():
+            with stats.phase("load"):
+                round = current_round(table, lock=True)
+                state, users_by_id = load_state(round)
+            if state.stage == Stage.WAITING.value:
+                with stats.phase("deal"):
+                    engine.prepare_round(state, deals.deck(hand))
+            elif Stage.PRE_FLOP.value <= state.stage <= Stage.RIVER.value:
+                with stats.phase("decide"):
+                    seat, action = _bot_action(state, bots, rng)
+                with stats.phase("rules"):
+                    engine.do_action(state, seat, action)
+                    engine.next_player(state)
+                    engine.next_stage_check(state)
+                stats.actions += 1
+            else:
+                with stats.phase("showdown"):
+                    showdown(round, state)
+                    _rebuy(state, config.stack, stats)
+                stats.hands += 1
+                hand += 1
+                finished = True
+            stats.events += len(state.events)
+            with stats.phase("save"):
+                save_state(round, state, users_by_id)
+                if finished:
+                    new_round(table, round.players.all())
+
+
+def run_table(config: TableConfig) -> SimulationStats:
+    """
+    # Play the hands of a table.
+
+    Args:
+    -----
+        config (TableConfig): The configuration of the table.
+
+    Returns:
+    --------
+        SimulationStats: The statistics of the table.
+
+    Raises:
+    -------
+        ValueError: If the mode or a bot is unknown.
+        AssertionError: If chips are created or lost by a hand.
+    """
+    # Checks
+    if config.mode not in MODES:
+        raise ValueError(f"Unknown mode: {config.mode} (expected one of {MODES})")
+    for name in config.bots:
+        if name not in BOTS:
+            raise ValueError(f"Unknown bot: {name} (expected one of {list(BOTS)})")
+    # Play
+    stats = SimulationStats(tables=1)
+    rng = random.Random(derive_seed(config.seed, "bots", config.index))
+    bots = {i + 1: BOTS[name]() for i, name in enumerate(config.bots)}
+    start = time.perf_counter()
+    if config.mode == "engine":
+        _run_engine_table(config, bots, rng, stats)
+    else:
+        _run_db_table(config, bots, rng, stats)
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def setup_memory_database():
+    """
+    # Set up Django with an in-memory SQLite database (for the db mode, in a new process).
+    """
+    import django
+    from django.conf import settings
+    from django.core.management import call_command
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "poker.settings")
+    settings.DATABASES["default"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+    }
+    django.setup()
+    call_command("migrate", verbosity=0, interactive=False)
+
+
+def simulate(
+    tables: int = 4,
+    hands: int = 100,
+    bots: Sequence[str] = ("random", "station", "equity"),
+    players: int = 6,
+    mode: str = "engine",
+    workers: Optional[int] = None,
+    seed: int = 0,
+) -> SimulationStats:
+    """
+    # Play the hands of many tables in a pool of processes.
+
+    Args:
+    -----
+        - tables (int, optional): The number of tables. Defaults to 4.
+        - hands (int, optional): The number of hands of each table. Defaults to 100.
+        - bots (Sequence[str], optional): The bots, given to the seats in turn.
+            Defaults to ("random", "station", "equity").
+        - players (int, optional): The number of players of each table (2 to 10). Defaults to 6.
+        - mode (str, optional): "engine" or "db" (see MODES). Defaults to "engine".
+        - workers (Optional[int], optional): The number of processes.
+            With 0, the tables are played in the current process (whose database is used
+            in the db mode). Defaults to None (the number of CPUs).
+        - seed (int, optional): The seed of the deals and of the bots. Defaults to 0.
+
+    Returns:
+    --------
+        SimulationStats: The statistics of all the tables.
+
+    Raises:
+    -------
+        ValueError: If the number of players, the mode or a bot is invalid.
+    """
+    # Checks
+    if not 2 <= players <= 10:
+        raise ValueError("players must be between 2 and 10")
+    # Play
+    seats = [bots[i % len(bots)] for i in range(players)]
+    configs = [TableConfig(i, hands, seats, mode, seed) for i in range(tables)]
+    stats = SimulationStats()
+    start = time.perf_counter()
+    if workers == 0:
+        for result in map(run_table, configs):
+            stats.add(result)
+    else:
+        initializer = setup_memory_database if mode == "db" else None
+        with ProcessPoolExecutor(max_workers=workers, initializer=initializer) as pool:
+            for result in pool.map(run_table, configs):
+                stats.add(result)
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Simulate Texas Hold'em tables played by bots."
+    )
+    parser.add_argument("--tables", type=int, default=4)
+    parser.add_argument("--hands", type=int, default=100, help="Hands per table")
+    parser.add_argument("--players", type=int, default=6, help="Players per table")
+    parser.add_argument(
+        "--bots",
+        default="random,station,equity",
+        help=f"Bots given to the seats in turn, among {', '.join(BOTS)}",
+    )
+    parser.add_argument("--mode", choices=MODES, default="engine")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.mode == "db" and args.workers == 0:
+        setup_memory_database()
+    print(
+        simulate(
+            args.tables,
+            args.hands,
+            args.bots.split(","),
+            args.players,
+            args.mode,
+            args.workers,
+            args.seed,
+        )
+    )
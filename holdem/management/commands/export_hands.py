@@ -0,0 +1,59 @@
+"""
+This module contains the export_hands command, exporting the hand histories of the rounds.
+
+Example usage:
+--------------
+    python manage.py export_hands --format pokerstars --player admin --since 2024-01-01 -o hands.txt
+"""
+
+from argparse import ArgumentTypeError
+
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_date
+
+from holdem.game.export import FORMATS, export_hands, select_rounds
+
+
+def _date(value: str):
+    """
+    # Parse a date given as YYYY-MM-DD.
+    """
+    parsed = parse_date(value)
+    if parsed is None:
+        raise ArgumentTypeError(f"Invalid date: {value} (expected YYYY-MM-DD)")
+    return parsed
+
+
+class Command(BaseCommand):
+    """
+    # Export the hand histories of a date range, a player or a table.
+    """
+
+    help = "Export the hand histories of the rounds (JSON lines or PokerStars text)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=list(FORMATS), default="jsonl")
+        parser.add_argument("--since", type=_date, help="First day (YYYY-MM-DD).")
+        parser.add_argument("--until", type=_date, help="Last day (YYYY-MM-DD).")
+        parser.add_argument("--player", help="Username of a player.")
+        parser.add_argument("--table", type=int, help="ID of a table.")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument(
+            "-o", "--output", help="Output file (standard output by default)."
+        )
+
+    def handle(self, *args, **options):
+        rounds = select_rounds(
+            options["since"], options["until"], options["player"], options["table"]
+        )
+        hands = export_hands(rounds, options["format"], options["chunk_size"])
+        if options["output"] is None:
+            for text in hands:
+                self.stdout.write(text, ending="")
+            return
+        count = 0
+        with open(options["output"], "w", encoding="utf-8") as file:
+            for text in hands:
+                file.write(text)
+                count += 1
+        self.stderr.write(f"{count} hands exported to {options['output']}")
@@ -0,0 +1,55 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_default_table(apps, schema_editor):
+    """
+    # Put the existing rounds on a first table.
+    """
+    Table = apps.get_model("holdem", "Table")
+    Round = apps.get_model("holdem", "Round")
+    table = Table.objects.create(name="Table 1")
+    Round.objects.filter(table__isnull=True).update(table=table)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("holdem", "0002_contribution"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Table",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("name", models.CharField(default="", max_length=50)),
+                ("blind", models.IntegerField(default=25)),
+                ("max_seats", models.IntegerField(default=10)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="round",
+            name="table",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="rounds",
+                to="holdem.table",
+            ),
+        ),
+        migrations.RunPython(create_default_table, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="round",
+            name="table",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="rounds",
+                to="holdem.table",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="round",
+            index=models.Index(fields=["table", "-id"], name="round_table_latest"),
+        ),
+    ]
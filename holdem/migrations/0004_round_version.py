@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-17 00:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("holdem", "0003_table"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="round",
+            name="version",
+            field=models.IntegerField(default=0),
+        ),
+    ]
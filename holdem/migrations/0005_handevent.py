@@ -0,0 +1,46 @@
+# Generated by Django 5.0.3 on 2026-10-17 01:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("holdem", "0004_round_version"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HandEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("seq", models.IntegerField()),
+                ("data", models.TextField()),
+                ("snapshot", models.TextField(blank=True, default="")),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                (
+                    "round",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="events",
+                        to="holdem.round",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="handevent",
+            constraint=models.UniqueConstraint(
+                fields=("round", "seq"), name="unique_event_per_round"
+            ),
+        ),
+    ]
@@ -1,5 +1,7 @@
 """
-This file contains the Round model which is used to store the current state of the game.
+This file contains the Table model (the poker tables listed in the lobby),
+the Round model which is used to store the current state of the game of a table,
+and the Contribution model which records the chips put in the pot of each round.
 """
 
 from django.db import models
@@ -9,11 +11,28 @@ from authentication.models import User
 # from poker import settings
 
 
+class Table(models.Model):
+    """Represents a poker table, with its own rounds and players.
+
+    Attributes:
+        id (AutoField): The primary key for the table.
+        name (CharField): The name of the table, shown in the lobby.
+        blind (IntegerField): The small blind of the rounds of the table.
+        max_seats (IntegerField): The maximum number of players at the table.
+    """
+
+    id = models.AutoField(primary_key=True)
+    name = models.CharField(max_length=50, default="")
+    blind = models.IntegerField(default=25)
+    max_seats = models.IntegerField(default=10)
+
+
 class Round(models.Model):
     """Represents a round of the Texas Hold'em game.
 
     Attributes:
         id (AutoField): The primary key for the round.
+        table (ForeignKey): The table where the round is played.
         community_cards (CharField): The community cards for the round.
         players (ManyToManyField): The players participating in the round.
         player_to_play (IntegerField): The id of the player currently playing.
@@ -23,9 +42,11 @@ class Round(models.Model):
         min_raise (IntegerField): The minimum raise amount for the round.
         winners_name (CharField): The names of the winners of the round.
         winner_hand (CharField): The winning hand for the round.
+        version (IntegerField): Incremented at each change, to detect concurrent changes.
     """
 
     id = models.AutoField(primary_key=True)
+    table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name="rounds")
     community_cards = models.CharField(max_length=10, default="")
     players = models.ManyToManyField(User)
     player_to_play = models.IntegerField(default=0)
@@ -35,3 +56,64 @@ class Round(models.Model):
     min_raise = models.IntegerField(default=25)
     winners_name = models.CharField(max_length=1500, default="")
     winner_hand = models.CharField(max_length=50, default="")
+    version = models.IntegerField(default=0)
+
+    class Meta:
+        # The current round of a table is its latest one
+        indexes = [models.Index(fields=["table", "-id"], name="round_table_latest")]
+
+
+class Contribution(models.Model):
+    """Represents the chips put in the pot of a round by a player.
+
+    Every chip put in the pot is recorded, including by the players who leave the round,
+    so the pots of a round are split with the contributions of that round only.
+
+    Attributes:
+        round (ForeignKey): The round.
+        user (ForeignKey): The player.
+        amount (IntegerField): The chips put in the pot by the player during the round.
+    """
+
+    round = models.ForeignKey(
+        Round, on_delete=models.CASCADE, related_name="contributions"
+    )
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    amount = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["round", "user"], name="unique_contribution_per_round"
+            )
+        ]
+
+
+class HandEvent(models.Model):
+    """Represents an event of the hand history of a round (append-only).
+
+    The events are written in the same transaction as the changes of the round,
+    encoded as compact JSON lists (see holdem.game.history).
+    Every SNAPSHOT_INTERVAL events, the state of the round after the event is saved with it,
+    so the round can be rebuilt at any event from the closest snapshot.
+
+    Attributes:
+        round (ForeignKey): The round.
+        seq (IntegerField): The number of the event in the round (from 1).
+        data (TextField): The event.
+        snapshot (TextField): The state of the round after the event, or "" if none.
+        created (DateTimeField): When the event was saved.
+    """
+
+    round = models.ForeignKey(Round, on_delete=models.CASCADE, related_name="events")
+    seq = models.IntegerField()
+    data = models.TextField()
+    snapshot = models.TextField(blank=True, default="")
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["round", "seq"], name="unique_event_per_round"
+            )
+        ]
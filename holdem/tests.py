@@ -2,7 +2,559 @@
 This file is used to test the holdem app.
 """
 
-# Unused import
-# from django.test import TestCase
+import json
+from datetime import datetime, timezone
+from collections import OrderedDict
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import transaction
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from authentication.models import User
+from holdem.game import engine, export, game, history
+from holdem.game.deck import Deck, DeckError
+from holdem.game.engine import Stage
+from holdem.game.game import (
+    ConflictError,
+    load_state,
+    rebuild_state,
+    resolve_round,
+    save_state,
+)
+from holdem.game.simulation import TableConfig, run_table
+from holdem.models import Contribution, HandEvent, Round, Table
+from holdem.views import _play_turn
+
+
+class TestTables(TestCase):
+    """
+    # A test case for the lobby and the tables.
+    """
+
+    def setUp(self):
+        self.players = [
+            User.objects.create_user(username=f"player{i}", password="password")
+            for i in range(3)
+        ]
+
+    def visit(self, player, table):
+        """
+        # Open a table as a player.
+        """
+        self.client.force_login(player)
+        response = self.client.get(f"/table/{table.id}/")
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_lobby(self):
+        """
+        # Test method for verifying that the lobby lists the tables and opens new ones.
+        """
+        self.client.force_login(self.players[0])
+        response = self.client.post("/home/", {"name": ""})
+        table = Table.objects.latest("id")
+        self.assertRedirects(response, f"/table/{table.id}/")
+        self.assertEqual(table.name, f"Table {table.id}")
+        self.visit(self.players[0], table)
+        self.visit(self.players[1], table)
+        response = self.client.get("/home/")
+        self.assertContains(response, table.name)
+        self.assertContains(response, f"2 / {table.max_seats}")
+
+    def test_tables_are_independent(self):
+        """
+        # Test method for verifying that each table has its own round,
+        and that a player joining a table leaves his previous one.
+        """
+        first = Table.objects.create(name="First")
+        second = Table.objects.create(name="Second", blind=50)
+        self.visit(self.players[0], first)
+        self.visit(self.players[1], first)
+        self.visit(self.players[2], second)
+        first_round = first.rounds.latest("id")
+        second_round = second.rounds.latest("id")
+        self.assertEqual(first_round.stage, 1)
+        self.assertEqual(second_round.stage, 0)
+        self.assertEqual(second_round.blind, 50)
+        self.assertEqual(
+            set(first_round.players.values_list("username", flat=True)),
+            {"player0", "player1"},
+        )
+
+        self.visit(self.players[0], second)
+        first_round.refresh_from_db()
+        self.assertFalse(first_round.players.filter(id=self.players[0].id).exists())
+        self.assertEqual(second.rounds.latest("id").players.count(), 2)
+        # The chips of the blind stay in the pot of the first table
+        self.assertEqual(
+            sum(c.amount for c in first_round.contributions.all()), first_round.pot
+        )
+        self.assertEqual(Round.objects.filter(table=second).count(), 1)
+
+    def test_deal_falls_back_to_local_deck(self):
+        """
+        # Test method for verifying that the cards are dealt from a local deck
+        when the deck taken from the pool fails to draw them.
+        """
+        backend = mock.Mock(deck_id="remote")
+        backend.draw.side_effect = DeckError("The API is down")
+        table = Table.objects.create(name="Table")
+        with mock.patch.object(
+            game.DECK_POOL, "take", return_value=Deck(backend=backend)
+        ):
+            self.visit(self.players[0], table)
+            self.visit(self.players[1], table)
+        backend.draw.assert_called_once()
+        round = table.rounds.latest("id")
+        self.assertEqual(round.stage, 1)
+        self.assertEqual(len(round.community_cards), 10)
+        self.assertTrue(all(len(player.hand) == 4 for player in round.players.all()))
+
+    def test_departed_player_bets_elsewhere(self):
+        """
+        # Test method for verifying that resolving a round doesn't touch the bets
+        of a player who left it for another table.
+        """
+        first = Table.objects.create(name="First")
+        second = Table.objects.create(name="Second", blind=50)
+        mover = self.players[0]
+        self.visit(mover, first)
+        self.visit(self.players[1], first)
+        self.visit(self.players[2], second)
+        self.visit(mover, second)
+        second_round = second.rounds.latest("id")
+        self.assertEqual(second_round.stage, 1)
+        mover.refresh_from_db()
+        bet, total_bet = mover.bet, mover.total_bet
+        self.assertGreater(total_bet, 0)
+
+        # The player left alone at the first table wins its pot
+        first_round = first.rounds.latest("id")
+        self.visit(self.players[1], first)
+        first_round.refresh_from_db()
+        self.assertEqual(first_round.winners_name, "player1")
+        mover.refresh_from_db()
+        self.assertEqual((mover.bet, mover.total_bet), (bet, total_bet))
+        second_round.refresh_from_db()
+        self.assertEqual(
+            sum(second_round.players.values_list("total_bet", flat=True)),
+            second_round.pot,
+        )
+
+
+class TestConflicts(TestCase):
+    """
+    # A test case for the requests changing the same round at the same time.
+    """
+
+    def setUp(self):
+        self.table = Table.objects.create(name="Table")
+        self.players = [
+            User.objects.create_user(username=f"player{i}", password="password")
+            for i in range(2)
+        ]
+        for player in self.players:
+            self.client.force_login(player)
+            self.client.get(f"/table/{self.table.id}/")
+        self.round = self.table.rounds.latest("id")
+
+    def test_stale_round_is_not_saved(self):
+        """
+        # Test method for verifying that a round loaded before another save can't be saved.
+        """
+        stale = Round.objects.get(id=self.round.id)
+        state, users = load_state(self.round)
+        state.pot += 10
+        save_state(self.round, state, users)
+        self.assertEqual(self.round.version, stale.version + 1)
+
+        state, users = load_state(stale)
+        state.pot += 10
+        with self.assertRaises(ConflictError):
+            save_state(stale, state, users)
+        self.round.refresh_from_db()
+        self.assertEqual(self.round.version, stale.version + 1)
+
+        # Nothing changed: nothing is saved, and there is no conflict
+        state, users = load_state(stale)
+        save_state(stale, state, users)
+
+    def test_conflicts_are_retried(self):
+        """
+        # Test method for verifying that the view plays the request again on a conflict,
+        and gives up with a 409 response.
+        """
+        player = Round.objects.get(id=self.round.id).player_to_play
+        self.client.force_login(User.objects.get(id=player))
+        with mock.patch(
+            "holdem.views.save_state", side_effect=[ConflictError(), None]
+        ) as patched:
+            response = self.client.get(f"/table/{self.table.id}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(patched.call_count, 2)
+
+        with mock.patch("holdem.views.save_state", side_effect=ConflictError):
+            response = self.client.get(f"/table/{self.table.id}/")
+        self.assertEqual(response.status_code, 409)
+
+    def test_resolved_round_is_not_played_again(self):
+        """
+        # Test method for verifying that a request getting the lock of a round
+        resolved in the meantime plays again instead of resolving it a second time.
+        """
+        player = User.objects.get(id=self.round.player_to_play)
+        self.client.force_login(player)
+        self.client.post(f"/table/{self.table.id}/", {"action": "fold"})
+        self.client.get(f"/table/{self.table.id}/")
+        stale = Round.objects.get(id=self.round.id)
+        self.assertNotEqual(stale.winners_name, "")
+        events = stale.events.count()
+
+        request = RequestFactory().get(f"/table/{self.table.id}/")
+        request.user = player
+        with mock.patch("holdem.views.current_round", return_value=stale):
+            with self.assertRaises(ConflictError):
+                with transaction.atomic():
+                    _play_turn(request, player, self.table)
+        resolved = Round.objects.get(id=self.round.id)
+        self.assertEqual(resolved.winners_name, stale.winners_name)
+        self.assertEqual(resolved.events.count(), events)
+        self.assertEqual(self.table.rounds.count(), 2)
+
+
+class TestSaveState(TestCase):
+    """
+    # A test case for the changes saved with a round.
+    """
+
+    def setUp(self):
+        self.table = Table.objects.create(name="Table")
+        for i in range(3):
+            self.client.force_login(
+                User.objects.create_user(username=f"player{i}", password="password")
+            )
+            self.client.get(f"/table/{self.table.id}/")
+        self.round = self.table.rounds.latest("id")
+
+    def test_nothing_changed(self):
+        """
+        # Test method for verifying that nothing is written when nothing changed.
+        """
+        state, users = load_state(self.round)
+        with self.assertNumQueries(0):
+            save_state(self.round, state, users)
+
+    def test_only_changes_are_saved(self):
+        """
+        # Test method for verifying that an action writes the player who acted,
+        on the fields that changed, in a fixed number of queries.
+        """
+        state, users = load_state(self.round)
+        seat = state.seat(state.player_to_play)
+        engine.do_action(state, seat, "call")
+        engine.next_player(state)
+        with mock.patch.object(
+            User.objects, "bulk_update", wraps=User.objects.bulk_update
+        ) as bulk_update:
+            # The round, the player, his contribution, the last event and the new events
+            with self.assertNumQueries(5):
+                save_state(self.round, state, users)
+        (players, fields), _ = bulk_update.call_args
+        self.assertEqual([player.id for player in players], [seat.user_id])
+        self.assertEqual(fields, ["chips", "bet", "total_bet", "action"])
+        self.assertEqual(User.objects.get(id=seat.user_id).total_bet, seat.total_bet)
+
+
+class TestLiveHands(SimpleTestCase):
+    """
+    # A test case for the live hands kept by the process.
+    """
+
+    @mock.patch.object(game, "_LIVE_HANDS", OrderedDict())
+    def test_discard_and_limit(self):
+        """
+        # Test method for verifying that resolving a round only forgets its own hands,
+        and that the least recently used hands are forgotten past LIVE_HANDS_SIZE.
+        """
+        board = "2C3D9HJS8D"
+        first = game._live_hand(2, Stage.FLOP.value, board, 1, "ASAH")
+        game._live_hand(1, Stage.FLOP.value, board, 2, "KSKH")
+        game.discard_live_hands(mock.Mock(id=1))
+        self.assertEqual(list(game._LIVE_HANDS), [(2, 1)])
+        self.assertIs(game._live_hand(2, Stage.TURN.value, board, 1, "ASAH"), first)
+
+        with mock.patch.object(game, "LIVE_HANDS_SIZE", 2):
+            game._live_hand(3, Stage.FLOP.value, board, 3, "4C7D")
+            game._live_hand(2, Stage.RIVER.value, board, 1, "ASAH")
+            game._live_hand(4, Stage.FLOP.value, board, 4, "5C6D")
+        self.assertEqual(list(game._LIVE_HANDS), [(2, 1), (4, 4)])
+
+
+class TestContributions(TestCase):
+    """
+    # A test case for the chips put in the pot, and how they are paid out.
+    """
+
+    def test_contributions_follow_the_bets(self):
+        """
+        # Test method for verifying that the contributions of the players
+        grow with the chips they put in the pot.
+        """
+        table = Table.objects.create(name="Table")
+        for i in range(2):
+            self.client.force_login(
+                User.objects.create_user(username=f"player{i}", password="password")
+            )
+            self.client.get(f"/table/{table.id}/")
+        round = table.rounds.latest("id")
+        for raise_ in ("50", "100"):
+            state, users = load_state(round)
+            seat = state.seat(state.player_to_play)
+            engine.do_action(state, seat, raise_)
+            engine.next_player(state)
+            save_state(round, state, users)
+            self.assertEqual(
+                dict(round.contributions.values_list("user_id", "amount")),
+                {seat.user_id: seat.total_bet for seat in state.seats},
+            )
+        self.assertEqual(round.contributions.count(), 2)
+
+    def test_departed_chips_are_paid_out(self):
+        """
+        # Test method for verifying that the chips of a player who left the round
+        go to the right pots at the showdown, including when he came back as a spectator.
+        """
+        for rejoined in (False, True):
+            with self.subTest(rejoined=rejoined):
+                table = Table.objects.create(name="Table")
+                round = Round.objects.create(
+                    table=table,
+                    community_cards="2C3D9HJS8D",
+                    stage=Stage.SHOWDOWN.value,
+                    pot=850,
+                )
+                players = []
+                for i, (chips, total_bet, hand) in enumerate(
+                    [(0, 100, "ASAH"), (700, 300, "KSKH"), (700, 300, "4C7D")]
+                ):
+                    player = User.objects.create_user(
+                        username=f"player{rejoined}{i}",
+                        password="password",
+                        chips=chips,
+                        bet=total_bet,
+                        total_bet=total_bet,
+                        hand=hand,
+                        action="call",
+                        order=i,
+                    )
+                    Contribution.objects.create(
+                        round=round, user=player, amount=total_bet
+                    )
+                    players.append(player)
+                departed = User.objects.create_user(
+                    username=f"departed{rejoined}", password="password", chips=850
+                )
+                Contribution.objects.create(round=round, user=departed, amount=150)
+                round.players.set(players + ([departed] if rejoined else []))
+                if rejoined:
+                    departed.action = "spectator"
+                    departed.save()
+
+                resolve_round(round)
+                for player in players:
+                    player.refresh_from_db()
+                chips = [player.chips for player in players]
+                # 400 for the main pot, 150 + 300 for the side pots the departed player can't win
+                self.assertEqual(chips, [400, 1150, 700])
+                departed.refresh_from_db()
+                self.assertEqual(departed.chips, 850)
+
+
+class TestHandHistory(TestCase):
+    """
+    # A test case for the hand history of the rounds.
+    """
+
+    def test_rebuild_state(self):
+        """
+        # Test method for verifying that the events saved with the rounds rebuild their state,
+        from the closest snapshot.
+        """
+        table = Table.objects.create(name="Table")
+        players = [
+            User.objects.create_user(username=f"player{i}", password="password")
+            for i in range(3)
+        ]
+        with mock.patch.object(history, "SNAPSHOT_INTERVAL", 4):
+            for player in players:
+                self.client.force_login(player)
+                self.client.get(f"/table/{table.id}/")
+            round = table.rounds.latest("id")
+            for _ in range(4):
+                round.refresh_from_db()
+                self.client.force_login(User.objects.get(id=round.player_to_play))
+                self.client.post(f"/table/{table.id}/", {"action": "call"})
+
+        round.refresh_from_db()
+        self.assertEqual(round.stage, 2)
+        events = list(round.events.order_by("seq"))
+        self.assertEqual(
+            [event.seq for event in events], list(range(1, len(events) + 1))
+        )
+        self.assertEqual(history.decode(events[0].data)[0], "sit")
+        self.assertNotIn(" ", events[-1].data)
+        self.assertTrue(HandEvent.objects.exclude(snapshot="").exists())
+
+        state, _ = load_state(round)
+        rebuilt = rebuild_state(round)
+        self.assertEqual(rebuilt.seats, state.seats)
+        self.assertEqual(
+            (rebuilt.stage, rebuilt.pot, rebuilt.player_to_play, rebuilt.board),
+            (state.stage, state.pot, state.player_to_play, state.board),
+        )
+        # Before the first action, the blinds are in the pot
+        deal = next(e.seq for e in events if history.decode(e.data)[0] == "deal")
+        self.assertEqual(rebuild_state(round, deal + 3).pot, 75)
+
+
+class TestExport(TestCase):
+    """
+    # A test case for the export of the hand histories.
+    """
+
+    def setUp(self):
+        self.table = Table.objects.create(name="Export")
+        self.players = [
+            User.objects.create_user(username=f"player{i}", password="password")
+            for i in range(3)
+        ]
+        for player in self.players:
+            self.client.force_login(player)
+            self.client.get(f"/table/{self.table.id}/")
+        # The third player joins during the round (spectator): the first player to play
+        # raises, the other one calls, then they check down to the showdown
+        action = "100"
+        while self.table.rounds.count() == 1:
+            round = self.table.rounds.get()
+            self.client.force_login(User.objects.get(id=round.player_to_play))
+            self.client.post(f"/table/{self.table.id}/", {"action": action})
+            # Move to the next stage when the betting round is over
+            self.client.get(f"/table/{self.table.id}/")
+            action = "call"
+        self.round = self.table.rounds.order_by("id").first()
+
+    def test_command(self):
+        """
+        # Test method for verifying the hands exported by the command, in both formats.
+        """
+        # The next hand is still in play: it is not exported
+        self.client.get(f"/table/{self.table.id}/")
+        self.assertTrue(self.table.rounds.latest("id").events.exists())
+        out = StringIO()
+        call_command("export_hands", "--table", str(self.table.id), stdout=out)
+        hands = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(hands), 1)
+        hand = hands[0]
+        self.assertEqual((hand["round"], hand["table"]), (self.round.id, "Export"))
+        self.assertEqual(len(hand["board"]), 10)
+        self.assertEqual(len(hand["players"]), 2)
+        self.assertEqual(
+            {player["name"]: player["hand"] for player in hand["players"]},
+            hand["shown"],
+        )
+        # The seats follow the IDs of the players, and the dealer is the small blind
+        self.assertEqual(
+            [player["name"] for player in hand["players"]], ["player0", "player1"]
+        )
+        button = hand["players"][hand["button"] - 1]["name"]
+        self.assertEqual(hand["actions"][0]["player"], button)
+        self.assertTrue(hand["started"].endswith("+00:00"))
+        self.assertEqual(hand["pot"], 300)
+        self.assertEqual(sum(hand["payouts"].values()), 300)
+        self.assertEqual(
+            [a["action"] for a in hand["actions"][:5]],
+            ["small blind", "big blind", "raise", "call", "check"],
+        )
+
+        out = StringIO()
+        call_command("export_hands", "--format", "pokerstars", stdout=out)
+        text = out.getvalue()
+        self.assertTrue(text.startswith(f"PokerStars Hand #{self.round.id}:"))
+        self.assertIn(f"Seat #{hand['button']} is the button", text)
+        for line in [
+            "*** HOLE CARDS ***",
+            "posts small blind 25",
+            "raises 100 to 150",
+            "*** RIVER ***",
+            "*** SHOW DOWN ***",
+            "Total pot 300 | Rake 0",
+        ]:
+            self.assertIn(line, text)
+
+        out = StringIO()
+        call_command("export_hands", "--player", "nobody", stdout=out)
+        self.assertEqual(out.getvalue(), "")
+
+    @override_settings(TIME_ZONE="Europe/Paris")
+    def test_times_in_utc(self):
+        """
+        # Test method for verifying that the naive times of the events are exported in UTC.
+        """
+        self.assertEqual(
+            export._utc(datetime(2024, 1, 1, 13, 30)),
+            datetime(2024, 1, 1, 12, 30, tzinfo=timezone.utc),
+        )
+
+    def test_endpoint(self):
+        """
+        # Test method for verifying the streaming endpoint and its filters.
+        """
+        response = self.client.get("/hands/export/")
+        self.assertEqual(response.status_code, 302)
+        staff = User.objects.create_user(username="staff", password="password")
+        staff.is_staff = True
+        staff.save()
+        self.client.force_login(staff)
+
+        response = self.client.get("/hands/export/", {"player": "player1"})
+        self.assertTrue(response.streaming)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)["round"] for line in lines], [self.round.id])
+        response = self.client.get(
+            "/hands/export/", {"format": "pokerstars", "until": "2000-01-01"}
+        )
+        self.assertEqual(b"".join(response.streaming_content), b"")
+        response = self.client.get("/hands/export/", {"since": "yesterday"})
+        self.assertEqual(response.status_code, 400)
+
+
+class TestSimulation(TestCase):
+    """
+    # A test case for the simulation of tables through the database.
+    """
+
+    def test_db_mode(self):
+        """
+        # Test method for verifying that the bots play their hands through the database,
+        as the engine mode does.
+        """
+        config = TableConfig(0, 5, ["random", "station", "equity"], "db", seed=2)
+        stats = run_table(config)
+        self.assertEqual(stats.hands, 5)
+        self.assertGreater(stats.phases["save"], 0)
+        table = Table.objects.get(name="Simulation 0")
+        self.assertEqual(table.rounds.count(), 6)
+        engine_stats = run_table(config._replace(mode="engine"))
+        self.assertEqual(
+            (stats.actions, stats.rebuys), (engine_stats.actions, engine_stats.rebuys)
+        )
+        self.assertEqual(
+            sum(
+                User.objects.filter(username__startswith="bot-").values_list(
+                    "chips", flat=True
+                )
+            ),
+            3000 + 1000 * stats.rebuys,
+        )
@@ -8,38 +8,48 @@
 This module contains the views for the Texas Hold'em game.
 
 It includes the following views:
-- home: Renders the home page of the game and handles user actions.
+- home: Renders the lobby, listing the tables, and opens new tables.
+- table_page: Renders a table of the game and handles user actions.
+- export_hands: Streams the hand histories of a date range, a player or a table.
 """
 
 from datetime import datetime, timedelta
-from django.shortcuts import render, redirect
+from django.db import transaction
+from django.db.models import Count, Max
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, render, redirect
+from django.utils.dateparse import parse_date
 from django.contrib.auth.decorators import login_required
 from authentication.models import User
-from holdem.models import Round
+from holdem.models import Round, Table
+from holdem.game import engine, export
+from holdem.game.engine import Seat
 from holdem.game.game import (
     Stage,
-    prepare_round,
-    next_player,
-    next_stage_check,
-    check_action,
-    do_action,
-    resolve_round,
+    ConflictError,
+    load_state,
+    save_state,
+    take_deck,
+    current_round,
+    is_current_round,
+    new_round,
+    eject_player,
+    leave_other_tables,
+    showdown,
+    live_hand,
 )
+from holdem.game.preflop import MAX_PLAYERS, MIN_PLAYERS, preflop_equity
+
+# Number of times a request is played when other requests change the round at the same time
+CONFLICT_RETRIES = 3
 
 
 @login_required
 def home(request):
     """
-    # Renders the home page of the Texas Hold'em game and handles user actions.
-
-    This view handles the following actions:
-    - Updating the last action of the user.
-    - Checking for AFK players and handling their actions.
-    - Adding the user to the round if not already added.
-    - Starting the round if there are enough players.
-    - Checking if the round is finished or needs to move to the next stage.
-    - Resolving the round and updating the stage.
-    - Handling the user's action and updating the round accordingly.
+    # Renders the lobby: the tables with their number of players.
+    A POST request opens a new table.
 
     Args:
     -----
@@ -47,17 +57,58 @@ def home(request):
 
     Returns:
     --------
-        The rendered home page template with the appropriate context.
+        The rendered lobby template, or a redirection to the new table.
     """
-    user = request.user
-    user.last_action = datetime.now()
-    user.save()
+    if request.method == "POST":
+        name = request.POST.get("name", "").strip()[:50]
+        table = Table.objects.create(name=name)
+        if name == "":
+            table.name = f"Table {table.id}"
+            table.save(update_fields=["name"])
+        return redirect("table", table_id=table.id)
+
+    tables = list(Table.objects.annotate(round_id=Max("rounds__id")).order_by("id"))
+    seats = dict(
+        Round.players.through.objects.filter(
+            round_id__in=[table.round_id for table in tables]
+        )
+        .values_list("round_id")
+        .annotate(count=Count("id"))
+    )
+    for table in tables:
+        table.players_count = seats.get(table.round_id, 0)
+    context = {"tables": tables}
+    return render(request, "holdem/lobby.html", context=context)
 
-    if Round.objects.all().exists():
-        round = Round.objects.latest("id")
-    else:
-        round = Round()
-        round.save()
+
+def _play_turn(request, user, table):
+    """
+    # Make the round of a table progress, and play the action of the user (if any).
+    Must be called in a transaction.
+
+    Args:
+    -----
+        - request: The HTTP request object.
+        - user (User): The user of the request.
+        - table (Table): The table.
+
+    Returns:
+    --------
+    Tuple[Optional[HttpResponse], Round, TableState, Dict[int, User], str]:
+        - Optional[HttpResponse]: A redirection, if the page must not be rendered.
+        - Round: The current round of the table.
+        - TableState: The state of the round.
+        - Dict[int, User]: The players of the round.
+        - str: An error message if the action of the user is invalid.
+
+    Raises:
+    -------
+        ConflictError: If the round was changed by another request in the meantime.
+    """
+    round = current_round(table, lock=True)
+    if not is_current_round(round):
+        # Resolved by the request holding the lock before: play again on the next round
+        raise ConflictError(f"Round {round.id} was resolved by another request")
 
     error_message = ""
 
@@ -68,74 +119,133 @@ def home(request):
             > timedelta(seconds=120).total_seconds()
         ):
             print(f"{afk.username} has been away for too long so he was ejected.")
-            afk.action = "fold"
-            afk.order = -1
-            afk.bet = 0
-            next_player(round)
-            round.players.remove(afk)
-            afk.save()
-            round.save()
-
-    if user not in round.players.all():
-        # Add the user to the round and save the changes.
+            eject_player(round, afk)
+
+    # The round is loaded once, and saved once after the transitions
+    state, users = load_state(round, user)
+
+    if user.id not in users:
+        # Add the user to the round, as a spectator until the next round
+        if len(state.seats) >= table.max_seats:
+            return redirect("home"), round, None, None, ""
+        leave_other_tables(user, table)
         round.players.add(user)
-        round.save()
-        user.action = "spectator"
-        user.hand = ""
-        user.save()
+        users[user.id] = user
+        engine.sit(state, Seat(user.id, user.username, user.chips, action="spectator"))
 
-    if round.stage == Stage.WAITING.value:
+    if state.stage == Stage.WAITING.value:
         # If there are enough players in the round, start the round.
-        if round.players.count() >= 2:
-            prepare_round(round)
+        if len(state.seats) >= 2:
+            engine.prepare_round(state, take_deck(round))
 
-    if Stage.PRE_FLOP.value <= round.stage <= Stage.RIVER.value:
-        next_stage_check(round)
+    if Stage.PRE_FLOP.value <= state.stage <= Stage.RIVER.value:
+        engine.next_stage_check(state)
 
-    if round.stage >= Stage.SHOWDOWN.value:
-        resolve_round(round)
-        redirect("home")
-        players = round.players.all()
-        round = Round()
-        round.save()
-        round.players.set(players)
-        round.save()
+    if state.stage >= Stage.SHOWDOWN.value:
+        showdown(round, state)
+        save_state(round, state, users)
+        round = new_round(table, round.players.all())
+        state, users = load_state(round, user)
 
     # Traitement de l'action de l'utilisateur
-    if request.method == "POST" and round.player_to_play == user.id:
+    if request.method == "POST" and state.player_to_play == user.id:
         action = request.POST.get("action")
-        check, error_message = check_action(round, user, action)
+        seat = state.seat(user.id)
+        check, error_message = engine.check_action(state, seat, action)
         if check:
-            print(f"Action '{action}' by {user.username} at stage {round.stage}")
-            do_action(round, user, action)
-            next_player(round)
-            return redirect("home")
+            print(f"Action '{action}' by {user.username} at stage {state.stage}")
+            engine.do_action(state, seat, action)
+            engine.next_player(state)
+            save_state(round, state, users)
+            return redirect("table", table_id=table.id), round, state, users, ""
         print(f"'{action}' is not a valid action in this context: {error_message}")
 
+    save_state(round, state, users)
+    return None, round, state, users, error_message
+
+
+@login_required
+def table_page(request, table_id: int):
+    """
+    # Renders a table of the Texas Hold'em game and handles user actions.
+
+    This view handles the following actions:
+    - Updating the last action of the user.
+    - Checking for AFK players and handling their actions.
+    - Adding the user to the round if not already added (and removing him from his previous table).
+    - Starting the round if there are enough players.
+    - Checking if the round is finished or needs to move to the next stage.
+    - Resolving the round and updating the stage.
+    - Handling the user's action and updating the round accordingly.
+
+    Args:
+    -----
+        - request: The HTTP request object.
+        - table_id (int): The ID of the table.
+
+    Returns:
+    --------
+        The rendered table template with the appropriate context.
+    """
+    user = request.user
+    table = get_object_or_404(Table, id=table_id)
+    user.last_action = datetime.now()
+    user.save(update_fields=["last_action"])
+
+    # All the changes of the request are committed at once, and played again
+    # if another request changed the round in the meantime
+    for _ in range(CONFLICT_RETRIES):
+        try:
+            with transaction.atomic():
+                response, round, state, users, error_message = _play_turn(
+                    request, user, table
+                )
+            break
+        except ConflictError:
+            # The changes were rolled back: reload the user as it is in the database
+            user.refresh_from_db()
+    else:
+        return HttpResponse(
+            "The table was changed by another player, please try again.",
+            status=409,
+        )
+    if response is not None:
+        return response
+
     # * CONTEXT
-    previous_round = Round.objects.filter(id__lt=round.id).order_by("-id").first()
+    previous_round = table.rounds.filter(id__lt=round.id).order_by("-id").first()
     if previous_round is not None and previous_round.winners_name == "":
         # Happens when a new round was created without finishing the previous one
         previous_round = None
 
-    opponents = list(
-        list(round.players.filter(order__gt=user.order).order_by("order"))
-        + list(round.players.filter(order__lt=user.order).order_by("order"))
-    )
-    # Remove the user from the list of opponents if it ended up there
-    opponents = [opponent for opponent in opponents if opponent.id != user.id]
+    players = [users[seat.user_id] for seat in state.by_order()]
+    opponents = [player for player in players if player.order > user.order] + [
+        player for player in players if player.order < user.order
+    ]
+    seated = [player for player in players if player.order >= 0]
 
-    current_raise = max(player.bet for player in round.players.all())
+    current_raise = state.current_bet
     call_value = min(current_raise, user.chips + user.bet)
 
-    players = round.players.filter(order__gte=0).order_by("order")
-    if len(players) > 0:
-        dealer_id = players[0].id
-    else:
-        dealer_id = 0
+    dealer_id = seated[0].id if seated else 0
+
+    # Equity of the hole cards against the players still in the hand
+    equity = ""
+    if user.hand != "" and user.action not in ("fold", "spectator"):
+        in_hand = sum(player.action != "fold" for player in seated)
+        in_hand = min(max(in_hand, MIN_PLAYERS), MAX_PLAYERS)
+        equity = f"{preflop_equity(user.hand, in_hand):.0%}"
+
+    # Current hand of the user, updated with the cards revealed since the last request
+    hand_name = ""
+    if Stage.PRE_FLOP.value <= round.stage <= Stage.SHOWDOWN.value:
+        hand = live_hand(round, user)
+        if hand is not None and user.action != "fold":
+            hand_name = hand.final_hand.name
 
     context = {
         "user": user,
+        "table": table,
         "round": round,
         "previous_round": previous_round,
         "call_value": call_value,
@@ -144,6 +254,57 @@ def home(request):
         "opponents": opponents,
         "dealer_id": dealer_id,
         "error": error_message,
+        "preflop_equity": equity,
+        "hand_name": hand_name,
     }
 
     return render(request, "holdem/home.html", context=context)
+
+
+@staff_member_required
+def export_hands(request):
+    """
+    # Streams the hand histories of a date range, a player or a table (staff only,
+    as the hole cards of every player are exported).
+
+    The GET parameters are:
+    - format: "jsonl" (default) or "pokerstars".
+    - since, until: The first and the last day (YYYY-MM-DD).
+    - player: The username of a player.
+    - table: The ID of a table.
+
+    Args:
+    -----
+        request: The HTTP request object.
+
+    Returns:
+    --------
+        A streaming response, generating the hands while they are sent.
+    """
+    fmt = request.GET.get("format", "jsonl")
+    if fmt not in export.FORMATS:
+        return HttpResponseBadRequest(f"Unknown format: {fmt}")
+    dates = {}
+    for name in ("since", "until"):
+        value = request.GET.get(name)
+        dates[name] = parse_date(value) if value else None
+        if value and dates[name] is None:
+            return HttpResponseBadRequest(
+                f"Invalid date: {value} (expected YYYY-MM-DD)"
+            )
+    table = request.GET.get("table")
+    if table is not None and not table.isdigit():
+        return HttpResponseBadRequest(f"Invalid table: {table}")
+
+    rounds = export.select_rounds(
+        dates["since"],
+        dates["until"],
+        request.GET.get("player"),
+        int(table) if table is not None else None,
+    )
+    extension = "jsonl" if fmt == "jsonl" else "txt"
+    response = StreamingHttpResponse(
+        export.export_hands(rounds, fmt), content_type=export.FORMATS[fmt][1]
+    )
+    response["Content-Disposition"] = f'attachment; filename="hands.{extension}"'
+    return response
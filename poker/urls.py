@@ -31,6 +31,8 @@ urlpatterns = [
     path("", authentication.views.LoginPage.as_view(), name="login"),
     path("logout/", authentication.views.logout_user, name="logout"),
     path("home/", holdem.views.home, name="home"),
+    path("table/<int:table_id>/", holdem.views.table_page, name="table"),
+    path("hands/export/", holdem.views.export_hands, name="export_hands"),
     path("signup/", authentication.views.signup_page, name="signup"),
 ]
 
@@ -0,0 +1,232 @@
+"""
+This module contains unit tests for the Deck class and its backends.
+These tests only use the local backend, so they don't need the network.
+"""
+
+import time
+import unittest
+
+from holdem.game.deck import (
+    CircuitBreaker,
+    Deck,
+    DeckError,
+    DeckPool,
+    DealStream,
+    LocalDeckBackend,
+    RemoteDeckBackend,
+    SeededDeckBackend,
+    derive_seed,
+)
+from holdem.game.fake_deck_api import FakeDeckAPIServer
+
+
+class TestLocalDeck(unittest.TestCase):
+    """
+    # A test case for the Deck class with the local backend.
+    """
+
+    def test_draw_whole_deck(self):
+        """
+        # Test method for verifying that a deck contains the 52 cards once each.
+        """
+        deck = Deck()
+        self.assertIsInstance(deck.backend, LocalDeckBackend)
+        cards = deck.draw(5) + deck.draw(47)
+        self.assertEqual(sorted(card.id for card in cards), list(range(52)))
+        self.assertEqual(deck.draw(0), [])
+        with self.assertRaises(DeckError):
+            deck.draw(1)
+
+    def test_shuffle(self):
+        """
+        # Test method for verifying that shuffling puts the drawn cards back in a new order.
+        """
+        deck = Deck()
+        first = deck.draw(52)
+        deck.shuffle()
+        second = deck.draw(52)
+        self.assertEqual(set(first), set(second))
+        self.assertNotEqual(first, second)
+        self.assertNotEqual(Deck().draw(52), Deck().draw(52))
+
+    def test_deal(self):
+        """
+        # Test method for verifying that a hand is dealt in one draw from the deck.
+        """
+        deck = Deck()
+        board, hands = deck.deal(6)
+        self.assertEqual(len(board), 5)
+        self.assertEqual([len(hand) for hand in hands], [2] * 6)
+        dealt = board + [card for hand in hands for card in hand]
+        self.assertEqual(len(set(dealt)), 17)
+        self.assertEqual(deck.backend.position, 17)
+        self.assertEqual(deck.deal(2, board=0)[0], [])
+        with self.assertRaises(ValueError):
+            deck.deal(24)
+
+    def test_invalid_draws(self):
+        """
+        # Test method for verifying that invalid counts and backends are rejected.
+        """
+        deck = Deck(deck_id="local-deck")
+        self.assertEqual(deck.deck_id, "local-deck")
+        with self.assertRaises(ValueError):
+            deck.draw(53)
+        with self.assertRaises(TypeError):
+            deck.draw("5")
+        with self.assertRaises(ValueError):
+            Deck(backend="paper")
+
+
+class TestSeededDeck(unittest.TestCase):
+    """
+    # A test case for the reproducible decks.
+    """
+
+    def test_same_seed_same_cards(self):
+        """
+        # Test method for verifying that a seed always deals the same cards, shuffle after shuffle.
+        """
+        first = Deck(backend=SeededDeckBackend(7))
+        second = Deck(backend=SeededDeckBackend(7))
+        self.assertEqual(first.deck_id, "seed-7")
+        self.assertEqual(first.deal(6), second.deal(6))
+        first.shuffle()
+        second.shuffle()
+        self.assertEqual(first.draw(52), second.draw(52))
+        self.assertNotEqual(
+            Deck(backend=SeededDeckBackend(7)).draw(52),
+            Deck(backend=SeededDeckBackend(8)).draw(52),
+        )
+
+    def test_streams(self):
+        """
+        # Test method for verifying that the hands of a stream can be dealt again in any order
+        and that the streams are independent.
+        """
+        stream = DealStream(root_seed=2024, stream="table-1")
+        session = [stream.next_deck().draw(52) for _ in range(5)]
+        replay = DealStream(root_seed=2024, stream="table-1")
+        self.assertEqual(replay.deck(3).draw(52), session[3])
+        self.assertEqual(len({tuple(cards) for cards in session}), 5)
+        other = DealStream(root_seed=2024, stream="table-2").deck(3).draw(52)
+        self.assertNotEqual(other, session[3])
+        self.assertEqual(derive_seed(1, 2), derive_seed(1, 2))
+        self.assertNotEqual(derive_seed(1, 2), derive_seed(1, 3))
+        self.assertNotEqual(derive_seed(1, "12"), derive_seed(11, "2"))
+
+
+class TestRemoteDeck(unittest.TestCase):
+    """
+    # A test case for the Deck class with the remote backend,
+    using the local stand-in of the Deck of Cards API.
+    """
+
+    def start_server(self, **kwargs) -> FakeDeckAPIServer:
+        """
+        # Start a fake API, stopped at the end of the test.
+        """
+        server = FakeDeckAPIServer(**kwargs)
+        server.start_in_thread()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def test_draw_and_keep_alive(self):
+        """
+        # Test method for verifying the remote deck and the reuse of the connections.
+        """
+        server = self.start_server(seed=1)
+        deck = Deck(backend=RemoteDeckBackend(base_url=server.base_url))
+        board, hands = deck.deal(4)
+        cards = board + [card for hand in hands for card in hand] + deck.draw(39)
+        self.assertEqual(sorted(card.id for card in cards), list(range(52)))
+        with self.assertRaises(DeckError):
+            deck.draw(1)
+        deck.shuffle()
+        self.assertEqual(len(deck.draw(52)), 52)
+        self.assertEqual(server.requests_count, 6)
+        self.assertEqual(server.connections_count, 1)
+
+    def test_fallback_to_local_deck(self):
+        """
+        # Test method for verifying that the deck goes on with the cards not drawn yet
+        when the API keeps failing.
+        """
+        server = self.start_server(seed=2)
+        backend = RemoteDeckBackend(base_url=server.base_url)
+        deck = Deck(backend=backend)
+        drawn = deck.draw(10)
+        server.error_rate = 1.0
+        for _ in range(backend.breaker.threshold - 1):
+            with self.assertRaises(DeckError):
+                deck.draw(2)
+        rest = deck.draw(42)
+        self.assertIsNotNone(backend.fallback)
+        self.assertEqual(sorted(card.id for card in drawn + rest), list(range(52)))
+        # The other decks don't wait for the API either
+        other = Deck(backend=RemoteDeckBackend(base_url=server.base_url))
+        self.assertIsNotNone(other.backend.fallback)
+        self.assertEqual(len(other.draw(52)), 52)
+
+    def test_circuit_breaker(self):
+        """
+        # Test method for verifying the states of the circuit breaker.
+        """
+        breaker = CircuitBreaker(threshold=2, reset_timeout=0.05)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertTrue(breaker.is_open)
+        self.assertFalse(breaker.allow())
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertFalse(breaker.is_open)
+        self.assertTrue(breaker.allow())
+
+
+class TestDeckPool(unittest.TestCase):
+    """
+    # A test case for the pool of shuffled decks.
+    """
+
+    def test_hits_and_misses(self):
+        """
+        # Test method for verifying that the decks are created ahead of demand
+        and that a deck is never given out twice.
+        """
+        pool = DeckPool(size=4)
+        taken = [pool.take()]
+        deadline = time.monotonic() + 5
+        while pool.stats()["ready"] < 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        taken += [pool.take() for _ in range(4)]
+        stats = pool.stats()
+        self.assertGreaterEqual(stats["hits"], 4)
+        self.assertEqual(stats["hits"] + stats["misses"], 5)
+        self.assertGreater(stats["refills"], 4)
+        self.assertGreaterEqual(stats["max_refill_seconds"], 0)
+        self.assertEqual(len({id(deck) for deck in taken}), 5)
+        self.assertEqual(len({deck.deck_id for deck in taken}), 5)
+
+    def test_miss_when_empty(self):
+        """
+        # Test method for verifying that a slow source doesn't block the caller forever.
+        """
+
+        def slow_deck():
+            time.sleep(0.05)
+            return Deck()
+
+        pool = DeckPool(slow_deck, size=1)
+        deck = pool.take()
+        self.assertEqual(len(deck.draw(52)), 52)
+        self.assertEqual(pool.stats()["misses"], 1)
+        with self.assertRaises(ValueError):
+            DeckPool(size=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+"""
+This module contains unit tests for the table state engine.
+These tests play rounds without any database.
+"""
+
+import unittest
+
+from engine_fixtures import new_table, play
+from holdem.game.card import Card
+from holdem.game.deck import Deck, SeededDeckBackend
+from holdem.game.engine import Seat, Stage, check_action, prepare_round, resolve_round
+from holdem.game.hand import Hand
+
+
+class TestEngine(unittest.TestCase):
+    """
+    # A test case for the transitions of the engine.
+    """
+
+    def test_prepare_round(self):
+        """
+        # Test method for verifying the seats, the cards, the blinds and the first player.
+        """
+        state = new_table(1000, 1000, 1000, 1000)
+        prepare_round(state, Deck(backend=SeededDeckBackend(1)))
+        self.assertEqual(state.stage, Stage.PRE_FLOP.value)
+        self.assertEqual([seat.order for seat in state.seats], [1, 2, 3, 0])
+        self.assertEqual(len(state.board), 10)
+        cards = Card.from_code_string(
+            state.board + "".join(s.hand for s in state.seats)
+        )
+        self.assertEqual(len(set(cards)), 13)
+        self.assertEqual([seat.bet for seat in state.seats], [25, 50, 0, 0])
+        self.assertEqual(state.pot, 75)
+        self.assertEqual(state.current_bet, 50)
+        self.assertEqual(state.player_to_play, 3)
+
+    def test_heads_up_all_in_by_blinds(self):
+        """
+        # Test method for verifying that a round goes to the showdown
+        when the blinds put every player all-in.
+        """
+        state = new_table(20, 20)
+        prepare_round(state, Deck(backend=SeededDeckBackend(2)))
+        self.assertEqual(state.stage, Stage.SHOWDOWN.value)
+        self.assertEqual(state.pot, 40)
+
+    def test_check_action(self):
+        """
+        # Test method for verifying the minimum raise and the chips of the raises.
+        """
+        state = new_table(1000, 1000, 100)
+        prepare_round(state, Deck(backend=SeededDeckBackend(3)))
+        seat = state.seat(state.player_to_play)
+        self.assertEqual(
+            check_action(state, seat, "10"), (False, "Raise must be at least 25")
+        )
+        self.assertEqual(check_action(state, seat, "2000")[0], False)
+        self.assertEqual(check_action(state, seat, "call"), (True, ""))
+        with self.assertRaises(TypeError):
+            check_action(state, seat, None)
+
+    def test_full_round(self):
+        """
+        # Test method for verifying a whole round, street by street, up to the showdown.
+        """
+        state = new_table(1000, 1000, 1000)
+        prepare_round(state, Deck(backend=SeededDeckBackend(4)))
+        for _ in range(3):
+            play(state, "call")
+        self.assertEqual(state.stage, Stage.FLOP.value)
+        self.assertEqual(state.pot, 150)
+        play(state, "100")
+        play(state, "call")
+        play(state, "fold")
+        self.assertEqual(state.stage, Stage.TURN.value)
+        while state.stage < Stage.SHOWDOWN.value:
+            play(state, "call")
+        self.assertEqual(state.pot, 350)
+
+        board = Card.from_code_string(state.board)
+        hands = {
+            seat.user_id: Hand(Card.from_code_string(seat.hand) + board).final_hand
+            for seat in state.seats
+            if seat.action != "fold"
+        }
+        resolve_round(state)
+        self.assertEqual(sum(seat.chips for seat in state.seats), 3000)
+        self.assertTrue(all(seat.total_bet == 0 for seat in state.seats))
+        best = max(hands.values())
+        winners = [
+            state.seat(user_id).name for user_id, hand in hands.items() if hand == best
+        ]
+        self.assertEqual(state.winners_name, ", ".join(winners))
+        self.assertEqual(state.winner_hand, best.name)
+
+    def test_side_pots(self):
+        """
+        # Test method for verifying that a player all-in only wins what he could match,
+        and that the chips of a departed player stay in the pots.
+        """
+        state = new_table(100, 1000, 1000)
+        state.stage = Stage.SHOWDOWN.value
+        state.board = "2C3D9HJS8D"
+        state.seats[0].hand, state.seats[0].total_bet = "ACAD", 100
+        state.seats[1].hand, state.seats[1].total_bet = "KCKH", 300
+        state.seats[2].hand, state.seats[2].total_bet = "4C5D", 300
+        state.departed = [Seat(4, "departed", 500, total_bet=150, action="fold")]
+        state.pot = 850
+        for seat in state.seats:
+            seat.chips -= seat.total_bet
+        resolve_round(state)
+        self.assertEqual([seat.chips for seat in state.seats], [400, 1150, 700])
+        self.assertEqual(state.winners_name, "player1, player2")
+        self.assertEqual(state.departed[0].total_bet, 0)
+
+    def test_pot_without_winners(self):
+        """
+        # Test method for verifying a showdown where only a departed player put chips
+        in the pot: nobody wins them, and no winning hand is shown.
+        """
+        state = new_table(1000, 1000)
+        state.stage = Stage.SHOWDOWN.value
+        state.board = "2C3D9HJS8D"
+        state.seats[0].hand, state.seats[1].hand = "ACAD", "KCKH"
+        state.departed = [Seat(3, "departed", 500, total_bet=50, action="fold")]
+        state.pot = 50
+        resolve_round(state)
+        self.assertEqual([seat.chips for seat in state.seats], [1000, 1000])
+        self.assertEqual(state.winner_hand, "")
+        self.assertEqual(state.winners_name, "")
+
+
+if __name__ == "__main__":
+    unittest.main()
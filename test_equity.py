@@ -0,0 +1,189 @@
+"""
+This module contains unit tests for the equity calculators.
+These tests verify the equities of well-known Texas Hold'em confrontations.
+"""
+
+import unittest
+from itertools import combinations
+
+from holdem.game.card import Card, CARDS
+from holdem.game.equity import exact_equity, monte_carlo_equity
+from holdem.game.evaluator import evaluate
+from holdem.game.preflop import (
+    N_CLASSES,
+    hand_class,
+    hand_class_name,
+    load_table,
+    preflop_equity,
+)
+
+
+class TestMonteCarloEquity(unittest.TestCase):
+    """
+    # A test case for the Monte Carlo equity calculator.
+    """
+
+    def test_pair_against_pair(self):
+        """
+        # Test method for verifying that aces are ~82% against kings preflop.
+        """
+        result = monte_carlo_equity(
+            [Card.from_code_string("ASAD"), Card.from_code_string("KHKC")],
+            samples=20_000,
+            workers=1,
+            seed=42,
+        )
+        self.assertEqual(result.samples, 20_000)
+        self.assertAlmostEqual(sum(result.equities), 1.0)
+        self.assertAlmostEqual(result.equities[0], 0.82, delta=0.015)
+
+    def test_pool_matches_single_process(self):
+        """
+        # Test method for verifying that the batches merged from the process pool
+        give the same result as the same batches dealt in the current process.
+        """
+        hands = [Card.from_code_string("AHKH"), Card.from_code_string("7C7D")]
+        board = Card.from_code_string("2H9H")
+        single = monte_carlo_equity(
+            hands, board, samples=4_000, workers=1, seed=3, batch_size=1_000
+        )
+        pooled = monte_carlo_equity(
+            hands, board, samples=4_000, workers=2, seed=3, batch_size=1_000
+        )
+        self.assertEqual(single.wins, pooled.wins)
+        self.assertEqual(single.ties, pooled.ties)
+
+    def test_early_stop(self):
+        """
+        # Test method for verifying that the calculation stops on the confidence interval.
+        """
+        result = monte_carlo_equity(
+            [Card.from_code_string("ASAD"), Card.from_code_string("7C2D")],
+            samples=1_000_000,
+            workers=1,
+            target_ci=0.02,
+            seed=1,
+            batch_size=500,
+        )
+        self.assertLess(result.samples, 1_000_000)
+        self.assertLessEqual(result.confidence_interval(), 0.02)
+
+    def test_invalid_cards(self):
+        """
+        # Test method for verifying that impossible deals are rejected.
+        """
+        with self.assertRaises(ValueError):
+            monte_carlo_equity([Card.from_code_string("ASAD")])
+        with self.assertRaises(ValueError):
+            monte_carlo_equity(
+                [Card.from_code_string("ASAD"), Card.from_code_string("ASKD")]
+            )
+
+
+class TestExactEquity(unittest.TestCase):
+    """
+    # A test case for the exact equity enumeration.
+    """
+
+    def test_matches_brute_force(self):
+        """
+        # Test method for verifying the incremental enumeration against a full re-evaluation
+        of every board.
+        """
+        hands = [
+            Card.from_code_string("AHKH"),
+            Card.from_code_string("QSQD"),
+            Card.from_code_string("5H6H"),
+        ]
+        board = Card.from_code_string("2H9CQH")
+        result = exact_equity(hands, board)
+        known = [card for hand in hands for card in hand] + board
+        wins = [0, 0, 0]
+        ties = [0, 0, 0]
+        boards = 0
+        for runout in combinations([card for card in CARDS if card not in known], 2):
+            strengths = [evaluate(hand + board + list(runout)) for hand in hands]
+            winners = [i for i, s in enumerate(strengths) if s == max(strengths)]
+            for i in winners:
+                if len(winners) == 1:
+                    wins[i] += 1
+                else:
+                    ties[i] += 1
+            boards += 1
+        self.assertTrue(result.exact)
+        self.assertEqual(result.samples, boards)
+        self.assertEqual(result.wins, wins)
+        self.assertEqual(result.ties, ties)
+
+    def test_known_flop(self):
+        """
+        # Test method for verifying a well-known flop equity (aces vs kings on 2-7-9).
+        """
+        result = exact_equity(
+            [Card.from_code_string("ASAD"), Card.from_code_string("KHKC")],
+            Card.from_code_string("2C7D9H"),
+        )
+        self.assertEqual(result.samples, 990)
+        self.assertAlmostEqual(result.equities[0], 907 / 990)
+
+    def test_falls_back_to_sampling(self):
+        """
+        # Test method for verifying that preflop enumerations are sampled instead.
+        """
+        result = exact_equity(
+            [Card.from_code_string("ASAD"), Card.from_code_string("KHKC")],
+            max_evaluations=100_000,
+            samples=2_000,
+            workers=1,
+            seed=0,
+        )
+        self.assertFalse(result.exact)
+        self.assertEqual(result.samples, 2_000)
+
+
+class TestPreflopEquity(unittest.TestCase):
+    """
+    # A test case for the precomputed preflop equity table.
+    """
+
+    def test_classes(self):
+        """
+        # Test method for verifying that the 1326 starting hands fall in the 169 classes.
+        """
+        classes = {hand_class(list(hole)) for hole in combinations(CARDS, 2)}
+        self.assertEqual(len(classes), N_CLASSES)
+        self.assertEqual(len({hand_class_name(index) for index in classes}), N_CLASSES)
+        self.assertEqual(hand_class_name(hand_class("ASKS")), "AKs")
+        self.assertEqual(hand_class_name(hand_class("KDAS")), "AKo")
+        self.assertEqual(hand_class_name(hand_class("0H0C")), "TT")
+        self.assertEqual(hand_class("7C2D"), hand_class("2H7S"))
+
+    def test_known_equities(self):
+        """
+        # Test method for verifying well-known preflop equities.
+        """
+        self.assertEqual(len(load_table()), N_CLASSES * 5)
+        self.assertAlmostEqual(preflop_equity("ASAD"), 0.852, delta=0.005)
+        self.assertAlmostEqual(preflop_equity("7C2D"), 0.346, delta=0.005)
+        self.assertAlmostEqual(preflop_equity("AHKH", 3), 0.504, delta=0.01)
+        self.assertGreater(preflop_equity("KSKH"), preflop_equity("QSQH"))
+        self.assertGreater(preflop_equity("AHKH"), preflop_equity("AHKD"))
+        for players in range(2, 6):
+            self.assertGreater(
+                preflop_equity("ASAD", players), preflop_equity("ASAD", players + 1)
+            )
+
+    def test_invalid_lookups(self):
+        """
+        # Test method for verifying that invalid lookups are rejected.
+        """
+        with self.assertRaises(ValueError):
+            preflop_equity("ASAD", 7)
+        with self.assertRaises(ValueError):
+            preflop_equity("ASAS")
+        with self.assertRaises(ValueError):
+            preflop_equity("ASADKH")
+
+
+if __name__ == "__main__":
+    unittest.main()
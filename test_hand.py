@@ -1,12 +1,36 @@
 """
-This module contains unit tests for the Hand and FinalHand classes.
+This module contains unit tests for the Card, Hand and FinalHand classes.
 These tests verify the behavior of different hand combinations in a game of Texas Hold'em.
 """
 
+import os
+import pickle
+import random
+import tempfile
 import unittest
+from concurrent.futures import as_completed
+from unittest import mock
 
-from holdem.game.card import Card
-from holdem.game.hand import Hand, FinalHandPower
+from holdem.game import evaluator
+from holdem.game.card import Card, CARDS
+from holdem.game.hand import (
+    Hand,
+    FinalHand,
+    FinalHandPower,
+    IncrementalHand,
+    evaluate_batch,
+)
+from validate_hand import (
+    KNOWN_COUNTS,
+    cross_check,
+    enumerate_hands,
+    load_checkpoint,
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 class TestHand(unittest.TestCase):
@@ -300,6 +324,238 @@ class TestHand(unittest.TestCase):
         )
         self.assertEqual(first_full_house_final_hand, second_full_house_final_hand)
 
+    def test_single_pass_matches_scans(self):
+        """
+        # Test method for verifying that the single-pass detection returns
+        the same final hands (cards, power and suit) as the detect_ methods.
+        """
+        rng = random.Random(1789)
+        for _ in range(3000):
+            hand = Hand(rng.sample(CARDS, rng.randint(1, 7)))
+            reference = hand.detect_final_hand_by_scans()
+            self.assertEqual(hand.final_hand.power, reference.power, str(hand))
+            self.assertEqual(hand.final_hand.cards, reference.cards, str(hand))
+            self.assertEqual(hand.final_hand.suit, reference.suit, str(hand))
+
+    def test_final_hand_key(self):
+        """
+        # Test method for verifying that final hands can be sorted, hashed and deduplicated.
+        """
+        board = Card.from_code_string("JHJD5C5D2S")
+        hands = [
+            Hand(board + Card.from_code_string(hole)).final_hand
+            for hole in ["AS3C", "AD3H", "KS3S", "JS4C", "5H5S"]
+        ]
+        ordered = sorted(hands)
+        self.assertEqual(ordered[0].name, "Two pairs (JACKs and 5s)")
+        self.assertEqual(ordered[-1].power, FinalHandPower.FOUR_OF_A_KIND.value)
+        self.assertEqual(hands[0], hands[1])
+        self.assertEqual(len(set(hands)), 4)
+        self.assertEqual({hands[0]: "ace kicker"}[hands[1]], "ace kicker")
+
+    def test_wheel_straight_flush(self):
+        """
+        # Test method for verifying a straight flush from ACE to 5.
+        """
+        hand = Hand(Card.from_code_string("AS2S3S4S5SKSKD"))
+        final_hand = hand.final_hand
+        self.assertEqual(final_hand.power, FinalHandPower.STRAIGHT_FLUSH.value)
+        self.assertEqual(final_hand.value, ["5", "4", "3", "2", "ACE"])
+        self.assertEqual(final_hand.suit, "SPADES")
+
+    def test_repeated_card(self):
+        """
+        # Test method for verifying that a card can't be in a hand twice.
+        """
+        with self.assertRaises(ValueError):
+            Hand(Card.from_code_string("ASAS"))
+
+
+class TestIncrementalHand(unittest.TestCase):
+    """
+    # A test case for the IncrementalHand class.
+    """
+
+    def test_matches_hand_street_by_street(self):
+        """
+        # Test method for verifying that adding the community cards one street at a time
+        gives the same final hand and strength as building a new Hand at each street.
+        """
+        rng = random.Random(2024)
+        for _ in range(1000):
+            cards = rng.sample(CARDS, 7)
+            hand = IncrementalHand(cards[:2])
+            for street in (5, 6, 7):
+                hand.extend(cards[len(hand) : street])
+                reference = Hand(cards[:street])
+                self.assertEqual(hand.final_hand.cards, reference.final_hand.cards)
+                self.assertEqual(hand.final_hand.key, reference.final_hand.key)
+                self.assertEqual(hand.rank, reference.rank)
+
+    def test_invalid_cards(self):
+        """
+        # Test method for verifying that repeated cards and an 8th card are rejected.
+        """
+        hand = IncrementalHand(Card.from_code_string("ASKS"))
+        with self.assertRaises(ValueError):
+            hand.add(Card.from_code("AS"))
+        with self.assertRaises(ValueError):
+            hand.rank  # pylint: disable=pointless-statement
+        hand.extend(Card.from_code_string("QSJS0S2C3C"))
+        self.assertEqual(hand.final_hand.power, FinalHandPower.ROYAL_FLUSH.value)
+        with self.assertRaises(ValueError):
+            hand.add(Card.from_code("4C"))
+
+
+class TestCard(unittest.TestCase):
+    """
+    # A test case for the Card class.
+    Cards are interned: every way of building a card returns the same object.
+    """
+
+    def test_registry(self):
+        """
+        # Test method for verifying the 52 preallocated cards and their encoding.
+        """
+        self.assertEqual(len(CARDS), 52)
+        self.assertEqual(len({card.code for card in CARDS}), 52)
+        for card_id, card in enumerate(CARDS):
+            self.assertEqual(card.id, card_id)
+            self.assertEqual(card.id, card.rank * 4 + card.suit_index)
+        ace_of_spades = Card.from_code("AS")
+        self.assertEqual(ace_of_spades.id, 51)
+        self.assertEqual(ace_of_spades.prime, 41)
+        self.assertEqual(ace_of_spades.rank_bit, 1 << 12)
+
+    def test_interning(self):
+        """
+        # Test method for verifying that all constructors return the shared instances.
+        """
+        card = Card(value="10", suit="HEARTS")
+        self.assertIs(card, Card.from_code("0H"))
+        self.assertIs(card, Card.from_id(card.id))
+        self.assertIs(card, Card.from_code_string("2C0H")[1])
+        self.assertIs(card, pickle.loads(pickle.dumps(card)))
+        self.assertEqual(card.code, "0H")
+        self.assertEqual(card.unicode, "⑩ ♥")
+        self.assertEqual(card.image, "https://deckofcardsapi.com/static/img/0H.png")
+
+    def test_invalid_cards(self):
+        """
+        # Test method for verifying that invalid cards are rejected.
+        """
+        with self.assertRaises(ValueError):
+            Card(value="1", suit="HEARTS")
+        with self.assertRaises(ValueError):
+            Card(value="2", suit="HEARTS", code="3H")
+        with self.assertRaises(ValueError):
+            Card.from_code("1H")
+        with self.assertRaises(ValueError):
+            Card.from_code_string("AS1")
+        with self.assertRaises(AttributeError):
+            Card.from_code("AS").value = "KING"
+
+
+class TestEvaluator(unittest.TestCase):
+    """
+    # A test case for the lookup table evaluator.
+    The evaluator must agree with Hand on the power and the order of the hands.
+    """
+
+    def test_table_is_memory_mapped(self):
+        """
+        # Test method for verifying that the shipped table file is used.
+        """
+        self.assertIsInstance(evaluator.FLUSH_TABLE, memoryview)
+        self.assertEqual(len(evaluator.NOFLUSH_TABLE), evaluator.NOFLUSH_SIZE)
+
+    def test_agrees_with_hand(self):
+        """
+        # Test method for verifying the evaluator against Hand on random 5 to 7 card hands.
+        """
+        rng = random.Random(2024)
+        hands = [Hand(rng.sample(CARDS, rng.randint(5, 7))) for _ in range(2000)]
+        for hand in hands:
+            self.assertEqual(
+                evaluator.hand_power(hand.rank), hand.final_hand.power, str(hand)
+            )
+        for first, second in zip(hands, hands[1:]):
+            expected = first.final_hand.compare(second.final_hand)
+            self.assertEqual(
+                (first.rank > second.rank) - (first.rank < second.rank), expected
+            )
+
+    def test_extreme_ranks(self):
+        """
+        # Test method for verifying the weakest and the strongest hands.
+        """
+        weakest = Card.from_code_string("7S5H4D3C2S")
+        strongest = Card.from_code_string("AHKHQHJH0H9C8C")
+        self.assertEqual(evaluator.evaluate(weakest), 1)
+        self.assertEqual(evaluator.evaluate(strongest), evaluator.MAX_STRENGTH)
+
+    def test_final_hand_from_rank(self):
+        """
+        # Test method for verifying that a FinalHand built from a rank can be displayed.
+        """
+        hand = Hand(Card.from_code_string("JHJDJS5C5DAS2C"))
+        final_hand = FinalHand.from_rank(hand.rank)
+        self.assertEqual(final_hand.power, FinalHandPower.FULL_HOUSE.value)
+        self.assertEqual(final_hand.name, hand.final_hand.name)
+        self.assertEqual(final_hand.key, hand.final_hand.key)
+        wheel = FinalHand.from_rank(
+            evaluator.evaluate(Card.from_code_string("AS2D3C4H5S"))
+        )
+        self.assertEqual(wheel.name, "Straight (ACE to 5)")
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_evaluate_batch(self):
+        """
+        # Test method for verifying the batch evaluation against the scalar one.
+        """
+        rng = np.random.default_rng(7)
+        for n_cards in (5, 6, 7):
+            card_ids = np.argsort(rng.random((3000, 52)), axis=1)[:, :n_cards]
+            strengths, powers = evaluate_batch(
+                card_ids.astype(np.uint8), powers=True, chunk_size=1000
+            )
+            self.assertEqual(strengths.shape, (3000,))
+            for ids, strength, power in zip(card_ids.tolist(), strengths, powers):
+                self.assertEqual(strength, evaluator.evaluate_ids(ids))
+                self.assertEqual(power, evaluator.hand_power(int(strength)))
+        with self.assertRaises(ValueError):
+            evaluate_batch(np.zeros((10, 4), dtype=np.uint8))
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_five_card_enumeration(self):
+        """
+        # Test method for verifying the number of hands of each power over all 5-card hands.
+        """
+        counts = enumerate_hands(5, workers=1, verbose=False)
+        self.assertEqual(counts, KNOWN_COUNTS[5])
+        self.assertEqual(cross_check(5, 2000) + cross_check(7, 2000), 0)
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_interrupted_enumeration(self):
+        """
+        # Test method for verifying that an interrupted enumeration saves its checkpoint,
+        and that the next run resumes from it.
+        """
+
+        def interrupted(futures):
+            yield next(as_completed(futures))
+            raise KeyboardInterrupt
+
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint = os.path.join(directory, "enumeration.json")
+            with mock.patch("validate_hand.as_completed", interrupted):
+                with self.assertRaises(KeyboardInterrupt):
+                    enumerate_hands(5, 1, checkpoint, verbose=False)
+            self.assertEqual(len(load_checkpoint(checkpoint, 5)["done"]), 1)
+            counts = enumerate_hands(5, 1, checkpoint, verbose=False)
+            self.assertEqual(counts, KNOWN_COUNTS[5])
+            self.assertFalse(os.path.exists(checkpoint))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,97 @@
+"""
+This module contains unit tests for the hand history.
+Random rounds are played with the engine, and the state rebuilt from the events
+is compared with the state of the engine after each transition.
+"""
+
+import random
+import unittest
+
+from engine_fixtures import new_table
+from holdem.game.deck import Deck, SeededDeckBackend
+from holdem.game.engine import (
+    Seat,
+    Stage,
+    TableState,
+    check_action,
+    do_action,
+    leave,
+    next_player,
+    next_stage_check,
+    prepare_round,
+    resolve_round,
+    sit,
+)
+from holdem.game.history import apply_event, decode, encode, replay
+
+
+class TestHistory(unittest.TestCase):
+    """
+    # A test case for the events of the engine and the rebuilt states.
+    """
+
+    def assertRebuilt(self, start: list, state: TableState):
+        """
+        # Check that the events of the state rebuild it from the starting snapshot,
+        after going through their JSON encoding.
+        """
+        events = [decode(encode(event)) for event in state.events]
+        rebuilt = replay(TableState.from_snapshot(start), events)
+        self.assertEqual(rebuilt.snapshot(), state.snapshot())
+
+    def test_snapshot(self):
+        """
+        # Test method for verifying that a snapshot gives back the same state.
+        """
+        state = new_table(100, 200)
+        state.departed = [Seat(9, "departed", 50, total_bet=20, action="fold")]
+        state.board = "2C3D9HJS8D"
+        snapshot = decode(encode(state.snapshot()))
+        self.assertEqual(TableState.from_snapshot(snapshot), state)
+        with self.assertRaises(ValueError):
+            apply_event(state, ["unknown"])
+
+    def test_random_rounds(self):
+        """
+        # Test method for verifying random rounds of 2 to 6 players, with players
+        sitting and leaving between the hands, rebuilt after each transition.
+        """
+        rng = random.Random(23)
+        for game in range(60):
+            state = new_table(
+                *(rng.choice([60, 500, 1000]) for _ in range(rng.randint(2, 6)))
+            )
+            start = state.snapshot()
+            for hand in range(3):
+                if len([seat for seat in state.seats if seat.chips > 0]) < 2:
+                    break
+                for seat in [seat for seat in state.seats if seat.chips == 0]:
+                    leave(state, seat.user_id)
+                if rng.random() < 0.3:
+                    sit(state, Seat(10 + hand, "new", 300, action="spectator"))
+                prepare_round(state, Deck(backend=SeededDeckBackend(game * 10 + hand)))
+                self.assertRebuilt(start, state)
+                while state.stage < Stage.SHOWDOWN.value:
+                    seat = state.seat(state.player_to_play)
+                    action = rng.choice(["call", "call", "fold", str(state.min_raise)])
+                    if not check_action(state, seat, action)[0]:
+                        action = "call"
+                    do_action(state, seat, action)
+                    next_player(state)
+                    next_stage_check(state)
+                    self.assertRebuilt(start, state)
+                total = sum(seat.total_bet for seat in state.seats + state.departed)
+                self.assertEqual(total, state.pot)
+                resolve_round(state)
+                self.assertEqual(state.events[-1][0], "win")
+                self.assertRebuilt(start, state)
+                # The next hand is a new round (see holdem.game.game.new_round)
+                state.pot = 0
+                state.stage = Stage.WAITING.value
+                state.departed = []
+                start = state.snapshot()
+                state.events = []
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+"""
+This module contains unit tests for the side pot calculator.
+The pots are checked against a brute force split, chip level by chip level,
+on every small case and on random rounds.
+"""
+
+import itertools
+import random
+import unittest
+
+from holdem.game.pots import Stake, side_pots
+
+
+def brute_force(stakes):
+    """
+    # Split the pots one chip level at a time (each level is a pot of one chip per contributor),
+    then merge the levels with the same eligible players and give the dead levels to the pot below.
+    """
+    pots = []  # [amount, eligible indices]
+    top = max((stake.contribution for stake in stakes), default=0)
+    for level in range(1, top + 1):
+        contributors = [i for i, s in enumerate(stakes) if s.contribution >= level]
+        eligible = [i for i in contributors if not stakes[i].folded]
+        if not eligible and pots:
+            pots[-1][0] += len(contributors)
+        elif pots and pots[-1][1] == eligible:
+            pots[-1][0] += len(contributors)
+        else:
+            pots.append([len(contributors), eligible])
+    payouts = {}
+    for amount, eligible in pots:
+        if not eligible:
+            continue
+        best = max(stakes[i].rank for i in eligible)
+        winners = [i for i in eligible if stakes[i].rank == best]
+        for k, i in enumerate(winners):
+            share = amount // len(winners) + (1 if k < amount % len(winners) else 0)
+            payouts[stakes[i].seat] = payouts.get(stakes[i].seat, 0) + share
+    return [pot for pot in pots if pot[1] or len(pots) == 1], payouts
+
+
+class TestSidePots(unittest.TestCase):
+    """
+    # A test case for the side pot calculator.
+    """
+
+    def check(self, stakes):
+        """
+        # Compare the pots with the brute force split.
+        """
+        pots, payouts = side_pots(stakes)
+        expected_pots, expected_payouts = brute_force(stakes)
+        self.assertEqual(payouts, expected_payouts, stakes)
+        self.assertEqual(
+            [(pot.amount, list(pot.eligible)) for pot in pots],
+            [
+                (amount, [stakes[i].seat for i in eligible])
+                for amount, eligible in expected_pots
+            ],
+            stakes,
+        )
+        total = sum(stake.contribution for stake in stakes)
+        self.assertEqual(sum(pot.amount for pot in pots), total)
+        if any(not stake.folded and stake.contribution > 0 for stake in stakes):
+            self.assertEqual(sum(payouts.values()), total)
+        # Nobody wins more than what he matched from each player,
+        # and the chips of the players who folded above all the others
+        top = max((s.contribution for s in stakes if not s.folded), default=0)
+        dead = sum(max(s.contribution - top, 0) for s in stakes)
+        for stake in stakes:
+            matched = sum(min(s.contribution, stake.contribution) for s in stakes)
+            self.assertLessEqual(payouts.get(stake.seat, 0), matched + dead)
+
+    def test_main_and_side_pot(self):
+        """
+        # Test method for verifying a short all-in winning the main pot only.
+        """
+        pots, payouts = side_pots(
+            [Stake("A", 100, rank=9), Stake("B", 300, rank=5), Stake("C", 300, rank=1)]
+        )
+        self.assertEqual([pot.amount for pot in pots], [300, 400])
+        self.assertEqual(pots[0].eligible, ("A", "B", "C"))
+        self.assertEqual(pots[1].winners, ("B",))
+        self.assertEqual(payouts, {"A": 300, "B": 400})
+
+    def test_dead_chips_and_odd_chips(self):
+        """
+        # Test method for verifying that the chips of the players who folded stay in the pot
+        below them, and that the odd chips go to the first winners.
+        """
+        pots, payouts = side_pots(
+            [
+                Stake(0, 51, rank=3),
+                Stake(1, 51, rank=3),
+                Stake(2, 80, folded=True),
+                Stake(3, 20, folded=True),
+            ]
+        )
+        self.assertEqual(len(pots), 1)
+        self.assertEqual((pots[0].amount, pots[0].odd_chips), (202, 0))
+        self.assertEqual(payouts, {0: 101, 1: 101})
+        pots, payouts = side_pots(
+            [Stake("x", 50, rank=2), Stake("y", 50, rank=2), Stake("z", 1, True)]
+        )
+        self.assertEqual(pots[0].odd_chips, 1)
+        self.assertEqual(payouts, {"x": 51, "y": 50})
+
+    def test_everybody_folded(self):
+        """
+        # Test method for verifying that nobody wins when every player folded.
+        """
+        pots, payouts = side_pots([Stake(0, 10, True), Stake(1, 30, True)])
+        self.assertEqual(payouts, {})
+        self.assertEqual([(pot.amount, pot.winners) for pot in pots], [(40, ())])
+        self.assertEqual(side_pots([]), ([], {}))
+        with self.assertRaises(ValueError):
+            side_pots([Stake(0, -1)])
+        with self.assertRaises(ValueError):
+            side_pots([Stake(0, 1), Stake(0, 2)])
+
+    def test_exhaustive_small_rounds(self):
+        """
+        # Test method for verifying every round of 3 players with contributions up to 3,
+        any of them folded and hands of 2 values.
+        """
+        for contributions in itertools.product(range(4), repeat=3):
+            for folded in itertools.product((False, True), repeat=3):
+                for ranks in itertools.product(range(2), repeat=3):
+                    self.check(
+                        [
+                            Stake(i, contributions[i], folded[i], ranks[i])
+                            for i in range(3)
+                        ]
+                    )
+
+    def test_random_rounds(self):
+        """
+        # Test method for verifying random rounds of 2 to 10 players.
+        """
+        rng = random.Random(19)
+        for _ in range(2000):
+            n = rng.randint(2, 10)
+            levels = [rng.randint(0, 60) for _ in range(rng.randint(1, 4))]
+            stakes = [
+                Stake(
+                    f"p{i}",
+                    rng.choice(levels),
+                    rng.random() < 0.3,
+                    rng.randint(0, 4),
+                )
+                for i in range(n)
+            ]
+            self.check(stakes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+This module contains unit tests for the simulation of tables played by bots
+(without any database).
+"""
+
+import random
+import unittest
+
+from holdem.game.engine import Seat, TableState
+from holdem.game.simulation import (
+    BOTS,
+    EquityBot,
+    RandomBot,
+    TableConfig,
+    run_table,
+    simulate,
+)
+
+
+class TestSimulation(unittest.TestCase):
+    """
+    # A test case for the bots and the simulation harness.
+    """
+
+    def test_bots(self):
+        """
+        # Test method for verifying the actions chosen by the bots.
+        """
+        state = TableState(
+            seats=[Seat(1, hand="ASAH", bet=50), Seat(2, hand="7C2D")], stage=1
+        )
+        rng = random.Random(0)
+        self.assertEqual(EquityBot()(state, state.seats[0], rng), "25")
+        self.assertEqual(EquityBot()(state, state.seats[1], rng), "fold")
+        state.stage = 2
+        self.assertEqual(EquityBot()(state, state.seats[1], rng), "call")
+        for _ in range(100):
+            action = RandomBot()(state, state.seats[1], rng)
+            self.assertTrue(action in ("call", "fold") or 25 <= int(action) <= 1000)
+        self.assertEqual(BOTS["station"]()(state, state.seats[1], rng), "call")
+
+    def test_run_table(self):
+        """
+        # Test method for verifying that a table plays its hands, and plays them again
+        the same way from the same seed.
+        """
+        config = TableConfig(0, 50, ["random", "station", "equity", "random"], seed=3)
+        stats = run_table(config)
+        self.assertEqual(stats.hands, 50)
+        self.assertGreater(stats.actions, 50)
+        self.assertGreater(stats.phases["rules"], 0)
+        self.assertEqual(stats.phases["save"], 0)
+        again = run_table(config)
+        self.assertEqual(
+            (again.actions, again.events, again.rebuys),
+            (stats.actions, stats.events, stats.rebuys),
+        )
+        with self.assertRaises(ValueError):
+            run_table(config._replace(bots=["unknown"]))
+
+    def test_simulate(self):
+        """
+        # Test method for verifying the tables played in a pool of processes.
+        """
+        stats = simulate(tables=3, hands=20, players=3, workers=2, seed=1)
+        self.assertEqual((stats.tables, stats.hands), (3, 60))
+        self.assertIn("hands/s", str(stats))
+        local = simulate(tables=3, hands=20, players=3, workers=0, seed=1)
+        self.assertEqual(local.actions, stats.actions)
+        with self.assertRaises(ValueError):
+            simulate(players=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,322 @@
+"""
+This module validates the hand evaluator by enumerating every possible hand.
+
+All the 2,598,960 hands of 5 cards (and the 133,784,560 hands of 7 cards) are evaluated
+in a process pool, and the number of hands of each power is checked against
+the known combinatorial totals. A random sample of hands is also checked against
+the reference detection of the Hand class, by scans (same power, values and kickers).
+
+The hands are enumerated by chunks (all the hands whose two lowest cards are given),
+and the chunks already counted are saved in a checkpoint file,
+so an interrupted run resumes where it stopped (the checkpoint is also saved
+when the run is interrupted).
+numpy is used to evaluate the chunks when it is installed.
+
+Usage:
+    python validate_hand.py [--cards 5|7] [--workers N] [--sample N] [--checkpoint PATH]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from itertools import combinations
+from math import comb
+from typing import Dict, List, Optional, Tuple
+
+from holdem.game import evaluator
+from holdem.game.card import CARDS
+from holdem.game.hand import FinalHand, FinalHandPower, Hand
+
+# Number of hands of each power (HIGH_CARD to ROYAL_FLUSH)
+KNOWN_COUNTS: Dict[int, List[int]] = {
+    5: [1302540, 1098240, 123552, 54912, 10200, 5108, 3744, 624, 36, 4],
+    7: [
+        23294460,
+        58627800,
+        31433400,
+        6461620,
+        6180020,
+        4047644,
+        3473184,
+        224848,
+        37260,
+        4324,
+    ],
+}
+CHECKPOINT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".validation")
+DEFAULT_SAMPLE = 100_000
+PROGRESS_INTERVAL = 5.0
+
+Chunk = Tuple[int, int]
+
+
+def chunks(n_cards: int) -> List[Chunk]:
+    """
+    # List the chunks of the enumeration: the pairs of the two lowest card ids.
+
+    Args:
+    -----
+        n_cards (int): Number of cards of the hands (5 or 7).
+
+    Returns:
+    --------
+        List[Chunk]: The chunks, from the largest one.
+    """
+    return [
+        (first, second)
+        for first in range(52)
+        for second in range(first + 1, 52)
+        if 51 - second >= n_cards - 2
+    ]
+
+
+@lru_cache(maxsize=None)
+def _combination_indices(n: int, k: int):
+    """
+    # Get the k-combinations of range(n) as a numpy array (cached by each worker).
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    return np.array(list(combinations(range(n), k)), dtype=np.uint8).reshape(-1, k)
+
+
+def count_chunk(n_cards: int, chunk: Chunk, use_numpy: bool = True) -> List[int]:
+    """
+    # Count the hands of each power among the hands whose two lowest cards are the chunk.
+
+    Args:
+    -----
+        n_cards (int): Number of cards of the hands (5 or 7).
+        chunk (Chunk): The ids of the two lowest cards.
+        use_numpy (bool, optional): Use the numpy batch evaluator. Defaults to True.
+
+    Returns:
+    --------
+        List[int]: Number of hands of each power (HIGH_CARD to ROYAL_FLUSH).
+    """
+    first, second = chunk
+    rest = range(second + 1, 52)
+    if use_numpy:
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        from holdem.game.hand import (  # pylint: disable=import-outside-toplevel
+            evaluate_batch,
+        )
+
+        indices = _combination_indices(len(rest), n_cards - 2)
+        card_ids = np.empty((len(indices), n_cards), dtype=np.uint8)
+        card_ids[:, 0] = first
+        card_ids[:, 1] = second
+        card_ids[:, 2:] = np.arange(second + 1, 52, dtype=np.uint8)[indices]
+        _, powers = evaluate_batch(card_ids, powers=True)
+        return np.bincount(powers, minlength=len(FinalHandPower)).tolist()
+    counts = [0] * len(FinalHandPower)
+    evaluate_ids = evaluator.evaluate_ids
+    hand_power = evaluator.hand_power
+    for tail in combinations(rest, n_cards - 2):
+        counts[hand_power(evaluate_ids((first, second) + tail))] += 1
+    return counts
+
+
+def load_checkpoint(path: Optional[str], n_cards: int) -> dict:
+    """
+    # Load the progress of a previous run, or start a new one.
+
+    Args:
+    -----
+        path (Optional[str]): The checkpoint file, if any.
+        n_cards (int): Number of cards of the hands (5 or 7).
+
+    Returns:
+    --------
+        dict: The chunks done ("done") and the counts of each power ("counts").
+    """
+    if path is not None and os.path.exists(path):
+        with open(path, encoding="utf-8") as file:
+            state = json.load(file)
+        if state.get("n_cards") == n_cards:
+            return state
+    return {"n_cards": n_cards, "done": [], "counts": [0] * len(FinalHandPower)}
+
+
+def save_checkpoint(path: str, state: dict):
+    """
+    # Save the progress of the run (atomically, so an interruption can't corrupt it).
+
+    Args:
+    -----
+        path (str): The checkpoint file.
+        state (dict): The state returned by load_checkpoint, updated.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as file:
+        json.dump(state, file)
+    os.replace(path + ".tmp", path)
+
+
+def enumerate_hands(
+    n_cards: int,
+    workers: Optional[int] = None,
+    checkpoint: Optional[str] = None,
+    use_numpy: bool = True,
+    verbose: bool = True,
+) -> List[int]:
+    """
+    # Count the hands of each power over all the hands of n_cards cards.
+
+    Args:
+    -----
+        n_cards (int): Number of cards of the hands (5 or 7).
+        workers (int, optional): Number of processes. Defaults to the number of CPUs.
+        checkpoint (str, optional): File where the progress is saved until the enumeration
+            is complete. Defaults to none.
+        use_numpy (bool, optional): Use the numpy batch evaluator. Defaults to True.
+        verbose (bool, optional): Print the progress. Defaults to True.
+
+    Returns:
+    --------
+        List[int]: Number of hands of each power (HIGH_CARD to ROYAL_FLUSH).
+
+    Raises:
+    -------
+        ValueError: If n_cards is not 5 or 7.
+    """
+    # Checks
+    if n_cards not in KNOWN_COUNTS:
+        raise ValueError("Only the hands of 5 or 7 cards can be enumerated")
+    # Init
+    state = load_checkpoint(checkpoint, n_cards)
+    done = {tuple(chunk) for chunk in state["done"]}
+    pending = [chunk for chunk in chunks(n_cards) if chunk not in done]
+    total = comb(52, n_cards)
+    counted = sum(state["counts"])
+    if verbose and done:
+        print(f"Resuming: {counted:,} of {total:,} hands already counted")
+
+    start = last_report = last_save = time.perf_counter()
+    evaluated = 0
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(count_chunk, n_cards, chunk, use_numpy): chunk
+            for chunk in pending
+        }
+        try:
+            for future in as_completed(futures):
+                chunk_counts = future.result()
+                state["counts"] = [a + b for a, b in zip(state["counts"], chunk_counts)]
+                state["done"].append(list(futures[future]))
+                evaluated += sum(chunk_counts)
+                now = time.perf_counter()
+                if checkpoint is not None and now - last_save >= PROGRESS_INTERVAL:
+                    save_checkpoint(checkpoint, state)
+                    last_save = now
+                if verbose and now - last_report >= PROGRESS_INTERVAL:
+                    last_report = now
+                    rate = evaluated / (now - start)
+                    remaining = total - counted - evaluated
+                    print(
+                        f"{counted + evaluated:>13,} / {total:,} hands"
+                        f" - {rate:,.0f} hands/s - {remaining / rate:,.0f} s left"
+                    )
+        except BaseException:
+            # Interrupted (e.g. Ctrl+C): the chunks not started are dropped,
+            # and those already counted are kept for the next run
+            executor.shutdown(wait=False, cancel_futures=True)
+            if checkpoint is not None:
+                save_checkpoint(checkpoint, state)
+            raise
+    if checkpoint is not None and os.path.exists(checkpoint):
+        # The enumeration is complete: the next run starts again from scratch
+        os.remove(checkpoint)
+    elapsed = time.perf_counter() - start
+    if verbose and evaluated:
+        print(
+            f"{evaluated:,} hands evaluated in {elapsed:.1f} s"
+            f" ({evaluated / elapsed:,.0f} hands/s with {workers} workers)"
+        )
+    return state["counts"]
+
+
+def cross_check(n_cards: int, sample: int, seed: int = 0) -> int:
+    """
+    # Compare the evaluator with the final hands detected by the Hand class on random hands,
+    with the reference implementation (Hand.detect_final_hand_by_scans),
+    independent of the bitmasks of the evaluator and of Hand.detect_final_hand.
+
+    Args:
+    -----
+        n_cards (int): Number of cards of the hands (5 to 7).
+        sample (int): Number of random hands.
+        seed (int, optional): Seed of the random generator. Defaults to 0.
+
+    Returns:
+    --------
+        int: Number of hands on which the evaluator and the Hand class disagree.
+    """
+    rng = random.Random(seed)
+    mismatches = 0
+    for _ in range(sample):
+        cards = rng.sample(CARDS, n_cards)
+        expected = Hand(cards).detect_final_hand_by_scans()
+        strength = evaluator.evaluate_ids([card.id for card in cards])
+        if FinalHand.from_rank(strength).key != expected.key:
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"MISMATCH: {' '.join(card.code for card in cards)}: {expected}")
+    return mismatches
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    # Enumerate the hands, check the counts and cross-check the evaluator.
+
+    Returns:
+    --------
+        int: The exit status (1 if a check failed).
+    """
+    parser = argparse.ArgumentParser(description="Validate the hand evaluator.")
+    parser.add_argument("--cards", type=int, choices=(5, 7), default=5)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--sample", type=int, default=DEFAULT_SAMPLE)
+    parser.add_argument("--checkpoint", default=None)
+    parser.add_argument("--no-numpy", action="store_true")
+    args = parser.parse_args(argv)
+
+    use_numpy = not args.no_numpy
+    if use_numpy:
+        try:
+            import numpy  # pylint: disable=import-outside-toplevel, unused-import
+        except ImportError:
+            print("numpy is not installed, the hands are evaluated one by one")
+            use_numpy = False
+    checkpoint = args.checkpoint or os.path.join(
+        CHECKPOINT_DIR, f"enumeration_{args.cards}_cards.json"
+    )
+
+    counts = enumerate_hands(args.cards, args.workers, checkpoint, use_numpy)
+    failed = False
+    print(f"\n{'power':<18}{'counted':>12}{'expected':>12}")
+    for power, (count, expected) in enumerate(zip(counts, KNOWN_COUNTS[args.cards])):
+        status = "" if count == expected else "  <- WRONG"
+        failed = failed or count != expected
+        print(f"{FinalHandPower(power).name:<18}{count:>12,}{expected:>12,}{status}")
+
+    start = time.perf_counter()
+    mismatches = cross_check(args.cards, args.sample)
+    elapsed = time.perf_counter() - start
+    print(
+        f"\nCross-check with Hand: {mismatches} mismatches"
+        f" on {args.sample:,} random hands ({elapsed:.1f} s)"
+    )
+    failed = failed or mismatches > 0
+    print("FAILED" if failed else "OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())